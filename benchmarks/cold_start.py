@@ -0,0 +1,252 @@
+"""Cold-start benchmarks of oq, against synthetic stand-ins of the wrapped libraries.
+
+The stand-ins are generated locally: one package per wrapped library, under the
+library's own name (``numpy``, ``sklearn``, ``matplotlib.pyplot``, ...) and with a
+``dist-info`` giving it a version, so that they shadow any real installation.
+With the default scale, they have thousands of submodules and tens of thousands
+of callables, some of them shared across libraries (to exercise precedence).
+
+Each scenario (``import oq``, ``from oq import np``, the first wrapper attribute,
+the first root attribute) runs in a fresh interpreter, for each configuration
+(all modules, a minimal profile, eager auto-import, no auto-import, compiled
+indexes), with an empty app data directory ("cold") or one with stored indexes
+("warm"). Timings are reported as percentiles, and can be saved as a baseline, or
+checked against one: any p50 that regresses beyond the tolerance makes the run
+fail.
+
+Usage:
+    python benchmarks/cold_start.py                   # report
+    python benchmarks/cold_start.py --save-baseline   # store benchmarks/baseline.json
+    python benchmarks/cold_start.py --check           # exit 1 on regressions
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DFLT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baseline.json")
+
+sys.path.insert(0, REPO_ROOT)
+from oq.config import DISTRIBUTION_MAPPING, MODULE_MAPPING, WRAPPED_MODULES  # noqa
+
+CONFIGURATIONS = {
+    "all": {},
+    "minimal": {"profiles": {"minimal": ["np"]}, "profile": "minimal"},
+    "eager": {"lazy_root": False},
+    "no_auto_import": {"auto_import_to_root": False},
+    "compiled": {"compiled_indexes": True},
+}
+
+SCENARIOS = {
+    "import_oq": ("", "import oq"),
+    "import_wrapper": ("", "from oq import np"),
+    "wrapper_attr": ("from oq import np", "np.{last_np_name}"),
+    "root_attr": ("import oq", "getattr(oq, {last_np_name!r}, None)"),
+}
+
+# Builds the indexes of the import plan (and, with compiled_indexes, generates their
+# modules and the root table's), for the warm runs to find
+_BUILD_INDEXES = (
+    "from oq import config, index\nfrom oq.index import codegen",
+    "[index.get_index(mod_name) for mod_name in config.get_import_order()]\n"
+    "config.should_compile_indexes() and codegen.generate()",
+)
+
+_TIMER = """
+import time
+{setup}
+t0 = time.perf_counter()
+{stmt}
+print(time.perf_counter() - t0)
+"""
+
+SCALES = {
+    "tiny": (4, 5),
+    "small": (40, 10),
+    "default": (200, 10),
+}
+
+
+def _last_np_name(n_submodules, n_callables):
+    """The last name only the numpy stand-in has (see make_synthetic_libraries)."""
+    return f"np_func_{n_submodules - 1}_{(n_callables - 1) // 2 * 2}"
+
+
+def make_synthetic_libraries(root, n_submodules=200, n_callables=10):
+    """Write stand-ins of all the wrapped libraries under root.
+
+    Each library gets ``n_submodules`` modules (in subpackages of 20), each with
+    ``n_callables`` functions and one class. Half the function names are shared by
+    all libraries; the other half are prefixed by the library's short name.
+    """
+    version = f"0.0.0+synthetic.{n_submodules}.{n_callables}"
+    for mod_name, module_path in WRAPPED_MODULES.items():
+        dist = DISTRIBUTION_MAPPING[mod_name]
+        dist_info = os.path.join(root, f"{dist.replace('-', '_')}-{version}.dist-info")
+        os.makedirs(dist_info, exist_ok=True)
+        with open(os.path.join(dist_info, "METADATA"), "w") as f:
+            f.write(f"Metadata-Version: 2.1\nName: {dist}\nVersion: {version}\n")
+
+        parts = module_path.split(".")
+        for i in range(1, len(parts)):
+            package_dir = os.path.join(root, *parts[:i])
+            os.makedirs(package_dir, exist_ok=True)
+            open(os.path.join(package_dir, "__init__.py"), "a").close()
+
+        package_dir = os.path.join(root, *parts)
+        subpackages = [f"sub_{j}" for j in range((n_submodules + 19) // 20)]
+        for j, subpackage in enumerate(subpackages):
+            subpackage_dir = os.path.join(package_dir, subpackage)
+            os.makedirs(subpackage_dir, exist_ok=True)
+            modules = []
+            for i in range(j * 20, min((j + 1) * 20, n_submodules)):
+                lines = []
+                for k in range(n_callables):
+                    name = f"func_{i}_{k}" if k % 2 else f"{mod_name}_func_{i}_{k}"
+                    lines.append(f"def {name}(x=None):\n    return x\n")
+                lines.append(f"class {mod_name.capitalize()}Thing{i}:\n    pass\n")
+                with open(os.path.join(subpackage_dir, f"mod_{i}.py"), "w") as f:
+                    f.write("\n\n".join(lines))
+                modules.append(f"mod_{i}")
+            with open(os.path.join(subpackage_dir, "__init__.py"), "w") as f:
+                f.write(f"from . import {', '.join(modules)}\n")
+        with open(os.path.join(package_dir, "__init__.py"), "w") as f:
+            f.write(f"from . import {', '.join(subpackages)}\n")
+            f.write("from .sub_0.mod_0 import *\n")
+            f.write(f"__all__ = {subpackages!r}\n")
+
+
+def _run(synthetic_root, app_data_dir, setup, stmt):
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join([synthetic_root, REPO_ROOT]),
+        OQ_APP_DATA_DIR=app_data_dir,
+    )
+    env.pop("OQ_PROFILE", None)
+    code = _TIMER.format(setup=setup, stmt=stmt)
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=synthetic_root,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode:
+        raise RuntimeError(f"Benchmark run failed:\n{code}\n{out.stderr}")
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def percentiles(timings):
+    """The p50, p90 and p99 of timings."""
+    if len(timings) == 1:
+        return dict.fromkeys(("p50", "p90", "p99"), timings[0])
+    cuts = statistics.quantiles(timings, n=100, method="inclusive")
+    return {"p50": cuts[49], "p90": cuts[89], "p99": cuts[98]}
+
+
+def run_benchmarks(synthetic_root, last_np_name, repeat=5, verbose=True):
+    """Run every (configuration, temperature, scenario) and get their percentiles."""
+    results = {}
+    for config_name, import_config in CONFIGURATIONS.items():
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_dir = os.path.join(tmp_dir, "config")
+            os.makedirs(config_dir)
+            with open(os.path.join(config_dir, "import_config.json"), "w") as f:
+                json.dump({"import_config": import_config}, f)
+            warm_dir = os.path.join(tmp_dir, "warm")
+            shutil.copytree(config_dir, warm_dir)
+            _run(synthetic_root, warm_dir, *_BUILD_INDEXES)
+
+            for temperature in ("cold", "warm"):
+                for scenario, (setup, stmt) in SCENARIOS.items():
+                    setup, stmt = (
+                        s.format(last_np_name=last_np_name) for s in (setup, stmt)
+                    )
+                    timings = []
+                    for _ in range(repeat):
+                        app_data_dir = warm_dir
+                        if temperature == "cold":
+                            app_data_dir = tempfile.mkdtemp(dir=tmp_dir)
+                            shutil.copytree(
+                                config_dir, app_data_dir, dirs_exist_ok=True
+                            )
+                        timings.append(_run(synthetic_root, app_data_dir, setup, stmt))
+                    key = f"{config_name}/{temperature}/{scenario}"
+                    results[key] = percentiles(timings)
+                    if verbose:
+                        p = results[key]
+                        print(
+                            f"{key:<40}{p['p50']:>10.4f}{p['p90']:>10.4f}"
+                            f"{p['p99']:>10.4f}"
+                        )
+    return results
+
+
+def find_regressions(results, baseline, tolerance=0.25, min_delta=0.02):
+    """Keys whose p50 is above the baseline's by more than tolerance (and min_delta).
+
+    Returns:
+        Dict of ``key -> (baseline_p50, p50)``.
+    """
+    regressions = {}
+    for key, p in results.items():
+        if key not in baseline:
+            continue
+        base = baseline[key]["p50"]
+        if p["p50"] > base * (1 + tolerance) and p["p50"] - base > min_delta:
+            regressions[key] = (base, p["p50"])
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=SCALES, default="default")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario")
+    parser.add_argument("--baseline", default=DFLT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=0.02, help="In seconds")
+    args = parser.parse_args(argv)
+
+    n_submodules, n_callables = SCALES[args.scale]
+    with tempfile.TemporaryDirectory() as synthetic_root:
+        make_synthetic_libraries(synthetic_root, n_submodules, n_callables)
+        print(f"{'scenario (seconds)':<40}{'p50':>10}{'p90':>10}{'p99':>10}")
+        results = run_benchmarks(
+            synthetic_root, _last_np_name(n_submodules, n_callables), args.repeat
+        )
+
+    if args.save_baseline:
+        baselines = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baselines = json.load(f)
+        baselines[args.scale] = results
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f).get(args.scale, {})
+        regressions = find_regressions(
+            results, baseline, args.tolerance, args.min_delta
+        )
+        if regressions:
+            print(f"\nREGRESSIONS (p50 more than {args.tolerance:.0%} above baseline):")
+            for key, (base, p50) in regressions.items():
+                print(f"  {key}: {base:.4f}s -> {p50:.4f}s")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Time to first attribute of each wrapper: ``from oq import np; np.mean``.
+
+Each measurement runs in a fresh interpreter. Use ``--tree`` to compare source
+trees (e.g. a git worktree of an older commit), and ``--cold`` to start with an
+empty app data directory (so no stored index).
+
+Usage:
+    git worktree add /tmp/oq-before <commit>
+    python benchmarks/first_attribute.py --tree /tmp/oq-before --tree .
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+FIRST_ATTRIBUTES = {
+    "np": "mean",
+    "pd": "read_csv",
+    "sp": "minimize",
+    "plt": "plot",
+    "sns": "scatterplot",
+    "sk": "RandomForestClassifier",
+    "xgb": "XGBClassifier",
+    "lgb": "LGBMClassifier",
+    "torch": "tensor",
+    "tf": "constant",
+    "px": "scatter",
+    "sm": "OLS",
+}
+
+_TIMER = """
+import json, time, warnings
+warnings.simplefilter("ignore")
+t0 = time.perf_counter()
+from oq import {mod_name} as wrapper
+t1 = time.perf_counter()
+found = hasattr(wrapper, {attr!r})
+t2 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "first_attribute": t2 - t1, "found": found}}))
+"""
+
+
+def time_first_attribute(mod_name, attr, tree=".", app_data_dir=None):
+    """Time ``from oq import <mod_name>`` and the first access of attr."""
+    tree = os.path.abspath(tree)
+    env = dict(os.environ, PYTHONPATH=tree)
+    if app_data_dir:
+        env["OQ_APP_DATA_DIR"] = app_data_dir
+    code = _TIMER.format(mod_name=mod_name, attr=attr)
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=tree, env=env, capture_output=True, text=True
+    )
+    if out.returncode:
+        return None
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tree", action="append", help="Source tree(s) to time")
+    parser.add_argument("--cold", action="store_true", help="Empty app data dir")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per wrapper")
+    args = parser.parse_args(argv)
+
+    for tree in args.tree or ["."]:
+        print(f"# {os.path.abspath(tree)}{' (cold)' if args.cold else ''}")
+        print(
+            f"{'wrapper':<8}{'import (s)':>12}{'first attr (s)':>16}{'total (s)':>12}"
+        )
+        for mod_name, attr in FIRST_ATTRIBUTES.items():
+            runs = []
+            for _ in range(args.repeat):
+                with tempfile.TemporaryDirectory() as tmp_dir:
+                    timing = time_first_attribute(
+                        mod_name, attr, tree, tmp_dir if args.cold else None
+                    )
+                if timing is None or not timing["found"]:
+                    break
+                runs.append(timing)
+            if not runs:
+                print(f"{mod_name:<8}{'not available':>40}")
+                continue
+            best = min(runs, key=lambda t: t["import"] + t["first_attribute"])
+            total = best["import"] + best["first_attribute"]
+            print(
+                f"{mod_name:<8}{best['import']:>12.3f}"
+                f"{best['first_attribute']:>16.3f}{total:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
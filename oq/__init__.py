@@ -12,6 +12,21 @@ Usage:
     df = oq.DataFrame({'a': [1, 2, 3]})  # pandas DataFrame
     arr = oq.array([1, 2, 3])  # numpy array
 
+    # With lazy_root (the default), `import oq` imports no library: each root name
+    # is resolved, and bound, the first time it is accessed.
+
+    # Which libraries export a name (without importing any)
+    oq.find("read_parquet")  # also: oq.find("*Regressor")
+
+    # In a coroutine, load libraries without blocking the event loop
+    torch = await oq.aimport("torch")
+
+    # Change the import plan at runtime (only the affected root names change)
+    oq.configure(enabled_modules={'tf': False}, module_order=['pd', 'np'])
+
+    # Or narrow it to the libraries a job uses (see `python -m oq.plan`)
+    oq.use_plan('job_plan.json')
+
 Module abbreviations:
     - np: numpy
     - pd: pandas
@@ -28,77 +43,283 @@ Module abbreviations:
 """
 
 from contextlib import suppress
+from importlib import import_module
 
 # Always expose submodules for explicit imports
 from . import util  # noqa: F401
+from . import config
+from . import index
+from . import symbols
+from . import loader
+from . import usage
+from .loader import ready, wait_ready, warm_up  # noqa: F401
+from .search import find  # noqa: F401
+
+# Records of the root names bound from the symbol table (see oq.symbols)
+_root_records = {}
 
-# Optional imports - only if packages are installed
-with suppress(ImportError, ModuleNotFoundError):
-    from . import np  # noqa: F401
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import pd  # noqa: F401
+# Auto-import to root namespace if configured
+def _populate_root_namespace(skip=()):
+    """Populate root namespace with objects from enabled modules.
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import sp  # noqa: F401
+    Each name is bound once, to the object of the library that wins it (see
+    ``oq.symbols``). Names won by the libraries in skip are left unbound.
+    """
+    if not config.should_auto_import() or config.is_memory_lean():
+        return
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import plt  # noqa: F401
+    namespace = globals()
+    for name, owner, record in symbols.get_table().items():
+        if name not in namespace and owner not in skip:
+            with suppress(ImportError, AttributeError):
+                obj = index.resolve(record, mod_name=owner)
+                # Left to __getattr__ until their module is imported (see oq.plotting)
+                if not index.is_deferred_callable(obj):
+                    namespace[name] = obj
+                    _root_records[name] = record
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import sns  # noqa: F401
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import sk  # noqa: F401
+def configure(**import_config) -> None:
+    """Change the import config at runtime, and update the root namespace to match.
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import xgb  # noqa: F401
+    Takes the keys of the import config (e.g. ``enabled_modules``,
+    ``module_order``; see ``config.configure``). Only the root names whose winning
+    object changes are unbound (or, in eager mode, rebound): the libraries are
+    neither walked nor imported again.
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import lgb  # noqa: F401
+    Usage:
+        oq.configure(enabled_modules={"tf": False}, module_order=["pd", "np"])
+    """
+    config.configure(**import_config)
+    namespace = globals()
+    table = symbols.get_table() if config.should_auto_import() else None
+    for name, record in list(_root_records.items()):
+        if table is None or table.record(name) != record:
+            del _root_records[name]
+            namespace.pop(name, None)
+    if not config.should_lazy_load():
+        _populate_root_namespace()
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import torch  # noqa: F401
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import tf  # noqa: F401
+def unload(mod_name: str) -> list[str]:
+    """Unload a library: unbind its root names and wrapper, and free its memory.
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import px  # noqa: F401
+    The root names bound to objects of the library's package are unbound (they're
+    resolved again if accessed later), and the rest is released by
+    ``loader.unload``, which drops the package from ``sys.modules`` when it's
+    safe. Objects of the library you still hold keep it alive.
 
-with suppress(ImportError, ModuleNotFoundError):
-    from . import sm  # noqa: F401
+    Usage:
+        oq.unload("sk")
 
+    Returns:
+        The names of the modules removed from ``sys.modules``.
+    """
+    if mod_name not in config.MODULE_MAPPING:
+        raise ValueError(f"Unknown module {mod_name!r}")
+    namespace = globals()
+    package = config.MODULE_MAPPING[mod_name].split(".")[0]
+    for name, record in list(_root_records.items()):
+        if index._in_package(record[0], package):
+            del _root_records[name]
+            namespace.pop(name, None)
+    # The wrapper module, bound by the import system
+    namespace.pop(mod_name, None)
+    return loader.unload(mod_name)
 
-# Auto-import to root namespace if configured
-def _populate_root_namespace():
-    """Populate root namespace with objects from enabled modules."""
-    from . import config
 
+def preload(profile: str | None = None, fork_unsafe: bool = False) -> list[str]:
+    """Load the import plan in a prefork server's master, before it forks.
+
+    The libraries are imported, every root name is resolved and bound, and the
+    objects are frozen (``gc.freeze``), so the forked workers share them
+    copy-on-write (see ``oq.prefork``).
+
+    Args:
+        profile: Import profile to switch to first (default: keep the plan).
+        fork_unsafe: Also import the libraries with native thread pools (torch,
+            tf), which are otherwise left for the workers to import.
+
+    Usage:
+        oq.preload("ml")
+
+    Returns:
+        The libraries imported.
+    """
+    from .prefork import freeze, preload_libraries
+
+    if profile is not None:
+        configure(profile=profile)
+    plan = config.get_installed_import_order()
+    loaded, skipped = preload_libraries(plan, fork_unsafe)
+    _populate_root_namespace(skip=skipped)
+    freeze()
+    return loaded
+
+
+def use_plan(plan: str | dict) -> list[str]:
+    """Narrow the import plan to the libraries an import plan lists (see
+    ``oq.plan``): no other library is imported implicitly.
+
+    Args:
+        plan: Path of a plan file (as written by ``python -m oq.plan``), or a plan.
+
+    Usage:
+        oq.use_plan("job_plan.json")
+
+    Returns:
+        The libraries of the import plan.
+    """
+    from .plan import load_plan, plan_config
+
+    if isinstance(plan, str):
+        plan = load_plan(plan)
+    configure(**plan_config(plan))
+    return config.get_import_order()
+
+
+def available() -> dict[str, bool]:
+    """Which libraries are installed, found without importing any (and cached for
+    the process, see ``config.is_library_available``).
+
+    Usage:
+        oq.available()  # {'np': True, ..., 'tf': False, ...}
+    """
+    return {mod: config.is_library_available(mod) for mod in config.MODULE_MAPPING}
+
+
+def versions() -> dict[str, str | None]:
+    """The installed version of each library (None if it isn't installed), read
+    from the distribution metadata, without importing any library.
+
+    Usage:
+        oq.versions()  # {'np': '2.1.3', ..., 'tf': None, ...}
+    """
+    return {mod: config.get_library_version(mod) for mod in config.MODULE_MAPPING}
+
+
+async def aimport(mod_name: str):
+    """Load a library without blocking the event loop (see ``oq.aio``).
+
+    Usage:
+        torch = await oq.aimport("torch")
+    """
+    from .aio import aimport
+
+    return await aimport(mod_name)
+
+
+async def aget(name: str):
+    """Get a name without blocking the event loop (see ``oq.aio``).
+
+    Usage:
+        read_csv = await oq.aget("read_csv")
+    """
+    from .aio import aget
+
+    return await aget(name)
+
+
+# Submodules of oq (other than wrappers) that root attribute access imports, and
+# dir(oq) lists (any other submodule is found by __getattr__ too)
+_SUBMODULES = (
+    "aio",
+    "diagnostics",
+    "freeze",
+    "ipython",
+    "plan",
+    "plotting",
+    "prefork",
+    "profile",
+    "snapshot",
+    "warm",
+)
+
+
+def _is_submodule(name: str) -> bool:
+    """Whether name is a submodule of oq (found without importing it)."""
+    from importlib.util import find_spec
+
+    with suppress(ImportError, ValueError):
+        return find_spec(f"{__name__}.{name}") is not None
+    return False
+
+
+def __getattr__(name):
+    """Resolve root names on first access (lazy mode).
+
+    The owner of a name is looked up in the symbol table (see ``oq.symbols``), so
+    the precedence is the same as the eager population, and only the module
+    defining the name is imported. The resolved object is bound into the module
+    dict, so this is only called once per name (except in memory-lean mode, where
+    nothing is bound, so that ``unload`` can free a library).
+
+    oq's own submodules (e.g. ``oq.plotting``) are imported, not looked up.
+    """
+    if name in config.MODULE_MAPPING or name in _SUBMODULES:
+        return import_module(f"{__name__}.{name}")
+    if name.startswith("_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _is_submodule(name):
+        return import_module(f"{__name__}.{name}")
     if not config.should_auto_import():
-        return
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    table = symbols.get_table()
+    lean = config.is_memory_lean()
+    try:
+        attr = table.get(name, cache=not lean)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    usage.record(name)
+    if lean or index.is_deferred_callable(attr):
+        return attr
+    globals()[name] = attr
+    _root_records[name] = table.record(name)
+    return attr
+
+
+def __dir__():
+    """List the root names without importing any library.
+
+    The names come from the indexes of the import plan that are available (in
+    memory, on disk, or from a snapshot), so ``dir(oq)`` and tab completion are
+    instant; missing indexes are built in the background (see
+    ``index.available_names``).
+    """
+    names = set(globals()) | set(config.MODULE_MAPPING) | set(_SUBMODULES)
+    if config.should_auto_import():
+        names |= index.available_names(config.get_installed_import_order())
+    return sorted(names)
 
-    import sys
 
-    module_order = config.get_import_order()
-    current_module = sys.modules[__name__]
+# Index workers (see oq.index.build) only walk their own library, and diagnostics
+# (see oq.diagnostics) measure libraries from scratch
+if not config.is_index_worker():
+    if config.get_snapshot_path():
+        # Use the indexes and root table of a snapshot (see oq.snapshot)
+        from .snapshot import load_configured_snapshot
 
-    for mod_name in module_order:
-        with suppress(ImportError, ModuleNotFoundError, AttributeError):
-            # Import the submodule
-            submodule = __import__(f"oq.{mod_name}", fromlist=[mod_name])
+        load_configured_snapshot()
 
-            # Get all public attributes from the submodule
-            for attr_name in dir(submodule):
-                if not attr_name.startswith("_"):
-                    attr = getattr(submodule, attr_name)
-                    # Only add callables and classes
-                    if callable(attr):
-                        setattr(current_module, attr_name, attr)
+    if config.get_plan_path():
+        # Only import the libraries some scripts use (see oq.plan)
+        from .plan import load_configured_plan
 
+        load_configured_plan()
 
-# Perform auto-import
-_populate_root_namespace()
+    if config.should_record_usage():
+        # Learn the names this application uses (see oq.usage)
+        usage.start_recording()
 
-# Clean up the namespace
-del _populate_root_namespace
+    if not config.should_lazy_load():
+        # Perform auto-import (only of the modules in the import plan)
+        _populate_root_namespace()
+    else:
+        if config.should_prefetch_usage():
+            # Resolve the names this application used before
+            usage.prefetch()
+        if config.should_warm_up():
+            # Load the modules of the import plan in the background
+            warm_up()
@@ -0,0 +1,62 @@
+"""Asyncio-friendly imports: load libraries without blocking the event loop.
+
+The first access to a name of a library imports (and maybe indexes) the library,
+which can take seconds. In a coroutine, await ``aimport`` or ``aget`` instead:
+the work runs in the background loader (see ``oq.loader``) and in executor
+threads, while the event loop keeps serving other tasks. Concurrent awaiters of
+the same library share its load.
+
+Usage:
+    import oq
+
+    torch = await oq.aimport("torch")
+    read_csv = await oq.aget("read_csv")  # a root name
+    linspace = await oq.aget("np.linspace")  # a name of a wrapper module
+    ttest_ind = await oq.aget("sp.stats.ttest_ind")  # a name of a subpackage
+"""
+
+import asyncio
+from functools import reduce
+from importlib import import_module
+
+from . import config, loader, symbols
+
+
+async def aimport(mod_name: str):
+    """Load a library in the background, and return its wrapper module.
+
+    Args:
+        mod_name: Short name of the library (e.g. "torch").
+
+    Raises:
+        ValueError: If mod_name isn't a wrapped library.
+    """
+    await asyncio.wrap_future(loader.ready(mod_name))
+    return import_module(f"{__package__}.{mod_name}")
+
+
+async def aget(name: str):
+    """Get a root name (e.g. "read_csv") or a wrapper's name (e.g. "pd.read_csv",
+    or "sp.stats.ttest_ind"), loading the library it comes from in the background.
+
+    Raises:
+        AttributeError: If no library exports name.
+    """
+    loop = asyncio.get_running_loop()
+    mod_name, _, path = name.partition(".")
+    if path:
+        wrapper = await aimport(mod_name)
+        # The rest of the path (e.g. "stats.ttest_ind") may import subpackages
+        return await loop.run_in_executor(None, _getattr_path, wrapper, path)
+
+    root = import_module(__package__)
+    if config.should_auto_import():
+        # Finding the owner may read (or build) indexes
+        owner = await loop.run_in_executor(None, symbols.get_table().owner, name)
+        if owner is not None:
+            await asyncio.wrap_future(loader.ready(owner))
+    return await loop.run_in_executor(None, getattr, root, name)
+
+
+def _getattr_path(obj, path: str):
+    return reduce(getattr, path.split("."), obj)
@@ -1,10 +1,29 @@
 """Configuration management for OQ package."""
 
+import copy
 import json
-from pathlib import Path
-from typing import Dict, List, Any
+import os
+import sys
+import threading
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from contextlib import suppress
 
+# Environment variable selecting a named import profile (see get_profile_name)
+PROFILE_ENV_VAR = "OQ_PROFILE"
+
+# Environment variable set in the worker processes that build indexes
+INDEX_WORKER_ENV_VAR = "OQ_INDEX_WORKER"
+
+# Environment variable giving the path of a snapshot to load (see oq.snapshot)
+SNAPSHOT_ENV_VAR = "OQ_SNAPSHOT"
+
+# Environment variable naming the application, for usage recording (see oq.usage)
+APP_ENV_VAR = "OQ_APP"
+
+# Environment variable giving the path of an import plan to apply (see oq.plan)
+PLAN_ENV_VAR = "OQ_PLAN"
+
 # Default module mapping
 MODULE_MAPPING = {
     "np": "numpy",
@@ -21,6 +40,30 @@ MODULE_MAPPING = {
     "sm": "statsmodels",
 }
 
+# Module each wrapper introspects, where it differs from MODULE_MAPPING
+WRAPPED_MODULES = {**MODULE_MAPPING, "sm": "statsmodels.api"}
+
+# Distribution (pip) names, used to read library versions without importing them
+DISTRIBUTION_MAPPING = {
+    "np": "numpy",
+    "pd": "pandas",
+    "sp": "scipy",
+    "plt": "matplotlib",
+    "sns": "seaborn",
+    "sk": "scikit-learn",
+    "xgb": "xgboost",
+    "lgb": "lightgbm",
+    "torch": "torch",
+    "tf": "tensorflow",
+    "px": "plotly",
+    "sm": "statsmodels",
+}
+
+
+def _default_config_path() -> str:
+    # Next to this module (importlib.resources would cost a dozen imports)
+    return os.path.join(os.path.dirname(__file__), "data", "default_config.json")
+
 
 def get_default_config() -> Dict[str, Any]:
     """Load the default configuration from the package data directory.
@@ -28,9 +71,7 @@ def get_default_config() -> Dict[str, Any]:
     Returns:
         Dictionary containing the default configuration.
     """
-    from importlib.resources import files
-
-    config_path = files("oq") / "data" / "default_config.json"
+    config_path = _default_config_path()
 
     with suppress(FileNotFoundError, json.JSONDecodeError):
         with open(config_path, "r") as f:
@@ -40,55 +81,286 @@ def get_default_config() -> Dict[str, Any]:
     return {
         "import_config": {
             "auto_import_to_root": True,
+            "lazy_root": True,
+            "background_warm_up": False,
+            "warm_up_workers": 1,
+            "build_indexes_in_subprocess": True,
             "module_order": list(MODULE_MAPPING.keys()),
             "enabled_modules": {mod: True for mod in MODULE_MAPPING},
+            "profile": None,
+            "profiles": {},
+            "walk": {},
         }
     }
 
 
+def split_scope(mod_name: str) -> Tuple[str, str]:
+    """Split a library name, maybe scoped to a subpackage, into the short name of
+    the library and the subpackage (e.g. "sp.stats" -> ("sp", "stats"))."""
+    library, _, scope = mod_name.partition(".")
+    return library, scope
+
+
+def get_wrapped_module(mod_name: str) -> str:
+    """Get the module a wrapper introspects.
+
+    Args:
+        mod_name: Short name of the library (e.g. "sm"), or of one of its
+            subpackages (e.g. "sp.stats").
+
+    Returns:
+        The module name (e.g. "statsmodels.api", or "scipy.stats").
+    """
+    library, scope = split_scope(mod_name)
+    if scope:
+        return get_subpackage_parent(mod_name)
+    return WRAPPED_MODULES[library]
+
+
+def get_subpackage_parent(mod_name: str) -> str:
+    """Get the package whose subpackages a wrapper exposes (see ``oq.index``).
+
+    Args:
+        mod_name: Short name of the library (e.g. "sm"), or of one of its
+            subpackages (e.g. "sp.stats").
+
+    Returns:
+        The package name (e.g. "statsmodels", or "scipy.stats").
+    """
+    library, scope = split_scope(mod_name)
+    package = MODULE_MAPPING[library]
+    return f"{package}.{scope}" if scope else package
+
+
+def get_package(mod_name: str) -> str:
+    """Get the package of a library (or of the library of a subpackage), which the
+    objects it exports come from (e.g. "scipy" for "sp.stats")."""
+    return MODULE_MAPPING[split_scope(mod_name)[0]]
+
+
+@lru_cache(maxsize=None)
+def _distribution_version(distribution: str) -> Optional[str]:
+    from importlib.metadata import version, PackageNotFoundError
+
+    with suppress(PackageNotFoundError):
+        return version(distribution)
+    return None
+
+
+@lru_cache(maxsize=None)
+def _package_exists(package: str) -> bool:
+    from importlib.util import find_spec
+
+    # A top-level package: finding its spec imports nothing
+    with suppress(ImportError, ValueError):
+        return find_spec(package) is not None
+    return False
+
+
+def get_library_version(mod_name: str) -> Optional[str]:
+    """Get the installed version of a wrapped library, without importing it.
+
+    Versions are read from the distribution metadata once per process.
+
+    Args:
+        mod_name: Short name of the library (e.g. "np"), or of one of its
+            subpackages (e.g. "sp.stats").
+
+    Returns:
+        The version string, or None if the distribution isn't installed.
+    """
+    distribution = DISTRIBUTION_MAPPING.get(split_scope(mod_name)[0])
+    return None if distribution is None else _distribution_version(distribution)
+
+
+def is_library_available(mod_name: str) -> bool:
+    """Check if a wrapped library can be imported, without importing it.
+
+    The top-level package of the library is looked up (once per process) by the
+    import system's finders, which don't import it.
+
+    Args:
+        mod_name: Short name of the library (e.g. "np"), or of one of its
+            subpackages (e.g. "sp.stats").
+    """
+    return _package_exists(get_package(mod_name).split(".")[0])
+
+
+@lru_cache(maxsize=None)
+def _user_config_path(app_data_dir: Optional[str]) -> Optional[str]:
+    """Path of the user config file, given the ``OQ_APP_DATA_DIR`` value."""
+    if app_data_dir is None:
+        with suppress(Exception):
+            from .util import app_config_folder
+
+            app_data_dir = app_config_folder()
+    if app_data_dir is None:
+        return None
+    return os.path.join(app_data_dir, "import_config.json")
+
+
 def get_user_config() -> Dict[str, Any]:
     """Load user configuration if it exists.
 
+    The user configuration is the ``import_config.json`` file of the app data
+    directory (``OQ_APP_DATA_DIR``, or the ``oq`` app config folder). It holds the
+    import config, either at the top level or under an ``import_config`` key.
+
     Returns:
         Dictionary containing user configuration, or empty dict if not found.
     """
-    from .util import get_config
-
     with suppress(Exception):
         # Only try to get config if it exists, don't prompt
-        import os
-        from config2py import get_app_config_folder
-
-        config_dir = os.environ.get('OQ_APP_DATA_DIR', get_app_config_folder('oq'))
-        config_file = os.path.join(config_dir, 'import_config.json')
+        config_file = _user_config_path(os.environ.get("OQ_APP_DATA_DIR"))
 
-        if os.path.exists(config_file):
-            user_config = get_config("import_config")
+        if config_file is not None:
+            with open(config_file) as f:
+                user_config = json.load(f)
+            user_config = user_config.get("import_config", user_config)
             if user_config:
                 return {"import_config": user_config}
 
     return {}
 
 
+def _merge(config: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge overrides into config, recursing into the dictionaries of both."""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(config.get(key), dict):
+            _merge(config[key], value)
+        else:
+            config[key] = value
+    return config
+
+
+# Runtime overrides of the import config (see configure)
+_overrides: Dict[str, Any] = {}
+_config_lock = threading.Lock()
+_config_cache: Dict[str, Any] = {}
+
+
+def _file_stamp(path: Optional[str]) -> Optional[Tuple[int, int]]:
+    with suppress(OSError, TypeError):
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    return None
+
+
+def _config_stamp() -> Tuple:
+    """What the merged config depends on: its files (and their mtimes)."""
+    user_config_path = _user_config_path(os.environ.get("OQ_APP_DATA_DIR"))
+    default_config_path = _default_config_path()
+    return (
+        default_config_path,
+        _file_stamp(default_config_path),
+        user_config_path,
+        _file_stamp(user_config_path),
+    )
+
+
 def get_config() -> Dict[str, Any]:
     """Get merged configuration (user config overrides defaults).
 
+    Dictionaries are merged key by key, so that the user config only needs the
+    keys it changes (e.g. the walk settings of a single library). Runtime
+    overrides (see ``configure``) are merged last.
+
+    The merged configuration is memoized: the config files are only read again
+    when their modification time (or the ``OQ_APP_DATA_DIR``) changes. It's
+    shared, so it must not be modified.
+
     Returns:
         Merged configuration dictionary.
     """
-    config = get_default_config()
-    user_config = get_user_config()
+    stamp = _config_stamp()
+    with _config_lock:
+        if _config_cache.get("stamp") != stamp:
+            config = get_default_config()
+            user_config = get_user_config()
 
-    # Merge configs (user overrides default)
-    if "import_config" in user_config:
-        config["import_config"].update(user_config["import_config"])
+            # Merge configs (user overrides default)
+            if "import_config" in user_config:
+                _merge(config["import_config"], user_config["import_config"])
+            _config_cache.update(stamp=stamp, files_config=config)
+            _config_cache.pop("config", None)
+        if "config" not in _config_cache:
+            config = copy.deepcopy(_config_cache["files_config"])
+            _merge(config["import_config"], copy.deepcopy(_overrides))
+            _config_cache["config"] = config
+        return _config_cache["config"]
 
-    return config
+
+def configure(**import_config) -> None:
+    """Override import config keys at runtime (until the process ends).
+
+    Overrides are merged like the user config (e.g. ``enabled_modules={"tf":
+    False}`` only disables tensorflow), on top of it. Note that this only
+    changes the config: ``oq.configure`` also updates the root namespace.
+
+    Raises:
+        ValueError: If ``module_order`` or ``enabled_modules`` name an unknown
+            module.
+    """
+    unknown = [
+        mod
+        for mod in [
+            *import_config.get("module_order", []),
+            *import_config.get("enabled_modules", {}),
+        ]
+        if mod not in MODULE_MAPPING
+    ]
+    if unknown:
+        raise ValueError(f"Unknown modules: {unknown}")
+    with _config_lock:
+        _merge(_overrides, copy.deepcopy(import_config))
+        _config_cache.pop("config", None)
+
+
+def get_profile_name() -> Optional[str]:
+    """Get the name of the selected import profile, if any.
+
+    A profile set at runtime (see ``configure``, e.g. by ``oq.preload("ml")``)
+    takes precedence over the ``OQ_PROFILE`` environment variable, which takes
+    precedence over the ``profile`` key of the config files.
+
+    Returns:
+        The profile name, or None if no profile is selected.
+    """
+    config = get_config()
+    profile = config.get("import_config", {}).get("profile")
+    with _config_lock:
+        runtime_profile = _overrides.get("profile")
+    return runtime_profile or os.environ.get(PROFILE_ENV_VAR) or profile or None
+
+
+def get_profile(name: str) -> List[str]:
+    """Get the modules of a named import profile.
+
+    Args:
+        name: Name of a profile in the ``profiles`` of the import config.
+
+    Returns:
+        List of module short names the profile enables.
+
+    Raises:
+        ValueError: If there's no such profile.
+    """
+    config = get_config()
+    profiles = config.get("import_config", {}).get("profiles", {})
+    if name not in profiles:
+        raise ValueError(
+            f"Unknown import profile {name!r}. Available profiles: {sorted(profiles)}"
+        )
+    return list(profiles[name])
 
 
 def get_import_order() -> List[str]:
     """Get the ordered list of modules to import.
 
+    This is the import plan: modules that aren't enabled, or that aren't in the
+    selected profile, are never imported implicitly (i.e. other than by an
+    explicit ``from oq import <module>``).
+
     Returns:
         List of module short names in import order.
     """
@@ -100,7 +372,22 @@ def get_import_order() -> List[str]:
     )
 
     # Filter to only enabled modules
-    return [mod for mod in module_order if enabled_modules.get(mod, True)]
+    order = [mod for mod in module_order if enabled_modules.get(mod, True)]
+
+    # ... and to the modules of the selected profile
+    profile_name = get_profile_name()
+    if profile_name is not None:
+        profile = get_profile(profile_name)
+        order = [mod for mod in order if mod in profile]
+
+    return order
+
+
+def get_installed_import_order() -> List[str]:
+    """Get the import plan (see ``get_import_order``) without the libraries that
+    aren't installed, found without importing any (see ``is_library_available``).
+    """
+    return [mod for mod in get_import_order() if is_library_available(mod)]
 
 
 def should_auto_import() -> bool:
@@ -111,3 +398,208 @@ def should_auto_import() -> bool:
     """
     config = get_config()
     return config.get("import_config", {}).get("auto_import_to_root", True)
+
+
+def should_lazy_load() -> bool:
+    """Check if root names should be resolved lazily, on first access.
+
+    Returns:
+        True if lazy root resolution is enabled, False otherwise.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("lazy_root", True)
+
+
+def is_memory_lean() -> bool:
+    """Check if resolved objects should be neither cached nor bound (memory-lean).
+
+    Returns:
+        True if memory-lean mode is enabled, False otherwise.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("memory_lean", False)
+
+
+def should_warm_up() -> bool:
+    """Check if the libraries of the import plan should be loaded in the background.
+
+    Returns:
+        True if background warm-up is enabled, False otherwise.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("background_warm_up", False)
+
+
+def get_warm_up_workers() -> int:
+    """Get the number of threads loading libraries in the background.
+
+    Returns:
+        The number of threads (at least 1).
+    """
+    config = get_config()
+    return max(1, int(config.get("import_config", {}).get("warm_up_workers", 1)))
+
+
+def should_build_in_subprocess() -> bool:
+    """Check if indexes should be built in worker processes (see ``oq.index.build``).
+
+    Returns:
+        True if libraries are walked out of process, False otherwise.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("build_indexes_in_subprocess", True)
+
+
+def should_compile_indexes() -> bool:
+    """Check if indexes, and root tables, should be loaded from generated,
+    byte-compiled modules (see ``oq.index.codegen``).
+
+    Returns:
+        True if compiled indexes are enabled, False otherwise.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("compiled_indexes", False)
+
+
+def get_deferred_modules() -> List[str]:
+    """Get the libraries whose functions are imported when first called (see
+    ``oq.plotting``).
+
+    Returns:
+        List of module short names.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("deferred_modules", ["plt", "sns"])
+
+
+def get_plot_backend() -> Optional[str]:
+    """Get the matplotlib backend to select before importing a deferred library
+    (see ``oq.plotting``).
+
+    Returns:
+        The backend name (e.g. "agg"), or None to leave it to matplotlib.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("plot_backend")
+
+
+def is_index_worker() -> bool:
+    """Check if this process is a worker building an index (see ``oq.index.build``).
+
+    Returns:
+        True in index workers, False otherwise.
+    """
+    return bool(os.environ.get(INDEX_WORKER_ENV_VAR))
+
+
+def get_snapshot_path() -> Optional[str]:
+    """Get the path of the snapshot to load at import (see ``oq.snapshot``).
+
+    Returns:
+        The ``OQ_SNAPSHOT`` environment variable, or None if it isn't set.
+    """
+    return os.environ.get(SNAPSHOT_ENV_VAR) or None
+
+
+def get_plan_path() -> Optional[str]:
+    """Get the path of the import plan to apply at import (see ``oq.plan``).
+
+    Returns:
+        The ``OQ_PLAN`` environment variable, or None if it isn't set.
+    """
+    return os.environ.get(PLAN_ENV_VAR) or None
+
+
+def should_record_usage() -> bool:
+    """Check if the names this process resolves should be recorded (see
+    ``oq.usage``).
+
+    Returns:
+        True if usage recording is enabled, False otherwise.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("record_usage", False)
+
+
+def should_prefetch_usage() -> bool:
+    """Check if the names the application used before should be resolved at
+    ``import oq`` (see ``oq.usage``).
+
+    Returns:
+        True if prefetching is enabled, False otherwise.
+    """
+    config = get_config()
+    return config.get("import_config", {}).get("prefetch_usage", False)
+
+
+def get_app_name() -> str:
+    """Get the name of the application, which usage is recorded under.
+
+    The ``OQ_APP`` environment variable takes precedence over the ``app`` key of
+    the import config; the default is the name of the script being run.
+
+    Returns:
+        The application name.
+    """
+    config = get_config()
+    app = os.environ.get(APP_ENV_VAR) or config.get("import_config", {}).get("app")
+    if not app:
+        script = (getattr(sys, "argv", None) or [""])[0]
+        app = os.path.splitext(os.path.basename(script))[0]
+    return app if app and app != "-c" else "python"
+
+
+def get_walk_config(mod_name: str) -> Dict[str, Any]:
+    """Get the settings of the walk that indexes a library.
+
+    These are the ``walk`` settings of the import config, overridden by the ones
+    under ``walk["libraries"][mod_name]``, except for ``exclude`` patterns, which
+    add up. A subpackage (e.g. "sp.stats") has the settings of its library (with
+    depths relative to the subpackage, and no ``subpackages`` allowlist),
+    overridden by its own, if any:
+
+    - ``max_depth``: How many levels of submodules to walk, below the wrapped
+      module (None for no limit).
+    - ``private``: Whether to walk modules with a private (``_``) name part.
+    - ``include``: Glob patterns of module names; if any, only modules matching
+      one are walked.
+    - ``exclude``: Glob patterns of names (of modules, or of attributes that would
+      import one) never to walk.
+    - ``subpackages``: Allowlist of the subpackages to walk (names relative to the
+      wrapped module, imported before the walk), or ``"__all__"`` for the ones
+      the library lists in ``__all__``, or None to walk whatever is reachable.
+    - ``time_budget``: Seconds the import and walk may take (None for no limit).
+      Past it, the walk stops, and the index is partial ("degraded", see
+      ``oq.index.get_report``).
+    - ``memory_budget``: Megabytes of memory the import and walk may add (None
+      for no limit), likewise.
+
+    Args:
+        mod_name: Short name of the library (e.g. "np"), or of one of its
+            subpackages (e.g. "sp.stats").
+
+    Returns:
+        Dictionary with all of the above keys.
+    """
+    config = get_config()
+    walk = dict(config.get("import_config", {}).get("walk", {}))
+    libraries = walk.pop("libraries", {})
+    library, scope = split_scope(mod_name)
+    library_walk = dict(libraries.get(library, {}))
+    exclude = list(walk.get("exclude", [])) + list(library_walk.get("exclude", []))
+    if scope:
+        library_walk.pop("subpackages", None)
+        library_walk.update(libraries.get(mod_name, {}))
+        exclude += libraries.get(mod_name, {}).get("exclude", [])
+    walk_config = {
+        "max_depth": None,
+        "private": False,
+        "include": [],
+        "subpackages": None,
+        "time_budget": None,
+        "memory_budget": None,
+    }
+    walk_config.update(walk)
+    walk_config.update(library_walk)
+    walk_config["exclude"] = exclude
+    return walk_config
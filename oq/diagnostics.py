@@ -0,0 +1,184 @@
+"""Diagnostics of the startup cost of the wrapped libraries.
+
+Usage:
+    from oq.diagnostics import import_report
+
+    report = import_report()  # measured in a fresh interpreter
+    report["libraries"]["pd"]["import_time"]
+
+The same report can be written as JSON with ``python -m oq.profile``.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout, suppress
+from importlib import import_module
+from typing import Any, Dict, Iterable, Optional
+
+from . import config, index
+
+MEMORY_MEASURES = ("rss", "tracemalloc")
+
+
+def _rss() -> Optional[int]:
+    """Resident set size of the current process, in bytes (None if unknown)."""
+    with suppress(ImportError):
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    with suppress(OSError, ValueError, IndexError):
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    return None
+
+
+def _memory(memory: str) -> Optional[int]:
+    if memory == "tracemalloc":
+        return tracemalloc.get_traced_memory()[0]
+    return _rss()
+
+
+def _measure_library(mod_name: str, memory: str) -> Dict[str, Any]:
+    """Import and walk a library in the current process, measuring the costs."""
+    info = {
+        "module": config.MODULE_MAPPING[mod_name],
+        "version": config.get_library_version(mod_name),
+        "indexed": index.load_index(mod_name) is not None,
+        "available": False,
+        "error": None,
+    }
+    modules_before = len(sys.modules)
+    memory_before = _memory(memory)
+    t0 = time.perf_counter()
+    try:
+        import_module(config.WRAPPED_MODULES[mod_name])
+    except Exception as error:
+        info["error"] = f"{type(error).__name__}: {error}"
+        return info
+    t1 = time.perf_counter()
+    try:
+        names = index.build_index(mod_name)
+    except Exception as error:
+        # The import is still measured: only the walk failed
+        info["error"] = f"{type(error).__name__}: {error}"
+        names = {}
+    t2 = time.perf_counter()
+    memory_after = _memory(memory)
+
+    info.update(
+        available=True,
+        import_time=t1 - t0,
+        walk_time=t2 - t1,
+        symbols=len(names),
+        memory_delta=(None if memory_before is None else memory_after - memory_before),
+        modules_added=len(sys.modules) - modules_before,
+        names=names,
+    )
+    return info
+
+
+def _report_in_process(mod_names: Iterable[str], memory: str = "rss") -> Dict[str, Any]:
+    """Measure the libraries, in order, in the current process."""
+    if memory not in MEMORY_MEASURES:
+        raise ValueError(f"memory should be one of {MEMORY_MEASURES}, not {memory!r}")
+    if memory == "tracemalloc":
+        tracemalloc.start()
+
+    libraries = {}
+    owners = {}  # root name -> library that currently owns it
+    for mod_name in mod_names:
+        info = _measure_library(mod_name, memory)
+        names = info.pop("names", {})
+        # Later libraries overwrite the root names of earlier ones
+        overwrites = {name: owners[name] for name in names if name in owners}
+        info["overwrites"] = dict(sorted(overwrites.items()))
+        owners.update(dict.fromkeys(names, mod_name))
+        libraries[mod_name] = info
+
+    if memory == "tracemalloc":
+        tracemalloc.stop()
+
+    available = [info for info in libraries.values() if info["available"]]
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "profile": config.get_profile_name(),
+        "memory_measure": memory,
+        "libraries": libraries,
+        "total": {
+            "import_time": sum(info["import_time"] for info in available),
+            "walk_time": sum(info["walk_time"] for info in available),
+            "symbols": sum(info["symbols"] for info in available),
+            "root_names": len(owners),
+            "modules_added": sum(info["modules_added"] for info in available),
+        },
+    }
+
+
+_REPORT_CODE = "from oq.diagnostics import _report_main; _report_main()"
+
+
+def _report_main(argv=None) -> None:
+    """Measure the libraries of a JSON spec (the first argument), and print the
+    report as JSON.
+
+    The spec has the ``modules`` to measure, in order, and the ``memory`` measure
+    (see ``_report_in_process``).
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    spec = json.loads(argv[0])
+    out = sys.stdout
+    # Whatever the libraries print goes to stderr, not into the report
+    with redirect_stdout(sys.stderr):
+        report = _report_in_process(spec["modules"], spec["memory"])
+    json.dump(report, out)
+    out.flush()
+
+
+def import_report(
+    mod_names: Optional[Iterable[str]] = None,
+    *,
+    memory: str = "rss",
+    isolated: bool = True,
+) -> Dict[str, Any]:
+    """Report the startup cost of each library.
+
+    For each library, in import order: the wall time of its import, the time spent
+    walking it for callables, the number of symbols found, the memory delta, the
+    number of ``sys.modules`` entries it added, and the root names it overwrote
+    (mapped to the library that owned them before).
+
+    Args:
+        mod_names: Short names of the libraries to measure, in import order.
+            Defaults to the import plan (``config.get_import_order()``).
+        memory: How to measure memory: "rss" or "tracemalloc" (more precise, but
+            slows down imports).
+        isolated: Measure in a fresh interpreter, so that the costs don't depend
+            on what the current process already imported.
+
+    Returns:
+        The report, as a JSON-serializable dict.
+    """
+    if mod_names is None:
+        mod_names = config.get_import_order()
+    mod_names = list(mod_names)
+    if not isolated:
+        return _report_in_process(mod_names, memory)
+
+    spec = json.dumps({"modules": mod_names, "memory": memory})
+    # Like an index worker, `import oq` loads nothing there (whatever the config:
+    # eager root, prefetch, warm-up), so that nothing is imported before measuring
+    env = {**os.environ, config.INDEX_WORKER_ENV_VAR: "1"}
+    out = subprocess.run(
+        [sys.executable, "-c", _REPORT_CODE, spec],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
@@ -0,0 +1,38 @@
+"""Freeze the indexes and the root table of oq into a snapshot file.
+
+Usage:
+    python -m oq.freeze -o oq_snapshot.json              # all libraries
+    python -m oq.freeze -o oq_snapshot.json --modules np pd
+    OQ_PROFILE=ml python -m oq.freeze -o oq_snapshot.json
+
+Then run with ``OQ_SNAPSHOT=oq_snapshot.json`` (see ``oq.snapshot``).
+"""
+
+import argparse
+
+from .snapshot import make_snapshot, write_snapshot
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oq.freeze", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("-o", "--output", required=True, help="Snapshot file")
+    parser.add_argument(
+        "--modules",
+        nargs="+",
+        help="Libraries to index (default: all; the import plan always is)",
+    )
+    args = parser.parse_args(argv)
+
+    snapshot = make_snapshot(args.modules)
+    write_snapshot(snapshot, args.output)
+    installed = [mod for mod, version in snapshot["versions"].items() if version]
+    print(
+        f"Froze {len(snapshot['root'])} root names and the indexes of "
+        f"{', '.join(installed) or 'no library'} into {args.output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
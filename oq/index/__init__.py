@@ -0,0 +1,845 @@
+"""Persistent index of the callables exported by the wrapped libraries.
+
+An index maps each exported name to the ``(module, qualname)`` it can be imported
+from. Indexes are stored under ``util.app_data_dir``, keyed by library name, library
+version and Python version, so that warm starts don't have to walk the library to
+learn which names exist; a change in any of those keys invalidates the index.
+
+Wrapper modules use the index to resolve their attributes on first access. The
+subpackages of a library have their own index (e.g. "sp.stats", for
+``oq.sp.stats``), built by walking only that subpackage.
+
+Usage:
+    from oq.index import get_index, resolve
+
+    module_name, qualname = get_index("np")["array"]
+    array = resolve((module_name, qualname))
+"""
+
+import json
+import os
+import pkgutil
+import sys
+import threading
+import time
+import warnings
+from contextlib import suppress
+from fnmatch import fnmatchcase
+from functools import lru_cache
+from importlib import import_module
+from importlib.abc import Loader, MetaPathFinder
+from importlib.machinery import ModuleSpec, PathFinder
+from importlib.util import find_spec
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from .. import config, usage
+
+Record = Tuple[str, str]  # (module, qualname)
+Index = Dict[str, Record]
+
+_indexes: Dict[str, Index] = {}
+_resolved: Dict[Record, object] = {}
+_reports: Dict[str, Dict[str, Any]] = {}
+_index_locks: Dict[str, threading.Lock] = {}
+_index_locks_lock = threading.Lock()
+_wrappers_lock = threading.Lock()
+_wrapper_mod_names: Dict[str, str] = {}  # wrapper module name -> library short name
+_pending_builds: Set[str] = set()
+
+
+def _matches(name: str, patterns) -> bool:
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def module_filter(root_name: str, walk_config: Dict[str, Any]) -> Callable[[str], bool]:
+    """Make the predicate telling which modules under root_name a walk visits.
+
+    Args:
+        root_name: Name of the module the walk starts from.
+        walk_config: Walk settings (see ``config.get_walk_config``).
+    """
+    max_depth = walk_config.get("max_depth")
+    private = walk_config.get("private", False)
+    include = walk_config.get("include") or ()
+    exclude = walk_config.get("exclude") or ()
+    subpackages = walk_config.get("subpackages")
+    if isinstance(subpackages, list):
+        allowed = tuple(f"{root_name}.{subpackage}" for subpackage in subpackages)
+    else:
+        allowed = None
+
+    def should_walk(module_name: str) -> bool:
+        if module_name == root_name:
+            return True
+        if not module_name.startswith(root_name + "."):
+            return False
+        parts = module_name[len(root_name) + 1 :].split(".")
+        if not private and any(part.startswith("_") for part in parts):
+            return False
+        if max_depth is not None and len(parts) > max_depth:
+            return False
+        if allowed is not None and not any(
+            module_name == name or module_name.startswith(name + ".")
+            for name in allowed
+        ):
+            return False
+        if include and not _matches(module_name, include):
+            return False
+        return not _matches(module_name, exclude)
+
+    return should_walk
+
+
+class WalkBudget:
+    """The time and memory a walk (import included) may take.
+
+    Usage:
+        budget = WalkBudget(time_budget=30, memory_budget=500)
+        ...
+        if budget.exceeded():
+            ...  # stop, budget.reason says why
+    """
+
+    # Reading the memory use costs more than the clock: only check it every so often
+    _MEMORY_CHECK_INTERVAL = 256
+
+    def __init__(
+        self, time_budget: Optional[float] = None, memory_budget: Optional[float] = None
+    ):
+        """
+        Args:
+            time_budget: Seconds, from now (None for no limit).
+            memory_budget: Megabytes of resident memory growth, from now (None for
+                no limit).
+        """
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.deadline = None if time_budget is None else time.monotonic() + time_budget
+        self.memory_limit = None
+        if memory_budget is not None:
+            from ..diagnostics import _rss
+
+            rss = _rss()
+            if rss is not None:
+                self.memory_limit = rss + memory_budget * 2**20
+        self.reason: Optional[str] = None
+        self._n_checks = 0
+
+    @classmethod
+    def from_config(cls, walk_config: Dict[str, Any]) -> "WalkBudget":
+        """The budget of walk settings (see ``config.get_walk_config``)."""
+        return cls(walk_config.get("time_budget"), walk_config.get("memory_budget"))
+
+    def exceeded(self) -> bool:
+        """Whether the budget is exceeded (then, ``reason`` says how)."""
+        if self.reason is not None:
+            return True
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.reason = f"time budget of {self.time_budget}s exceeded"
+        elif self.memory_limit is not None:
+            self._n_checks += 1
+            if self._n_checks % self._MEMORY_CHECK_INTERVAL == 0:
+                from ..diagnostics import _rss
+
+                if (_rss() or 0) > self.memory_limit:
+                    self.reason = f"memory budget of {self.memory_budget}MB exceeded"
+        return self.reason is not None
+
+
+def walk_callables(
+    module: ModuleType,
+    package: Optional[str] = None,
+    walk_config: Optional[Dict[str, Any]] = None,
+    subpackages: Iterable[ModuleType] = (),
+    budget: Optional[WalkBudget] = None,
+) -> Iterator[Tuple[str, str, object]]:
+    """Yield ``(module_name, attr_name, obj)`` for the callables found under module.
+
+    Like ``guide.tools.submodule_callables``, this visits the submodules of module
+    (depth first, in ``dir`` order) and collects the public callables whose
+    ``__module__`` is in package (module itself, by default), but it also tells
+    where each callable was found.
+
+    Each module is visited at most once. With walk_config (see
+    ``config.get_walk_config``), only the modules it allows are visited, and
+    attributes whose names match its ``exclude`` patterns aren't even accessed
+    (so a package importing its submodules lazily doesn't import excluded ones).
+
+    Args:
+        module: The module to walk.
+        package: Prefix of the ``__module__`` of the callables to collect.
+        walk_config: Walk settings (default: visit all the submodules).
+        subpackages: Submodules to walk after module (e.g. ones it doesn't expose
+            as attributes), if the walk of module didn't visit them.
+        budget: If given, the walk stops (early) once it's exceeded.
+    """
+    package = package or module.__name__
+    walk_config = walk_config or {}
+    should_walk = module_filter(module.__name__, walk_config)
+    exclude = walk_config.get("exclude") or ()
+    visited = set()
+
+    def _walk(mod):
+        visited.add(mod.__name__)
+        for attr_name in dir(mod):
+            if budget is not None and budget.exceeded():
+                return
+            if attr_name.startswith("_") or _matches(
+                f"{mod.__name__}.{attr_name}", exclude
+            ):
+                continue
+            try:
+                obj = getattr(mod, attr_name)
+            except Exception:
+                continue
+            if callable(obj) and (getattr(obj, "__module__", "") or "").startswith(
+                package
+            ):
+                yield mod.__name__, attr_name, obj
+            if (
+                isinstance(obj, ModuleType)
+                and obj.__name__ not in visited
+                and should_walk(obj.__name__)
+            ):
+                yield from _walk(obj)
+
+    for mod in (module, *subpackages):
+        if mod.__name__ not in visited and should_walk(mod.__name__):
+            yield from _walk(mod)
+
+
+def _import_subpackages(
+    module: ModuleType, subpackages, budget: Optional[WalkBudget] = None
+) -> List[ModuleType]:
+    """Import the allowlisted subpackages of module (see ``get_walk_config``), as
+    far as the budget allows."""
+    if subpackages == "__all__":
+        subpackages = getattr(module, "__all__", ())
+    modules = []
+    for subpackage_name in subpackages or ():
+        if budget is not None and budget.exceeded():
+            break
+        # Names of __all__ that aren't submodules are skipped
+        with suppress(ModuleNotFoundError):
+            modules.append(import_module(f"{module.__name__}.{subpackage_name}"))
+    return modules
+
+
+def _get_qualname(obj, qualname: str):
+    for part in qualname.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def _intern_record(module_name: str, qualname: str) -> Record:
+    # Records repeat the same module names many times over
+    return sys.intern(module_name), sys.intern(qualname)
+
+
+def _locate(obj, module_name: str, attr_name: str) -> Record:
+    """Where to import obj from: its own module and qualname, if they lead back to
+    it, or else the module it was found in."""
+    own_module = getattr(obj, "__module__", None)
+    qualname = getattr(obj, "__qualname__", None)
+    if isinstance(qualname, str) and own_module in sys.modules:
+        with suppress(Exception):
+            if _get_qualname(sys.modules[own_module], qualname) is obj:
+                return _intern_record(own_module, qualname)
+    return _intern_record(module_name, attr_name)
+
+
+def index_module(
+    module_name: str,
+    package: str,
+    walk_config: Dict[str, Any],
+    budget: Optional[WalkBudget] = None,
+) -> Index:
+    """Import and walk a module to build its index.
+
+    Names are the ``__name__`` of the callables, or the name they're exposed under
+    if their ``__name__`` is private (e.g. ``join = _join``), since wrappers don't
+    serve private names. When two callables share a name, the one exposed closest
+    to the top of the library wins (so ``array`` is ``numpy.array``, not
+    ``numpy.char.array``), and then the first one found.
+
+    Args:
+        module_name: Name of the module to walk (e.g. "statsmodels.api").
+        package: Prefix of the ``__module__`` of the callables to index.
+        walk_config: Walk settings (see ``config.get_walk_config``).
+        budget: Budget of the import and walk (default: the one of walk_config).
+            If it's exceeded, the walk stops, and the index is partial (see
+            ``budget.reason``).
+
+    Returns:
+        Dictionary mapping names to ``(module, qualname)`` records.
+    """
+    if budget is None:
+        budget = WalkBudget.from_config(walk_config)
+    module = import_module(module_name)
+    walk_config = dict(walk_config)
+    subpackages = _import_subpackages(module, walk_config.get("subpackages"), budget)
+    if subpackages:
+        # Resolve "__all__" to the names of the subpackages, for module_filter
+        prefix_length = len(module.__name__) + 1
+        walk_config["subpackages"] = [
+            subpackage.__name__[prefix_length:] for subpackage in subpackages
+        ]
+    seen = set()
+    index = {}
+    depths = {}
+    with warnings.catch_warnings():
+        # Walking touches deprecated aliases, which would warn on access
+        warnings.simplefilter("ignore")
+        for found_in, attr_name, obj in walk_callables(
+            module, package, walk_config, subpackages, budget
+        ):
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            name = getattr(obj, "__name__", None)
+            if isinstance(name, str) and name.startswith("_"):
+                name = attr_name  # Never private (see walk_callables)
+            depth = found_in.count(".")
+            if isinstance(name, str) and depth < depths.get(name, depth + 1):
+                index[name] = _locate(obj, found_in, attr_name)
+                depths[name] = depth
+    return index
+
+
+def build_index(mod_name: str, report: Optional[Dict[str, Any]] = None) -> Index:
+    """Import and walk a wrapped library, in this process, to build its index.
+
+    The walk is bounded by the walk settings of the library (see
+    ``config.get_walk_config``). To build an index without importing the library
+    into this process, see ``oq.index.build``.
+
+    Args:
+        mod_name: Short name of the library (e.g. "np"), or of one of its
+            subpackages (e.g. "sp.stats"), to only walk that subpackage.
+        report: If given, a walk cut short by its budget marks it "degraded" (see
+            ``get_report``).
+
+    Returns:
+        Dictionary mapping names to ``(module, qualname)`` records.
+    """
+    walk_config = config.get_walk_config(mod_name)
+    budget = WalkBudget.from_config(walk_config)
+    index = index_module(
+        config.get_wrapped_module(mod_name),
+        config.get_package(mod_name),
+        walk_config,
+        budget,
+    )
+    if report is not None and budget.reason is not None:
+        report.update(status="degraded", reason=budget.reason)
+    return index
+
+
+def _build(mod_name: str, report: Optional[Dict[str, Any]] = None) -> Index:
+    """Build the index of a library, in a worker process if configured to.
+
+    Libraries that are already imported are walked in this process, since that
+    costs no import.
+    """
+    if (
+        config.should_build_in_subprocess()
+        and not config.is_index_worker()
+        and config.get_wrapped_module(mod_name) not in sys.modules
+    ):
+        from .build import build_index_in_subprocess
+
+        return build_index_in_subprocess(mod_name, report)
+    return build_index(mod_name, report)
+
+
+def index_dir() -> str:
+    """Directory where the indexes are stored."""
+    from .. import util
+
+    return os.path.join(util.app_data_dir, "index")
+
+
+def index_key(mod_name: str) -> Optional[str]:
+    """Key identifying the index of a library, or None if it isn't installed."""
+    version = config.get_library_version(mod_name)
+    if version is None:
+        return None
+    python = "{}.{}".format(*sys.version_info[:2])
+    return f"{mod_name}-{version}-py{python}"
+
+
+def walk_digest(mod_name: str) -> str:
+    """Digest of the walk settings of a library, which the index depends on."""
+    import hashlib  # Only needed once an index is read (not by ``import oq``)
+
+    walk_config = json.dumps(config.get_walk_config(mod_name), sort_keys=True)
+    return hashlib.sha1(walk_config.encode()).hexdigest()[:12]
+
+
+def _load_stored(mod_name: str) -> Optional[Tuple[Index, Dict[str, Any]]]:
+    """The stored index of a library, and the report of its build, if valid."""
+    key = index_key(mod_name)
+    if key is None:
+        return None
+    with suppress(OSError, ValueError):
+        with open(os.path.join(index_dir(), f"{key}.json")) as f:
+            data = json.load(f)
+        if data.get("key") == key and data.get("walk") == walk_digest(mod_name):
+            index = {
+                name: _intern_record(*record) for name, record in data["names"].items()
+            }
+            return index, data.get("report") or _new_report()
+    return None
+
+
+def load_index(mod_name: str) -> Optional[Index]:
+    """Load the stored index of a library, if there's a valid one.
+
+    Returns:
+        The index, or None if there's none for the installed versions (and walk
+        settings).
+    """
+    stored = _load_stored(mod_name)
+    return None if stored is None else stored[0]
+
+
+def _is_replaced_by(filename: str, prefix: str, kept: str) -> bool:
+    """Whether storing the file kept (e.g. "np-2.1.3-py3.12.json") replaces a file:
+    one with the same prefix (e.g. "np-") and Python version, but another key.
+
+    Files of other Python versions are kept, for the interpreters sharing the app
+    data dir.
+    """
+    stem, ext = os.path.splitext(kept)
+    python = stem[stem.rindex("-py") :]
+    return (
+        filename != kept
+        and filename.startswith(prefix)
+        and filename.endswith(python + ext)
+    )
+
+
+def save_index(
+    mod_name: str, index: Index, report: Optional[Dict[str, Any]] = None
+) -> None:
+    """Store the index of a library (and the report of its build, see
+    ``get_report``), replacing indexes of other versions of the library (for the
+    same Python version)."""
+    key = index_key(mod_name)
+    if key is None:
+        return
+    data = {"key": key, "walk": walk_digest(mod_name), "names": index}
+    if report is not None:
+        data["report"] = report
+    dirpath = index_dir()
+    with suppress(OSError):
+        os.makedirs(dirpath, exist_ok=True)
+        filepath = os.path.join(dirpath, f"{key}.json")
+        tmp_filepath = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_filepath, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_filepath, filepath)
+        for filename in os.listdir(dirpath):
+            if _is_replaced_by(filename, f"{mod_name}-", f"{key}.json"):
+                os.remove(os.path.join(dirpath, filename))
+
+
+def _new_report() -> Dict[str, Any]:
+    return {"status": "complete", "reason": None, "time": None}
+
+
+def _describe(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def get_report(mod_name: str) -> Optional[Dict[str, Any]]:
+    """How the index of a library was obtained, in this process.
+
+    Returns:
+        None if the index wasn't loaded (or came from a snapshot). Otherwise a
+        dictionary with:
+
+        - ``status``: "complete"; "degraded" if the walk exceeded its budget (see
+          ``WalkBudget``), so the index is partial; "skipped" if the library
+          can't be imported (e.g. isn't installed); "failed" if its walk failed.
+        - ``reason``: Why it's degraded, skipped or failed (None if complete).
+        - ``time``: Seconds the build took.
+        - ``source``: "stored", "compiled" (from a generated module, see
+          ``oq.index.codegen``), or "built" (in this process).
+    """
+    return _reports.get(mod_name)
+
+
+def get_index(mod_name: str, build: bool = True) -> Optional[Index]:
+    """Get the index of a library: from memory, from disk, or by building it.
+
+    Builds happen in a worker process, unless the library is already imported or
+    ``build_indexes_in_subprocess`` is off in the import config.
+
+    Args:
+        mod_name: Short name of the library (e.g. "np"), or of one of its
+            subpackages (e.g. "sp.stats").
+        build: Whether to build the index if it's neither in memory nor on disk.
+
+    Returns:
+        The index (empty if the library can't be imported), or None if it wasn't
+        available and build is False.
+    """
+    if mod_name in _indexes:
+        return _indexes[mod_name]
+    with _index_locks_lock:
+        lock = _index_locks.setdefault(mod_name, threading.Lock())
+    # Only one thread gets (and maybe builds) the index of a library at a time
+    with lock:
+        if mod_name not in _indexes:
+            compiled = config.should_compile_indexes()
+            stored = None
+            if compiled:
+                from .codegen import load_index_module, write_index_module
+
+                stored = load_index_module(mod_name)
+            if stored is not None:
+                index, report = stored
+                report = {**report, "source": "compiled"}
+            else:
+                stored = _load_stored(mod_name)
+                if stored is not None:
+                    index, report = stored
+                    report = {**report, "source": "stored"}
+                elif not build:
+                    return None
+                else:
+                    index, report = _build_reported(mod_name)
+                if compiled and report["status"] in ("complete", "degraded"):
+                    write_index_module(mod_name, index, report)
+            _reports[mod_name] = report
+            _indexes[mod_name] = index
+    return _indexes[mod_name]
+
+
+def _build_reported(mod_name: str) -> Tuple[Index, Dict[str, Any]]:
+    """Build (and store) the index of a library, reporting how it went (see
+    ``get_report``); a walk that fails or is cut short warns."""
+    start = time.perf_counter()
+    report = _new_report()
+    if not config.is_library_available(mod_name):
+        # Not worth a worker process (see config.is_library_available)
+        report.update(status="skipped", reason="not installed", time=0.0)
+        return {}, {**report, "source": "built"}
+    try:
+        index = _build(mod_name, report)
+    except ImportError as error:
+        index = {}
+        report.update(status="skipped", reason=_describe(error))
+    except Exception as error:
+        index = {}
+        report.update(status="failed", reason=_describe(error))
+    report["time"] = time.perf_counter() - start
+    if report["status"] in ("complete", "degraded"):
+        save_index(mod_name, index, report)
+    if report["status"] in ("degraded", "failed"):
+        warnings.warn(
+            f"oq couldn't fully index {mod_name} ({report['status']}): "
+            f"{report['reason']}",
+            RuntimeWarning,
+        )
+    return index, {**report, "source": "built"}
+
+
+def _get_indexes(mod_names: List[str]) -> None:
+    for mod_name in mod_names:
+        with suppress(Exception):
+            get_index(mod_name)
+        _pending_builds.discard(mod_name)
+
+
+def build_in_background(mod_names: Iterable[str]) -> None:
+    """Get (building them if needed) the indexes of libraries in a background
+    thread, so that they're available later."""
+    with _index_locks_lock:
+        mod_names = [mod for mod in mod_names if mod not in _pending_builds]
+        _pending_builds.update(mod_names)
+    if mod_names:
+        threading.Thread(
+            target=_get_indexes, args=(mod_names,), name="oq-index", daemon=True
+        ).start()
+
+
+def available_names(mod_names: Iterable[str]) -> Set[str]:
+    """The names exported by libraries, as far as their indexes are available
+    without building them (in memory, on disk, or from a snapshot).
+
+    Missing indexes are built in the background (see ``build_in_background``), so
+    the names are complete on a later call. No library is imported. Private names
+    (which indexes built by older versions may have) are left out, since the
+    wrappers don't serve them.
+    """
+    names = set()
+    missing = []
+    for mod_name in mod_names:
+        library_index = get_index(mod_name, build=False)
+        if library_index is None:
+            missing.append(mod_name)
+        else:
+            names.update(name for name in library_index if not name.startswith("_"))
+    build_in_background(missing)
+    return names
+
+
+def resolve(record: Record, cache: bool = True, mod_name: Optional[str] = None):
+    """Import the object a ``(module, qualname)`` record points to.
+
+    Objects are cached by record, so that an object is only resolved once, however
+    many wrappers (and the root) it's reached from.
+
+    Args:
+        record: The ``(module, qualname)`` record.
+        cache: Whether to cache the object (memory-lean mode doesn't).
+        mod_name: The library the record comes from, if the functions of deferred
+            libraries should be deferred (see ``oq.plotting``).
+    """
+    if record in _resolved:
+        return _resolved[record]
+    if mod_name is not None:
+        from .. import plotting
+
+        deferred = plotting.deferred(mod_name, record)
+        if deferred is not None:
+            return deferred
+        if plotting.is_deferred(mod_name):
+            plotting.select_backend()
+    module_name, qualname = record
+    obj = _get_qualname(import_module(module_name), qualname)
+    if cache:
+        _resolved[record] = obj
+    return obj
+
+
+def is_deferred_callable(obj) -> bool:
+    """Whether a resolved object is a deferred callable (see ``oq.plotting``).
+
+    Those aren't bound into the wrappers or the root: once their module is
+    imported, accessing the name again resolves (and binds) the function itself.
+    """
+    from ..plotting import DeferredCallable
+
+    return isinstance(obj, DeferredCallable)
+
+
+def _in_package(module_name: str, package: str) -> bool:
+    return module_name == package or module_name.startswith(package + ".")
+
+
+def forget(package: str) -> None:
+    """Drop the cached objects of a package (and its subpackages)."""
+    from .. import plotting
+
+    for record in list(_resolved):
+        if _in_package(record[0], package):
+            del _resolved[record]
+    plotting.forget(package)
+
+
+def _top_level_callable(mod_name: str, name: str):
+    """The callable the wrapped module itself exposes under name, if any."""
+    with suppress(ImportError, ModuleNotFoundError):
+        obj = getattr(import_module(config.get_wrapped_module(mod_name)), name, None)
+        if (
+            callable(obj)
+            and getattr(obj, "__name__", None) == name
+            and (getattr(obj, "__module__", "") or "").startswith(
+                config.get_package(mod_name)
+            )
+        ):
+            return obj
+    return None
+
+
+def lookup(mod_name: str, name: str, cache: bool = True):
+    """Get the callable a library exports under name.
+
+    Uses the index if there is one. If not, a callable exposed by the wrapped
+    module itself is returned without walking the library; other names require
+    building the index.
+
+    Args:
+        mod_name: Short name of the library (e.g. "np").
+        name: The exported name.
+        cache: Whether to cache the resolved object (see ``resolve``).
+
+    Raises:
+        AttributeError: If the library doesn't export name.
+    """
+    index = get_index(mod_name, build=False)
+    if index is None:
+        # Deferred libraries aren't imported to look for it (see oq.plotting)
+        if config.split_scope(mod_name)[0] not in config.get_deferred_modules():
+            obj = _top_level_callable(mod_name, name)
+            if obj is not None:
+                return obj
+        index = get_index(mod_name)
+    if name not in index:
+        raise AttributeError(name)
+    try:
+        return resolve(index[name], cache=cache, mod_name=mod_name)
+    except ImportError as error:
+        raise AttributeError(name) from error
+
+
+def _package_locations(package: str) -> Optional[List[str]]:
+    """The directories of the submodules of a package, found without importing it
+    or its parents (whether they're imported or not), or None if it isn't one."""
+    top_level, *subpackages = package.split(".")
+    with suppress(ImportError, ValueError):
+        # A top-level package: finding its spec imports nothing
+        spec = find_spec(top_level)
+        for i in range(len(subpackages)):
+            if spec is None or spec.submodule_search_locations is None:
+                return None
+            name = ".".join([top_level, *subpackages[: i + 1]])
+            spec = PathFinder.find_spec(name, list(spec.submodule_search_locations))
+        if spec is not None and spec.submodule_search_locations is not None:
+            return list(spec.submodule_search_locations)
+    return None
+
+
+@lru_cache(maxsize=None)
+def _submodule_names(package: str) -> Tuple[str, ...]:
+    """The public submodules of a package, found without importing it (nor its
+    parents), so the same whatever is imported."""
+    locations = _package_locations(package)
+    if not locations:
+        return ()
+    return tuple(
+        module.name
+        for module in pkgutil.iter_modules(locations)
+        if not module.name.startswith("_")
+    )
+
+
+def scoped_wrapper(mod_name: str, module_name: str) -> ModuleType:
+    """Get the wrapper module of a subpackage of a library, making it if needed.
+
+    It works like the wrapper of the library, but with its own index: only the
+    subpackage is imported and walked.
+
+    Args:
+        mod_name: Short name of the subpackage (e.g. "sp.stats").
+        module_name: Name of the wrapper module (e.g. "oq.sp.stats").
+    """
+    with _wrappers_lock:
+        if module_name not in sys.modules:
+            wrapper = ModuleType(
+                module_name, f"{mod_name} ({config.get_wrapped_module(mod_name)})"
+            )
+            wrapper.__spec__ = _wrapper_spec(mod_name, module_name)
+            wrapper.__loader__ = _finder
+            sys.modules[module_name] = wrapper
+            wrapper.__getattr__, wrapper.__dir__ = lazy_module_attrs(
+                mod_name, module_name
+            )
+    return sys.modules[module_name]
+
+
+class WrapperFinder(MetaPathFinder, Loader):
+    """Import the wrappers of subpackages (e.g. ``import oq.sp.stats``).
+
+    Wrapper modules are packages with no directory, so this finder, on
+    ``sys.meta_path``, is the one to find their subpackages: the wrappers made by
+    ``scoped_wrapper``, as accessing them as attributes does.
+    """
+
+    def find_spec(self, fullname, path=None, target=None):
+        parent, _, name = fullname.rpartition(".")
+        mod_name = _wrapper_mod_names.get(parent)
+        if mod_name is None or name.startswith("_"):
+            return None
+        if name not in _submodule_names(config.get_subpackage_parent(mod_name)):
+            return None
+        return _wrapper_spec(f"{mod_name}.{name}", fullname)
+
+    def create_module(self, spec):
+        parent, _, name = spec.name.rpartition(".")
+        return scoped_wrapper(f"{_wrapper_mod_names[parent]}.{name}", spec.name)
+
+    def exec_module(self, module):
+        pass  # Attributes are resolved on access (see lazy_module_attrs)
+
+
+def _wrapper_spec(mod_name: str, module_name: str) -> ModuleSpec:
+    origin = config.get_wrapped_module(mod_name)
+    return ModuleSpec(module_name, _finder, origin=origin, is_package=True)
+
+
+_finder = next(
+    (finder for finder in sys.meta_path if isinstance(finder, WrapperFinder)), None
+)
+if _finder is None:
+    _finder = WrapperFinder()
+    sys.meta_path.append(_finder)
+
+
+def lazy_module_attrs(mod_name: str, module_name: str):
+    """Make the ``__getattr__`` and ``__dir__`` of a wrapper module.
+
+    Attributes are resolved on first access (see ``lookup``) and then bound into
+    the module, so later accesses are plain attribute lookups. In memory-lean mode
+    (see ``config.is_memory_lean``), they're resolved on every access instead, so
+    the wrapper holds no reference to the library.
+
+    Subpackages of the library are wrapped too (see ``scoped_wrapper``), so that
+    ``oq.sp.stats`` only imports and walks ``scipy.stats``. A subpackage (found
+    without importing anything, see ``_submodule_names``) takes precedence over a
+    name the index exports, so that what an attribute is doesn't depend on whether
+    the index is built yet.
+
+    ``__dir__`` lists the names of the index, and the subpackages, without
+    importing the library (see ``available_names``).
+
+    Usage (in a wrapper module):
+        __getattr__, __dir__ = lazy_module_attrs("np", __name__)
+    """
+    namespace = sys.modules[module_name].__dict__
+    # A package, so that its subpackages can be imported (see WrapperFinder)
+    namespace.setdefault("__path__", [])
+    _wrapper_mod_names[module_name] = mod_name
+
+    def __getattr__(name):
+        if name.startswith("_"):
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        if name in _submodule_names(config.get_subpackage_parent(mod_name)):
+            wrapper = scoped_wrapper(f"{mod_name}.{name}", f"{module_name}.{name}")
+            namespace[name] = wrapper
+            return wrapper
+        lean = config.is_memory_lean()
+        try:
+            obj = lookup(mod_name, name, cache=not lean)
+        except AttributeError:
+            raise AttributeError(
+                f"module {module_name!r} has no attribute {name!r}"
+            ) from None
+        usage.record(f"{mod_name}.{name}")
+        if not lean and not is_deferred_callable(obj):
+            namespace[name] = obj
+        return obj
+
+    def __dir__():
+        # Served from the index and the package's directory: nothing is imported
+        return sorted(
+            set(namespace)
+            | available_names([mod_name])
+            | set(_submodule_names(config.get_subpackage_parent(mod_name)))
+        )
+
+    return __getattr__, __dir__
@@ -0,0 +1,67 @@
+"""Build the indexes of the wrapped libraries, in parallel worker processes.
+
+Usage:
+    python -m oq.index build                  # the import plan, one job per CPU
+    python -m oq.index build --jobs 4 --all
+    python -m oq.index build --modules np torch --force
+    python -m oq.index generate               # compiled modules (see codegen)
+    python -m oq.index generate --modules np pd --force
+"""
+
+import argparse
+import sys
+
+from .. import config
+from .build import build_indexes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oq.index", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build and store indexes")
+    modules = build.add_mutually_exclusive_group()
+    modules.add_argument("--modules", nargs="+", help="Libraries to index")
+    modules.add_argument(
+        "--all", action="store_true", help="All libraries, not just the import plan"
+    )
+    build.add_argument(
+        "-j", "--jobs", type=int, help="Parallel workers (default: number of CPUs)"
+    )
+    build.add_argument(
+        "--force", action="store_true", help="Rebuild indexes that are stored"
+    )
+    generate_parser = commands.add_parser(
+        "generate", help="Generate the compiled index modules (compiled_indexes)"
+    )
+    generate_parser.add_argument(
+        "--modules", nargs="+", help="Libraries (default: the import plan)"
+    )
+    generate_parser.add_argument(
+        "--force", action="store_true", help="Regenerate modules that are up to date"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        from .codegen import generate
+
+        for path in generate(args.modules, force=args.force):
+            print(path)
+        return
+
+    mod_names = list(config.MODULE_MAPPING) if args.all else args.modules
+    results = build_indexes(mod_names, jobs=args.jobs, force=args.force)
+    for mod_name, result in results.items():
+        print(
+            f"{mod_name:<8}{result['status']:<16}{result['names']:>8} names"
+            f"{result['time']:>9.2f}s"
+        )
+        if result["error"]:
+            print(f"    {result['error'].splitlines()[-1]}")
+    if any(result["status"] == "failed" for result in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
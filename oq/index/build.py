@@ -0,0 +1,210 @@
+"""Build indexes out of process: each library is walked in a worker process.
+
+Learning the names of a library means importing all of it, and a process doesn't
+get that memory back. So the walk happens in a worker process instead: a fresh
+interpreter per library, which streams the records of the index back (one JSON
+list per line), and exits. This process only writes the indexes, and never
+imports a library just to list its names. Libraries are built in parallel, each
+in its own worker.
+
+Usage:
+    python -m oq.index build --jobs 4
+
+    from oq.index.build import build_indexes
+
+    build_indexes(["np", "pd", "torch"], jobs=3)
+"""
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .. import config
+from . import Index, Record, WalkBudget, _intern_record, index_key, index_module
+from . import _new_report, load_index, save_index
+
+# Exit status of a worker whose library can't be imported
+_NOT_IMPORTABLE = 3
+
+# Seconds a worker may run past its time budget (to stop its walk) before it's killed
+_KILL_GRACE = 5.0
+
+_WORKER_CODE = "from oq.index.build import worker_main; worker_main()"
+
+
+def worker_main(argv=None) -> None:
+    """Walk the library of a JSON spec (the first argument), and print its records.
+
+    The spec has the ``module`` to walk, the ``package`` of the callables to index
+    and the ``walk_config`` (see ``oq.index.index_module``). Each record is printed
+    as a ``[name, module, qualname]`` JSON line, and then the status of the walk,
+    as a ``{"status": ..., "reason": ...}`` JSON line.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    spec = json.loads(argv[0])
+    out = sys.stdout
+    # Whatever the library prints goes to stderr, not into the records
+    sys.stdout = sys.stderr
+    budget = WalkBudget.from_config(spec["walk_config"])
+    try:
+        index = index_module(
+            spec["module"], spec["package"], spec["walk_config"], budget
+        )
+    except ImportError as error:
+        print(f"{type(error).__name__}: {error}", file=sys.stderr)
+        sys.exit(_NOT_IMPORTABLE)
+    for name, (module_name, qualname) in index.items():
+        out.write(json.dumps([name, module_name, qualname]) + "\n")
+    status = "complete" if budget.reason is None else "degraded"
+    out.write(json.dumps({"status": status, "reason": budget.reason}) + "\n")
+    out.flush()
+
+
+def _worker_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env[config.INDEX_WORKER_ENV_VAR] = "1"
+    # Workers find the libraries (and oq) where this process does
+    env["PYTHONPATH"] = os.pathsep.join(path for path in sys.path if path)
+    return env
+
+
+def iter_records(
+    mod_name: str, report: Optional[Dict[str, Any]] = None
+) -> Iterator[Tuple[str, Record]]:
+    """Yield the ``(name, record)`` items of the index of a library, as a worker
+    process walks it.
+
+    The worker stops its walk when it exceeds the budget of the library (see
+    ``oq.index.WalkBudget``), and is killed if it's still running
+    ``_KILL_GRACE`` seconds after its time budget (e.g. stuck importing the
+    library): either way, the walk is "degraded" in report.
+
+    Raises:
+        ImportError: If the library can't be imported.
+        RuntimeError: If the worker fails otherwise.
+    """
+    walk_config = config.get_walk_config(mod_name)
+    spec = {
+        "module": config.get_wrapped_module(mod_name),
+        "package": config.get_package(mod_name),
+        "walk_config": walk_config,
+    }
+    command = [sys.executable, "-c", _WORKER_CODE, json.dumps(spec)]
+    time_budget = walk_config.get("time_budget")
+    # stderr goes to a file: a full pipe would block the worker before it's done
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        with subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=stderr, text=True, env=_worker_env()
+        ) as process:
+            killer = None
+            if time_budget is not None:
+                killer = threading.Timer(time_budget + _KILL_GRACE, process.kill)
+                killer.start()
+            try:
+                for line in process.stdout:
+                    # Skip anything else written to the stream (e.g. by C extensions)
+                    with suppress(ValueError, TypeError):
+                        item = json.loads(line)
+                        if isinstance(item, dict):
+                            if report is not None:
+                                report.update(item)
+                            continue
+                        name, module_name, qualname = item
+                        yield name, _intern_record(module_name, qualname)
+            finally:
+                if killer is not None:
+                    killer.cancel()
+        stderr.seek(0)
+        errors = stderr.read().strip()
+    if process.returncode == -signal.SIGKILL and time_budget is not None:
+        if report is not None:
+            report.update(
+                status="degraded",
+                reason=f"time budget of {time_budget}s exceeded (worker killed)",
+            )
+        return
+    if process.returncode == _NOT_IMPORTABLE:
+        raise ImportError(errors.splitlines()[-1] if errors else mod_name)
+    if process.returncode:
+        raise RuntimeError(f"The index worker of {mod_name!r} failed:\n{errors}")
+
+
+def build_index_in_subprocess(
+    mod_name: str, report: Optional[Dict[str, Any]] = None
+) -> Index:
+    """Build the index of a library in a worker process (see ``build_index``).
+
+    Args:
+        mod_name: Short name of the library (e.g. "np").
+        report: If given, updated with the status of the walk (see
+            ``oq.index.get_report``).
+
+    Raises:
+        ImportError: If the library can't be imported.
+        RuntimeError: If the worker fails otherwise.
+    """
+    return dict(iter_records(mod_name, report))
+
+
+def _build_and_store(mod_name: str, force: bool) -> Dict[str, Any]:
+    start = time.perf_counter()
+    result = {"status": "built", "names": 0, "time": 0.0, "error": None}
+    if index_key(mod_name) is None:
+        result["status"] = "not installed"
+        return result
+    index = None if force else load_index(mod_name)
+    if index is not None:
+        result["status"] = "stored"
+    else:
+        report = _new_report()
+        try:
+            index = build_index_in_subprocess(mod_name, report)
+        except (ImportError, RuntimeError) as error:
+            result["status"] = "failed"
+            result["error"] = str(error)
+            return result
+        report["time"] = time.perf_counter() - start
+        if report["status"] == "degraded":
+            result["status"] = "degraded"
+            result["error"] = report["reason"]
+        save_index(mod_name, index, report)
+    result["names"] = len(index)
+    result["time"] = time.perf_counter() - start
+    return result
+
+
+def build_indexes(
+    mod_names: Optional[Iterable[str]] = None,
+    jobs: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, Dict[str, Any]]:
+    """Build and store the indexes of libraries, in parallel worker processes.
+
+    Args:
+        mod_names: Short names of the libraries. Defaults to the import plan
+            (``config.get_import_order()``).
+        jobs: Maximum number of workers at a time (default: the number of CPUs).
+        force: Whether to rebuild the indexes that are already stored.
+
+    Returns:
+        Dictionary mapping each library to its result: ``status`` (one of
+        "built", "degraded", "stored", "not installed" and "failed"), number of
+        ``names``, ``time`` in seconds, and ``error`` (why it failed, or why the
+        walk was cut short if it's degraded).
+    """
+    if mod_names is None:
+        mod_names = config.get_import_order()
+    mod_names = list(mod_names)
+    jobs = max(1, jobs or os.cpu_count() or 1)
+    # Threads only wait on the workers, so they run the builds in parallel
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(lambda mod: _build_and_store(mod, force), mod_names)
+        return dict(zip(mod_names, results))
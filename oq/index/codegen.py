@@ -0,0 +1,202 @@
+"""Generated, byte-compiled index modules (the ``compiled_indexes`` option).
+
+Each library index (and the root table of the import plan) is written as a Python
+module, with the names and records as literal tuples, and compiled to a ``.pyc``.
+Loading one is then a plain cached import (the import system unmarshals the
+``.pyc``), instead of parsing JSON and interning every record. Objects stay lazy:
+the modules only hold where each name is defined, so they import no library.
+
+A module is named, like the JSON index, by the library version and Python
+version, and records the walk settings it was made with: a module that doesn't
+match the installed versions is regenerated from the index the next time it's
+loaded (or by ``python -m oq.index generate``).
+
+Usage:
+    python -m oq.index generate                 # the import plan
+    python -m oq.index generate --modules np pd --force
+"""
+
+import json
+import os
+import sys
+from contextlib import suppress
+from importlib.util import cache_from_source, module_from_spec
+from importlib.util import spec_from_file_location
+from typing import Any, Dict, List, Optional, Tuple
+
+from .. import config
+from . import Index, Record, _is_replaced_by, _new_report, index_key, walk_digest
+
+GENERATED_FORMAT = 1
+
+_HEADER = '"""{doc} (generated by oq.index.codegen: do not edit)."""\n\n'
+
+
+def generated_dir() -> str:
+    """Directory where the generated modules are stored."""
+    from .. import util
+
+    return os.path.join(util.app_data_dir, "generated")
+
+
+def _index_source(key: str, walk: str, index: Index, report: Dict[str, Any]) -> str:
+    names = sorted(index)
+    return (
+        _HEADER.format(doc=f"oq index of {key}")
+        + f"FORMAT = {GENERATED_FORMAT!r}\n"
+        + f"KEY = {key!r}\n"
+        + f"WALK = {walk!r}\n"
+        + f"REPORT = {report!r}\n"
+        + "NAMES = dict(zip(\n"
+        + f"    {tuple(names)!r},\n"
+        + f"    {tuple(tuple(index[name]) for name in names)!r},\n"
+        + "))\n"
+    )
+
+
+def _write_module(filename: str, source: str, stale_prefix: str) -> Optional[str]:
+    """Write and byte-compile a module (atomically, and only if the app data dir
+    is writable), replacing the modules of other versions (for the same Python
+    version)."""
+    import py_compile
+
+    dirpath = generated_dir()
+    path = os.path.join(dirpath, filename)
+    with suppress(OSError, py_compile.PyCompileError):
+        os.makedirs(dirpath, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+        py_compile.compile(path, cfile=cache_from_source(path), doraise=True)
+        for other in os.listdir(dirpath):
+            if _is_replaced_by(other, stale_prefix, filename):
+                other_path = os.path.join(dirpath, other)
+                os.remove(other_path)
+                with suppress(OSError):
+                    os.remove(cache_from_source(other_path))
+        return path
+    return None
+
+
+def _load_module(filename: str):
+    """Import a generated module (from its ``.pyc``, if it's up to date), or None."""
+    path = os.path.join(generated_dir(), filename)
+    name = "_oq_generated_" + "".join(
+        char if char.isalnum() else "_" for char in filename[: -len(".py")]
+    )
+    with suppress(OSError, SyntaxError, ImportError, ValueError):
+        spec = spec_from_file_location(name, path)
+        module = module_from_spec(spec)
+        spec.loader.exec_module(module)
+        if getattr(module, "FORMAT", None) == GENERATED_FORMAT:
+            return module
+    return None
+
+
+def write_index_module(
+    mod_name: str, index: Index, report: Optional[Dict[str, Any]] = None
+) -> Optional[str]:
+    """Generate the module of the index of a library.
+
+    Returns:
+        The path of the module, or None if it couldn't be written (e.g. the library
+        isn't installed, or the app data dir is read-only).
+    """
+    key = index_key(mod_name)
+    if key is None:
+        return None
+    report = {k: v for k, v in (report or {}).items() if k != "source"}
+    source = _index_source(key, walk_digest(mod_name), index, report)
+    return _write_module(f"{key}.py", source, f"{mod_name}-")
+
+
+def load_index_module(mod_name: str) -> Optional[Tuple[Index, Dict[str, Any]]]:
+    """The index of a library, and the report of its build, from its generated
+    module, if there's one for the installed versions (and walk settings)."""
+    key = index_key(mod_name)
+    if key is None:
+        return None
+    module = _load_module(f"{key}.py")
+    if module is None or module.KEY != key or module.WALK != walk_digest(mod_name):
+        return None
+    return module.NAMES, dict(module.REPORT) or _new_report()
+
+
+def _root_prefix(mod_names: List[str]) -> str:
+    return f"root-{'+'.join(mod_names)}-"
+
+
+def root_key(mod_names: List[str]) -> str:
+    """Key of the root table of an import plan: it changes with the plan, and with
+    the versions and walk settings of its libraries."""
+    import hashlib
+
+    keys = [(mod, index_key(mod), walk_digest(mod)) for mod in mod_names]
+    digest = hashlib.sha1(json.dumps(keys).encode()).hexdigest()[:12]
+    return "{}{}-py{}.{}".format(_root_prefix(mod_names), digest, *sys.version_info[:2])
+
+
+def write_root_module(
+    root: Dict[str, Tuple[str, Record]], mod_names: List[str]
+) -> Optional[str]:
+    """Generate the module of the root table of an import plan (each name mapped
+    to the library that wins it, and its record; see ``oq.symbols``).
+
+    Returns:
+        The path of the module, or None if it couldn't be written.
+    """
+    key = root_key(mod_names)
+    names = sorted(root)
+    source = (
+        _HEADER.format(doc=f"oq root table of {mod_names}")
+        + f"FORMAT = {GENERATED_FORMAT!r}\n"
+        + f"KEY = {key!r}\n"
+        + f"PLAN = {tuple(mod_names)!r}\n"
+        + "ROOT = dict(zip(\n"
+        + f"    {tuple(names)!r},\n"
+        + f"    {tuple((root[name][0], tuple(root[name][1])) for name in names)!r},"
+        + "\n"
+        + "))\n"
+    )
+    return _write_module(f"{key}.py", source, _root_prefix(mod_names))
+
+
+def load_root_module(mod_names: List[str]) -> Optional[Dict[str, Tuple[str, Record]]]:
+    """The root table of an import plan, from its generated module, if it's up to
+    date."""
+    key = root_key(mod_names)
+    module = _load_module(f"{key}.py")
+    if module is None or module.KEY != key or module.PLAN != tuple(mod_names):
+        return None
+    return module.ROOT
+
+
+def generate(mod_names: Optional[List[str]] = None, force: bool = False) -> List[str]:
+    """Generate the modules of libraries (building their indexes if needed), and
+    of the root table of the import plan.
+
+    Args:
+        mod_names: Short names of the libraries (default: the import plan).
+        force: Whether to regenerate the modules that are up to date.
+
+    Returns:
+        The paths of the modules written.
+    """
+    from .. import symbols
+    from . import get_index, get_report
+
+    plan = config.get_import_order()
+    mod_names = plan if mod_names is None else list(mod_names)
+    written = []
+    for mod_name in mod_names:
+        if not force and load_index_module(mod_name) is not None:
+            continue
+        path = write_index_module(mod_name, get_index(mod_name), get_report(mod_name))
+        if path is not None:
+            written.append(path)
+    if config.should_auto_import() and (force or load_root_module(plan) is None):
+        path = write_root_module(symbols.SymbolTable(plan).root(), plan)
+        if path is not None:
+            written.append(path)
+    return written
@@ -0,0 +1,14 @@
+"""IPython extension: tab completion of oq names that imports no library.
+
+The names come from ``dir`` (served from the indexes, see ``oq.__dir__``). With
+jedi, IPython also shows the type of the first matches, which means importing
+their libraries: the extension turns that off.
+
+Usage (in IPython, or a notebook):
+    %load_ext oq.ipython
+"""
+
+
+def load_ipython_extension(ipython) -> None:
+    """Turn off the type display of jedi completions (which imports libraries)."""
+    ipython.Completer.jedi_compute_type_timeout = 0
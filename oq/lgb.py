@@ -1,21 +1,6 @@
 """lgb (lightgbm)"""
 
-from contextlib import suppress
-from guide.tools import submodule_callables
+from oq.index import lazy_module_attrs
 
-with suppress(ImportError, ModuleNotFoundError):
-    import lightgbm
-
-    # Filter out unhashable items before using dict.fromkeys
-    callables = submodule_callables(lightgbm)
-    hashable_callables = []
-    for item in callables:
-        try:
-            hash(item)
-            hashable_callables.append(item)
-        except TypeError:
-            pass  # Skip unhashable items
-
-    for _ in list(dict.fromkeys(hashable_callables)):
-        if hasattr(_, "__name__"):
-            locals()[_.__name__] = _
+__getattr__, __dir__ = lazy_module_attrs("lgb", __name__)
+del lazy_module_attrs
@@ -0,0 +1,231 @@
+"""Background warm-up of the wrapped libraries.
+
+With ``background_warm_up`` in the import config, ``import oq`` returns right
+away, and the libraries of the import plan are imported and indexed in
+background threads, in the order of the plan.
+
+Usage:
+    import oq
+
+    oq.ready("pd").result()  # block until pandas is loaded
+    oq.wait_ready()  # block until all the scheduled libraries are loaded
+
+Accessing an attribute of a library that's still loading only waits for that
+library (the import system and the index serialize concurrent loads of a library).
+
+``unload`` does the reverse: it releases what oq holds of a library, and removes
+the library from ``sys.modules`` when it's safe.
+"""
+
+import gc
+import itertools
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Future, wait
+from importlib import import_module
+from importlib.machinery import EXTENSION_SUFFIXES
+from types import ModuleType
+from typing import Dict, Iterable, List, Optional
+
+from . import config, index
+
+_futures: Dict[str, Future] = {}
+_queue: "queue.PriorityQueue" = queue.PriorityQueue()
+_workers = []
+_lock = threading.Lock()
+_counter = itertools.count()
+
+
+def _load(mod_name: str) -> index.Index:
+    """Import and index a library (in the thread calling it)."""
+    from . import plotting
+
+    if plotting.is_deferred(mod_name):
+        # Importing (or walking) pyplot selects a backend: the configured one first
+        plotting.select_backend()
+    library_index = index.get_index(mod_name)
+    if library_index:
+        import_module(config.WRAPPED_MODULES[mod_name])
+    return library_index
+
+
+def _work():
+    while True:
+        _, _, mod_name, future = _queue.get()
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(_load(mod_name))
+            except BaseException as error:
+                future.set_exception(error)
+        _queue.task_done()
+
+
+def _ensure_workers(n_workers: int) -> None:
+    while len(_workers) < n_workers:
+        # Daemon threads, so that a pending load never holds up interpreter exit
+        worker = threading.Thread(target=_work, name="oq-loader", daemon=True)
+        worker.start()
+        _workers.append(worker)
+
+
+def ready(mod_name: str, priority: Optional[int] = None) -> Future:
+    """Get a future of the loading of a library, scheduling it if needed.
+
+    The result of the future is the index of the library (empty if the library
+    isn't installed). Loads are shared: a library is only loaded once.
+
+    Args:
+        mod_name: Short name of the library (e.g. "pd").
+        priority: Lower is loaded first. Defaults to before everything scheduled.
+    """
+    if mod_name not in config.MODULE_MAPPING:
+        raise ValueError(f"Unknown module {mod_name!r}")
+    with _lock:
+        if mod_name not in _futures:
+            _futures[mod_name] = Future()
+            if priority is None:
+                priority = -1
+            _queue.put((priority, next(_counter), mod_name, _futures[mod_name]))
+            _ensure_workers(config.get_warm_up_workers())
+        return _futures[mod_name]
+
+
+def warm_up(mod_names: Optional[Iterable[str]] = None) -> Dict[str, Future]:
+    """Schedule the loading of libraries, in order.
+
+    Args:
+        mod_names: Short names of the libraries, in priority order. Defaults to the
+            import plan (``config.get_import_order()``), without the libraries that
+            aren't installed.
+
+    Returns:
+        Dictionary of the futures of the libraries.
+    """
+    if mod_names is None:
+        mod_names = config.get_installed_import_order()
+    return {
+        mod_name: ready(mod_name, priority=i) for i, mod_name in enumerate(mod_names)
+    }
+
+
+def wait_ready(timeout: Optional[float] = None) -> bool:
+    """Block until all the scheduled libraries are loaded.
+
+    Args:
+        timeout: Maximum number of seconds to wait (default: no limit).
+
+    Returns:
+        True if all the loads are done, False if the timeout expired.
+    """
+    with _lock:
+        futures = list(_futures.values())
+    _, not_done = wait(futures, timeout=timeout)
+    return not not_done
+
+
+def _reset_after_fork() -> None:
+    """Start the loader afresh in a forked child.
+
+    Only the forking thread survives a fork, so the loader threads are gone, and
+    the locks they held may never be released: loads in progress are dropped
+    (they're scheduled again on demand), and the locks recreated.
+    """
+    global _queue, _lock
+    _queue = queue.PriorityQueue()
+    _lock = threading.Lock()
+    _workers.clear()
+    for mod_name, future in list(_futures.items()):
+        if not future.done():
+            del _futures[mod_name]
+    index._index_locks.clear()
+    index._index_locks_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _defining_module(value) -> Optional[str]:
+    """The name of the module a (module global) value comes from, if known."""
+    if isinstance(value, ModuleType):
+        return value.__name__
+    try:
+        module_name = getattr(value, "__module__", None)
+        if not isinstance(module_name, str):
+            module_name = type(value).__module__
+    except Exception:
+        return None
+    return module_name if isinstance(module_name, str) else None
+
+
+def referrer(package: str) -> Optional[str]:
+    """The name of a module (outside package) whose globals reference package.
+
+    Returns:
+        The name of the first such module found, or None if there is none.
+    """
+    for module_name, module in list(sys.modules.items()):
+        if module is None or index._in_package(module_name, package):
+            continue
+        for value in list(getattr(module, "__dict__", {}).values()):
+            defining_module = _defining_module(value)
+            if defining_module and index._in_package(defining_module, package):
+                return module_name
+    return None
+
+
+def _has_extension_modules(package: str) -> bool:
+    """Whether package has imported extension modules (most can't be imported
+    twice in a process, so they must stay in ``sys.modules``)."""
+    return any(
+        (getattr(module, "__file__", None) or "").endswith(tuple(EXTENSION_SUFFIXES))
+        for name, module in list(sys.modules.items())
+        if index._in_package(name, package)
+    )
+
+
+def unload(mod_name: str) -> List[str]:
+    """Release what oq holds of a library, and drop it from ``sys.modules`` if safe.
+
+    The wrapper module (``oq.<mod_name>``), the cached objects of the library and
+    its load are dropped. The modules of the library's package are then removed
+    from ``sys.modules``, unless it's not safe:
+
+    - a module outside of the package still references it (the root namespace of
+      oq included, see ``oq.unload``): the library would be imported twice.
+    - the package has extension modules, which can't be imported again.
+
+    Args:
+        mod_name: Short name of the library (e.g. "sk").
+
+    Returns:
+        The names of the modules removed from ``sys.modules`` (empty if it wasn't
+        safe).
+
+    Raises:
+        RuntimeError: If the library is still loading in the background.
+    """
+    if mod_name not in config.MODULE_MAPPING:
+        raise ValueError(f"Unknown module {mod_name!r}")
+    with _lock:
+        future = _futures.get(mod_name)
+        if future is not None and not future.done():
+            raise RuntimeError(f"{mod_name} is still loading")
+        _futures.pop(mod_name, None)
+    # The wrapper, and the wrappers of subpackages (see index.scoped_wrapper)
+    wrapper_name = f"{__package__}.{mod_name}"
+    for name in list(sys.modules):
+        if index._in_package(name, wrapper_name):
+            del sys.modules[name]
+    package = config.MODULE_MAPPING[mod_name].split(".")[0]
+    index.forget(package)
+
+    removed = []
+    if not _has_extension_modules(package) and referrer(package) is None:
+        removed = [name for name in sys.modules if index._in_package(name, package)]
+        for name in removed:
+            del sys.modules[name]
+    gc.collect()
+    return removed
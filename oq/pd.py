@@ -1,21 +1,6 @@
 """pandas"""
 
-from contextlib import suppress
-from guide.tools import submodule_callables
+from oq.index import lazy_module_attrs
 
-with suppress(ImportError, ModuleNotFoundError):
-    import pandas
-
-    # Filter out unhashable items before using dict.fromkeys
-    callables = submodule_callables(pandas)
-    hashable_callables = []
-    for item in callables:
-        try:
-            hash(item)
-            hashable_callables.append(item)
-        except TypeError:
-            pass  # Skip unhashable items
-
-    for _ in list(dict.fromkeys(hashable_callables)):
-        if hasattr(_, "__name__"):
-            locals()[_.__name__] = _
+__getattr__, __dir__ = lazy_module_attrs("pd", __name__)
+del lazy_module_attrs
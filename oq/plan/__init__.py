@@ -0,0 +1,279 @@
+"""Import plans: the libraries (and modules) that some scripts actually use.
+
+The analyzer parses scripts and packages (without running them) to find their uses
+of oq: ``oq.<name>`` (with ``import oq``, or ``import oq as q``), ``from oq import
+<name>``, and wrapper attributes (e.g. ``oq.np.linspace``, or ``np.linspace`` with
+``from oq import np``). It resolves the names with the symbol table (so with the
+``module_order`` precedence) and the wrapper indexes, and writes the libraries
+they come from, and the modules defining them, to a plan file.
+
+With the ``OQ_PLAN`` environment variable set to the path of a plan (or after
+``oq.use_plan(path)``), the import plan is narrowed to the libraries of the plan:
+no other library is imported implicitly (by eager population or warm-up). Since
+the libraries a name's owner beats are all in the plan too, the names the scripts
+use resolve to the same objects.
+
+Usage:
+    python -m oq.plan job.py mypackage/ -o job_plan.json
+    OQ_PLAN=job_plan.json python job.py
+"""
+
+import ast
+import json
+import os
+import warnings
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .. import config, index, symbols
+
+PLAN_FORMAT = 1
+
+
+class _UsageFinder(ast.NodeVisitor):
+    """Collect the oq names a module uses (see ``find_usages``)."""
+
+    def __init__(self):
+        # Local names bound to oq (""), or to a wrapper or its attributes (e.g. "np")
+        self.aliases: Dict[str, str] = {}
+        self.names: Dict[str, None] = {}
+        self.star_import = False
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            if alias.name == "oq" or alias.name.startswith("oq."):
+                if alias.asname:
+                    self.aliases[alias.asname] = alias.name[len("oq.") :]
+                else:
+                    self.aliases["oq"] = ""
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        if node.level or not node.module:
+            return
+        if node.module == "oq":
+            prefix = ""
+        elif node.module.startswith("oq."):
+            prefix = node.module[len("oq.") :]
+            # Only the wrappers, not oq's own modules (e.g. oq.config)
+            if prefix.split(".")[0] not in config.MODULE_MAPPING:
+                return
+        else:
+            return
+        for alias in node.names:
+            if alias.name == "*":
+                if prefix:
+                    self.names[prefix] = None
+                else:
+                    self.star_import = True
+                continue
+            name = f"{prefix}.{alias.name}" if prefix else alias.name
+            self.names[name] = None
+            if name.split(".")[0] in config.MODULE_MAPPING:
+                self.aliases[alias.asname or alias.name] = name
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        chain = []
+        base = node
+        while isinstance(base, ast.Attribute):
+            chain.append(base.attr)
+            base = base.value
+        if isinstance(base, ast.Name) and base.id in self.aliases:
+            parts = [self.aliases[base.id], *reversed(chain)]
+            self.names[".".join(part for part in parts if part)] = None
+        else:
+            self.generic_visit(node)
+
+
+def find_usages(
+    source: Union[str, bytes], filename: str = "<unknown>"
+) -> Tuple[List[str], bool]:
+    """Find the oq names a module uses (see the module docstring).
+
+    Args:
+        source: Source code of the module.
+        filename: Its file (for syntax errors).
+
+    Returns:
+        The names (root names, e.g. "read_csv", or wrapper attributes, e.g.
+        "np.linalg.norm"), and whether the module does ``from oq import *`` (which
+        uses names no analysis can tell).
+
+    Raises:
+        SyntaxError: If the source can't be parsed.
+    """
+    finder = _UsageFinder()
+    finder.visit(ast.parse(source, filename))
+    return list(finder.names), finder.star_import
+
+
+def iter_source_files(paths: Iterable[str]) -> Iterator[str]:
+    """Yield the Python files of paths (files, or directories, walked)."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for filename in sorted(filenames):
+                if filename.endswith(".py"):
+                    yield os.path.join(dirpath, filename)
+
+
+def _oq_names() -> Set[str]:
+    """The names of oq itself (e.g. "find"), which aren't library names."""
+    import oq
+
+    return (set(vars(oq)) - set(oq._root_records)) | set(oq._SUBMODULES)
+
+
+def _resolve_wrapper_name(parts: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    """The library (maybe scoped to a subpackage) and module of a wrapper name
+    (e.g. ["sp", "stats", "norm"]), or (None, None) if it can't be resolved."""
+    mod_name = parts[0]
+    attrs = parts[1:]
+    if not attrs:
+        return mod_name, None
+    # A subpackage (e.g. sp.stats) wins, as in the wrappers (see lazy_module_attrs)
+    parent = config.get_subpackage_parent(mod_name)
+    if attrs[0] not in index._submodule_names(parent):
+        record = index.get_index(mod_name).get(attrs[0])
+        return (mod_name, record[0]) if record is not None else (None, None)
+    scoped = f"{mod_name}.{attrs[0]}"
+    if len(attrs) == 1:
+        return scoped, f"{parent}.{attrs[0]}"
+    record = index.get_index(scoped).get(attrs[1])
+    return (scoped, record[0]) if record is not None else (None, None)
+
+
+def resolve_usages(names: Iterable[str]) -> Dict[str, Any]:
+    """Resolve names (see ``find_usages``) to the libraries and modules they need.
+
+    Returns:
+        Dictionary with the ``libraries`` (in import order, then the other
+        wrappers used), the ``modules`` defining the names, the ``names`` (each
+        mapped to its library, or scoped library, and module), and the
+        ``unresolved`` names. The names of oq itself (e.g. "find") are left out.
+    """
+    oq_names = _oq_names()
+    table = symbols.get_table() if config.should_auto_import() else None
+    resolved: Dict[str, Tuple[str, Optional[str]]] = {}
+    unresolved = []
+    for name in names:
+        parts = name.split(".")
+        if parts[0] in config.MODULE_MAPPING:
+            mod_name, module_name = _resolve_wrapper_name(parts)
+        elif parts[0] in oq_names:
+            continue
+        else:
+            owner = None if table is None else table.owner(parts[0])
+            record = None if owner is None else table.record(parts[0])
+            mod_name, module_name = owner, record and record[0]
+        if mod_name is None:
+            unresolved.append(name)
+        else:
+            resolved[name] = (mod_name, module_name)
+    used = {config.split_scope(mod_name)[0] for mod_name, _ in resolved.values()}
+    order = [*config.get_import_order(), *config.MODULE_MAPPING]
+    return {
+        "libraries": [mod for mod in dict.fromkeys(order) if mod in used],
+        "modules": sorted({module for _, module in resolved.values() if module}),
+        "names": {name: list(resolved[name]) for name in sorted(resolved)},
+        "unresolved": sorted(unresolved),
+    }
+
+
+def make_plan(paths: Iterable[str]) -> Dict[str, Any]:
+    """Make the plan of scripts and packages (see the module docstring).
+
+    Files that can't be read or parsed are skipped (with a warning). If a file
+    does ``from oq import *``, the plan keeps all the libraries of the import
+    plan (with ``star_import`` set).
+
+    Args:
+        paths: Python files, and directories (walked for Python files).
+
+    Returns:
+        The plan, as a JSON-serializable dictionary: the ``sources`` analyzed,
+        whether one does a ``star_import``, and what ``resolve_usages`` returns.
+    """
+    sources = []
+    names: Dict[str, None] = {}
+    star_import = False
+    for path in iter_source_files(paths):
+        try:
+            with open(path, "rb") as f:
+                file_names, file_star_import = find_usages(f.read(), path)
+        except (OSError, SyntaxError, ValueError) as error:
+            warnings.warn(f"Skipping {path}: {error}", RuntimeWarning)
+            continue
+        sources.append(path)
+        names.update(dict.fromkeys(file_names))
+        star_import = star_import or file_star_import
+    plan = {"format": PLAN_FORMAT, "sources": sources, "star_import": star_import}
+    plan.update(resolve_usages(names))
+    if star_import:
+        plan["libraries"] = list(
+            dict.fromkeys([*config.get_import_order(), *plan["libraries"]])
+        )
+    return plan
+
+
+def write_plan(plan: Dict[str, Any], path: str) -> None:
+    """Write a plan to path (atomically)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(plan, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def load_plan(path: str) -> Dict[str, Any]:
+    """Load a plan file.
+
+    Raises:
+        ValueError: If it isn't a plan (of this format), or names unknown
+            libraries.
+    """
+    with open(path) as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict) or plan.get("format") != PLAN_FORMAT:
+        raise ValueError(f"{path} isn't an oq plan (of format {PLAN_FORMAT})")
+    unknown = [mod for mod in plan["libraries"] if mod not in config.MODULE_MAPPING]
+    if unknown:
+        raise ValueError(f"The oq plan {path} has unknown libraries: {unknown}")
+    return plan
+
+
+def plan_config(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """The import config overrides that narrow the import plan to a plan's
+    libraries (see ``config.configure``).
+
+    Libraries are only disabled, never enabled: a library the scripts only use
+    explicitly (e.g. ``from oq import tf``) doesn't join the root namespace,
+    where it could win names from the others.
+    """
+    libraries = set(plan["libraries"])
+    return {
+        "enabled_modules": {
+            mod: False for mod in config.MODULE_MAPPING if mod not in libraries
+        }
+    }
+
+
+def load_configured_plan() -> bool:
+    """Narrow the import plan to the plan of the ``OQ_PLAN`` environment variable,
+    if any.
+
+    A plan that can't be read is ignored, with a warning.
+
+    Returns:
+        True if a plan was applied.
+    """
+    path = config.get_plan_path()
+    if not path:
+        return False
+    try:
+        plan = load_plan(path)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        warnings.warn(f"Ignoring the oq plan: {error}", RuntimeWarning)
+        return False
+    config.configure(**plan_config(plan))
+    return True
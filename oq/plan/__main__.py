@@ -0,0 +1,40 @@
+"""Write the import plan of scripts and packages (see ``oq.plan``).
+
+Usage:
+    python -m oq.plan job.py                     # to stdout
+    python -m oq.plan job.py mypackage/ -o job_plan.json
+
+Then run with ``OQ_PLAN=job_plan.json`` (or call ``oq.use_plan``).
+"""
+
+import argparse
+import json
+import sys
+
+from . import make_plan, write_plan
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oq.plan", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("paths", nargs="+", help="Python files, or directories")
+    parser.add_argument("-o", "--output", help="Plan file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    plan = make_plan(args.paths)
+    if args.output:
+        write_plan(plan, args.output)
+    else:
+        json.dump(plan, sys.stdout, indent=1)
+        print()
+    libraries = ", ".join(plan["libraries"]) or "no library"
+    print(f"{len(plan['names'])} names from {libraries}", file=sys.stderr)
+    if plan["unresolved"]:
+        print(f"Unresolved: {', '.join(plan['unresolved'])}", file=sys.stderr)
+    if plan["star_import"]:
+        print("`from oq import *` keeps the whole import plan", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
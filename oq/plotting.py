@@ -0,0 +1,134 @@
+"""Deferred plotting libraries: ``oq.plt.plot`` without importing pyplot.
+
+Importing ``matplotlib.pyplot`` (which seaborn does too) selects a backend, and may
+build the font cache: seconds that batch jobs that never plot shouldn't pay. So
+the functions of the deferred libraries (``deferred_modules``, by default plt and
+sns), in their wrappers and in the root, are ``DeferredCallable`` objects until
+their module is imported: the module is imported by the first call. Classes (e.g.
+``oq.sns.FacetGrid``), whose identity matters (e.g. to ``isinstance``), are
+resolved on access, as are the objects of modules that are already imported.
+
+Deferred callables aren't bound into the wrappers or the root, so once their
+module is imported (by a first call, or otherwise), accessing the name again gives
+the function itself (e.g. ``oq.plt.subplots is matplotlib.pyplot.subplots``).
+
+With ``plot_backend`` set (e.g. to "agg"), that backend is selected before oq
+imports a deferred library, so headless jobs never load an interactive one.
+
+Usage:
+    python -m oq.warm fonts  # build the font cache (e.g. in an image build)
+"""
+
+import os
+import sys
+import threading
+from typing import Dict, Optional
+
+from . import config
+from .index import Record
+
+_deferred: Dict[Record, "DeferredCallable"] = {}
+_backend_lock = threading.Lock()
+_backend_selected = False
+
+
+class DeferredCallable:
+    """A function of a deferred library, imported when it's first called.
+
+    Its name and module are those of the function; its other attributes (but
+    ``__doc__``) are those of the function, which accessing them imports.
+    """
+
+    def __init__(self, mod_name: str, record: Record):
+        self._mod_name = mod_name
+        self._record = record
+        self._obj = None
+        module_name, qualname = record
+        self.__module__ = module_name
+        self.__qualname__ = qualname
+        self.__name__ = qualname.rpartition(".")[2]
+
+    def resolve(self):
+        """The function (importing its module if needed)."""
+        if self._obj is None:
+            from .index import resolve
+
+            select_backend()
+            self._obj = resolve(self._record)
+        return self._obj
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name in ("_mod_name", "_record", "_obj"):
+            raise AttributeError(name)
+        return getattr(self.resolve(), name)
+
+    def __repr__(self):
+        state = "deferred" if self._obj is None else "resolved"
+        return f"<{state} {self._mod_name} function {'.'.join(self._record)}>"
+
+
+def is_deferred(mod_name: str) -> bool:
+    """Check if a library (or one of its subpackages) is deferred."""
+    return config.split_scope(mod_name)[0] in config.get_deferred_modules()
+
+
+def _is_function_name(qualname: str) -> bool:
+    # Classes are CamelCase (see the module docstring)
+    return qualname.rpartition(".")[2][:1].islower()
+
+
+def deferred(mod_name: str, record: Record) -> Optional[DeferredCallable]:
+    """The deferred callable of a record of a library, or None if the object
+    should be resolved now (see the module docstring)."""
+    if (
+        not is_deferred(mod_name)
+        or record[0] in sys.modules
+        or not _is_function_name(record[1])
+    ):
+        return None
+    if record not in _deferred:
+        _deferred.setdefault(record, DeferredCallable(mod_name, record))
+    return _deferred[record]
+
+
+def forget(package: str) -> None:
+    """Drop the deferred callables of a package (and its subpackages)."""
+    for record in list(_deferred):
+        if record[0] == package or record[0].startswith(package + "."):
+            del _deferred[record]
+
+
+def select_backend() -> None:
+    """Select the ``plot_backend`` of the config, if any, once per process.
+
+    Only matplotlib itself is imported (not pyplot), so that pyplot starts with
+    that backend.
+    """
+    global _backend_selected
+    backend = config.get_plot_backend()
+    if backend is None or _backend_selected:
+        return
+    with _backend_lock:
+        if not _backend_selected:
+            import matplotlib
+
+            matplotlib.use(backend)
+            _backend_selected = True
+
+
+def build_font_cache() -> str:
+    """Build matplotlib's font cache (if it isn't built yet).
+
+    Returns:
+        The path of the font cache.
+    """
+    import matplotlib
+    from matplotlib import font_manager
+
+    return os.path.join(
+        matplotlib.get_cachedir(),
+        f"fontlist-v{font_manager.FontManager.__version__}.json",
+    )
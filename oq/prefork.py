@@ -0,0 +1,86 @@
+"""Preloading for prefork servers (gunicorn, uwsgi, ...).
+
+Call ``oq.preload()`` in the master process, before it forks its workers: the
+libraries of the import plan are imported, the root names resolved, and the
+resulting objects moved out of the reach of the garbage collector
+(``gc.freeze``), so that the workers share their memory pages copy-on-write,
+instead of each importing the libraries again.
+
+Libraries that start native thread pools (``FORK_UNSAFE_MODULES``) are indexed,
+but not imported: only the forking thread survives a fork, so a worker would
+inherit pools without their threads (and can deadlock using them). The workers
+import them after the fork.
+
+Usage (e.g. in a gunicorn config file):
+    import oq
+
+    def on_starting(server):
+        oq.preload("ml")
+"""
+
+import gc
+import os
+import threading
+import warnings
+from contextlib import suppress
+from typing import Iterable, List, Optional, Tuple
+
+from . import index, loader
+
+# Libraries with native thread pools that don't survive a fork
+FORK_UNSAFE_MODULES = ("torch", "tf")
+
+
+def native_thread_count() -> Optional[int]:
+    """The number of threads of this process, native ones included (Linux only).
+
+    Returns:
+        The number of threads, or None if it can't be known.
+    """
+    with suppress(OSError):
+        return len(os.listdir("/proc/self/task"))
+    return None
+
+
+def preload_libraries(
+    mod_names: Iterable[str], fork_unsafe: bool = False
+) -> Tuple[List[str], List[str]]:
+    """Index and import libraries, in the calling thread.
+
+    Loads scheduled in the background are waited for first: forking while one
+    is in progress would leave the child with its locks held.
+
+    Args:
+        mod_names: Short names of the libraries.
+        fork_unsafe: Import the ``FORK_UNSAFE_MODULES`` too (only indexed if not).
+
+    Returns:
+        The libraries imported, and the fork-unsafe libraries skipped.
+    """
+    loader.wait_ready()
+    loaded, skipped = [], []
+    for mod_name in mod_names:
+        if mod_name in FORK_UNSAFE_MODULES and not fork_unsafe:
+            index.get_index(mod_name)
+            skipped.append(mod_name)
+            continue
+        with suppress(ImportError):
+            if loader._load(mod_name):
+                loaded.append(mod_name)
+    return loaded, skipped
+
+
+def freeze() -> None:
+    """Collect garbage, then freeze all the objects left (see ``gc.freeze``).
+
+    Warns if native threads are running: the forked workers won't have them.
+    """
+    n_threads = native_thread_count()
+    if n_threads is not None and n_threads > threading.active_count():
+        warnings.warn(
+            f"{n_threads - threading.active_count()} native threads are running "
+            "before fork: the forked workers won't have them",
+            RuntimeWarning,
+        )
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,42 @@
+"""Write the import-cost report of the wrapped libraries as JSON.
+
+Usage:
+    python -m oq.profile                      # the import plan, to stdout
+    python -m oq.profile -o report.json --all
+    python -m oq.profile --modules np pd --memory tracemalloc
+"""
+
+import argparse
+import json
+import sys
+
+from . import config
+from .diagnostics import MEMORY_MEASURES, import_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oq.profile", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("-o", "--output", help="File to write to (default: stdout)")
+    modules = parser.add_mutually_exclusive_group()
+    modules.add_argument("--modules", nargs="+", help="Libraries, in import order")
+    modules.add_argument(
+        "--all", action="store_true", help="All libraries, not just the import plan"
+    )
+    parser.add_argument("--memory", choices=MEMORY_MEASURES, default="rss")
+    args = parser.parse_args(argv)
+
+    mod_names = list(config.MODULE_MAPPING) if args.all else args.modules
+    report = import_report(mod_names, memory=args.memory)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""Search the names of the wrapped libraries, without importing them.
+
+The search runs over the indexes of the libraries of the import plan (see
+``oq.index``): the names are kept sorted, and sorted reversed, so that prefix and
+suffix patterns are two bisections, and a trigram index narrows down infix
+patterns and ranks fuzzy matches (to well under a millisecond). The trigram index
+is built once per search, in a background thread started with it: about a second
+per 100k names, which only infix and fuzzy queries made meanwhile wait for.
+
+Usage:
+    import oq
+
+    oq.find("read_")  # names starting with read_ (like read_csv, read_parquet)
+    oq.find("*Regressor")  # glob patterns
+    oq.find("raed_parquet", fuzzy=True)  # the closest names first
+
+Each match tells which library exports the name, from which module, and which
+library wins the name under ``module_order`` (i.e. what ``oq.<name>`` is).
+"""
+
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from fnmatch import translate
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from . import config, index
+from .index import Index, Record
+
+_GLOB_CHARS = "*?["
+_MAX_CHAR = chr(0x10FFFF)
+# Fuzzy search counts the trigrams of at most this many names (beyond the two
+# rarest trigrams), and then ranks the best this many candidates
+_FUZZY_BUDGET = 5_000
+_FUZZY_CANDIDATES = 50
+
+
+class Match(NamedTuple):
+    """A library exporting a name."""
+
+    name: str
+    library: str  # short name of the library, e.g. "pd"
+    module: str
+    qualname: str
+    winner: str  # the library that wins the name under module_order
+
+
+def _trigrams(name: str) -> set:
+    return {name[i : i + 3] for i in range(len(name) - 2)}
+
+
+def _literal_chunks(pattern: str) -> List[str]:
+    """The literal parts of a glob pattern (the parts between wildcards)."""
+    chunks, chunk, i = [], "", 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char in _GLOB_CHARS:
+            chunks.append(chunk)
+            chunk = ""
+            if char == "[":
+                # Skip the character class
+                end = pattern.find("]", i + 2)
+                i = end if end != -1 else len(pattern)
+        else:
+            chunk += char
+        i += 1
+    chunks.append(chunk)
+    return chunks
+
+
+class SymbolSearch:
+    """Sorted (and trigram-indexed) names of libraries, to search them fast."""
+
+    def __init__(self, indexes: Dict[str, Index]):
+        """
+        Args:
+            indexes: The index of each library, in import order (so the last
+                library exporting a name wins it).
+        """
+        # name -> [(library, record)], the winner first
+        self._exports: Dict[str, List[Tuple[str, Record]]] = {}
+        for mod_name, library_index in reversed(list(indexes.items())):
+            for name, record in library_index.items():
+                self._exports.setdefault(name, []).append((mod_name, record))
+        self._names = sorted(self._exports)
+        self._reversed_names = sorted(name[::-1] for name in self._names)
+        self._trigram_index: Optional[Dict[str, List[int]]] = None
+        # Built now (see the module docstring), so that no query pays for it later
+        self._trigram_thread = threading.Thread(
+            target=self._build_trigram_index, name="oq-trigrams", daemon=True
+        )
+        self._trigram_thread.start()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def matches(self, names: Iterable[str]) -> List[Match]:
+        """The matches of names: one per library exporting each name."""
+        matches = []
+        for name in names:
+            exports = self._exports[name]
+            winner = exports[0][0]
+            for mod_name, (module_name, qualname) in exports:
+                matches.append(Match(name, mod_name, module_name, qualname, winner))
+        return matches
+
+    def _range(self, names: List[str], prefix: str) -> Tuple[int, int]:
+        return bisect_left(names, prefix), bisect_left(names, prefix + _MAX_CHAR)
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """The names starting with prefix, sorted."""
+        start, stop = self._range(self._names, prefix)
+        return self._names[start:stop]
+
+    def with_suffix(self, suffix: str) -> List[str]:
+        """The names ending with suffix, sorted."""
+        start, stop = self._range(self._reversed_names, suffix[::-1])
+        return sorted(name[::-1] for name in self._reversed_names[start:stop])
+
+    def _build_trigram_index(self) -> None:
+        trigram_index: Dict[str, List[int]] = {}
+        for i, name in enumerate(self._names):
+            for trigram in _trigrams(name.lower()):
+                trigram_index.setdefault(trigram, []).append(i)
+        self._trigram_index = trigram_index
+
+    def _trigrams_index(self) -> Dict[str, List[int]]:
+        """Trigram -> positions (in the sorted names) of the names containing it,
+        in lower case (waiting for it to be built, see the module docstring)."""
+        self._trigram_thread.join()
+        return self._trigram_index
+
+    def containing(self, substring: str) -> Iterator[str]:
+        """The names containing substring, sorted."""
+        trigrams = _trigrams(substring.lower())
+        if not trigrams:
+            # Too short to narrow down with trigrams
+            return (name for name in self._names if substring in name)
+        trigram_index = self._trigrams_index()
+        # Names are checked anyway, so the rarest trigram is enough to narrow down
+        rarest = min((trigram_index.get(t, []) for t in trigrams), key=len)
+        return (self._names[i] for i in rarest if substring in self._names[i])
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        """The names matching a glob pattern (or starting with pattern, if it has no
+        wildcard), sorted."""
+        if not any(char in pattern for char in _GLOB_CHARS):
+            return iter(self.with_prefix(pattern))
+        chunks = _literal_chunks(pattern)
+        prefix, suffix = chunks[0], chunks[-1]
+        if prefix or suffix:
+            prefix_range = self._range(self._names, prefix)
+            suffix_range = self._range(self._reversed_names, suffix[::-1])
+            if not suffix or (
+                prefix
+                and prefix_range[1] - prefix_range[0]
+                <= suffix_range[1] - suffix_range[0]
+            ):
+                candidates = self.with_prefix(prefix)
+                # Cheaper than the regex, for the many prefix matches
+                candidates = (name for name in candidates if name.endswith(suffix))
+            else:
+                candidates = self.with_suffix(suffix)
+        else:
+            candidates = self.containing(max(chunks, key=len))
+        match = re.compile(translate(pattern)).match
+        return (name for name in candidates if match(name))
+
+    def fuzzy(self, query: str, limit: int = 10) -> List[str]:
+        """The names closest to query (sharing the most trigrams with it, in lower
+        case), the closest first."""
+        query = query.lower()
+        trigrams = _trigrams(query)
+        if not trigrams:
+            return self.with_prefix(query)[:limit]
+        trigram_index = self._trigrams_index()
+        # Count the shared trigrams of the rarest trigrams' names, within a budget
+        # (common trigrams have huge postings, and tell little apart)
+        postings = sorted((trigram_index.get(t, []) for t in trigrams), key=len)
+        shared = Counter()
+        n_counted = 0
+        for i, positions in enumerate(postings):
+            if i >= 2 and n_counted + len(positions) > _FUZZY_BUDGET:
+                break
+            shared.update(positions)
+            n_counted += len(positions)
+
+        def similarity(position):
+            # Jaccard similarity of the trigram sets
+            name_trigrams = _trigrams(self._names[position].lower())
+            n_shared = len(trigrams & name_trigrams)
+            return n_shared / (len(trigrams) + len(name_trigrams) - n_shared)
+
+        # The names sharing the most trigrams (and, if that's few, one less)
+        max_shared = max(shared.values(), default=0)
+        candidates = [i for i, n in shared.items() if n >= max_shared - 1]
+        if len(candidates) < limit:
+            candidates = list(shared)
+        if len(candidates) > _FUZZY_CANDIDATES:
+            candidates = heapq.nlargest(_FUZZY_CANDIDATES, candidates, key=shared.get)
+        best = sorted(candidates, key=lambda i: (-similarity(i), self._names[i]))
+        return [self._names[i] for i in best[:limit]]
+
+    def find(
+        self, pattern: str, fuzzy: bool = False, limit: Optional[int] = None
+    ) -> List[Match]:
+        """Find the names matching pattern (see ``oq.search.find``)."""
+        if fuzzy:
+            names = self.fuzzy(pattern, limit or 10)
+        else:
+            names = islice(self.glob(pattern), limit)
+        return self.matches(names)
+
+
+_searches: Dict[Tuple[str, ...], SymbolSearch] = {}
+_searches_lock = threading.Lock()
+
+
+def get_search(mod_names: Optional[List[str]] = None) -> SymbolSearch:
+    """Get the search structure of the names of an import plan (made once per plan).
+
+    Missing indexes are built (in worker processes, see ``oq.index.build``), but
+    no library is imported.
+
+    Args:
+        mod_names: Short names of the libraries, in import order. Defaults to the
+            import plan (``config.get_import_order()``).
+    """
+    if mod_names is None:
+        mod_names = config.get_import_order()
+    key = tuple(mod_names)
+    with _searches_lock:
+        if key not in _searches:
+            indexes = {mod_name: index.get_index(mod_name) for mod_name in key}
+            _searches[key] = SymbolSearch(indexes)
+        return _searches[key]
+
+
+def find(
+    pattern: str,
+    fuzzy: bool = False,
+    limit: Optional[int] = None,
+    mod_names: Optional[List[str]] = None,
+) -> List[Match]:
+    """Find which libraries export the names matching pattern.
+
+    Args:
+        pattern: A name prefix (``"read_"``), or a glob pattern (``"*Regressor"``,
+            ``"read_*[ql]"``), matched case-sensitively. With fuzzy, a name
+            approximately spelled.
+        fuzzy: Whether to find the names closest to pattern instead.
+        limit: Maximum number of names (default: all of them, or 10 with fuzzy).
+        mod_names: Short names of the libraries to search, in import order.
+            Defaults to the import plan.
+
+    Returns:
+        One ``Match`` per (name, library exporting it): sorted by name, or from the
+        closest name with fuzzy, and with the library winning the name first.
+    """
+    return get_search(mod_names).find(pattern, fuzzy=fuzzy, limit=limit)
@@ -0,0 +1,136 @@
+"""Snapshots of the resolution tables, for read-only deployments.
+
+A snapshot holds, in one JSON file, the index of each wrapped library and the
+root table of the import plan (each root name mapped to the library that wins it,
+and the module and qualname of its object), along with the versions (of the
+libraries and of Python) they were made for.
+
+With the ``OQ_SNAPSHOT`` environment variable set to the path of a snapshot,
+``import oq`` loads it instead of reading (or building, and writing) indexes: no
+library is walked, and nothing is written. If the installed versions don't match
+the snapshot's, it's ignored (with a warning), and oq works as it does without
+one.
+
+Usage:
+    python -m oq.freeze -o /app/oq_snapshot.json   # when building the image
+    OQ_SNAPSHOT=/app/oq_snapshot.json python app.py
+"""
+
+import json
+import os
+import sys
+import warnings
+from typing import Any, Dict, List, Optional
+
+from . import config, index, symbols
+
+SNAPSHOT_FORMAT = 1
+
+
+def _python_version() -> str:
+    return "{}.{}".format(*sys.version_info[:2])
+
+
+def make_snapshot(mod_names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Make a snapshot of the indexes of libraries, and of the root table.
+
+    Args:
+        mod_names: Short names of the libraries to index. Defaults to all of them
+            (so that any wrapper works from the snapshot).
+
+    Returns:
+        The snapshot, as a JSON-serializable dictionary.
+    """
+    if mod_names is None:
+        mod_names = list(config.MODULE_MAPPING)
+    plan = config.get_import_order() if config.should_auto_import() else []
+    mod_names = list(dict.fromkeys([*mod_names, *plan]))
+    table = symbols.SymbolTable(plan)
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "python": _python_version(),
+        "versions": {mod: config.get_library_version(mod) for mod in mod_names},
+        "indexes": {mod: index.get_index(mod) for mod in mod_names},
+        "plan": plan,
+        "root": {
+            name: [owner, *record] for name, owner, record in sorted(table.items())
+        },
+    }
+
+
+def write_snapshot(snapshot: Dict[str, Any], path: str) -> None:
+    """Write a snapshot to path (atomically)."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def snapshot_mismatches(snapshot: Dict[str, Any]) -> List[str]:
+    """The reasons why a snapshot doesn't fit this environment (none if it does)."""
+    if snapshot.get("format") != SNAPSHOT_FORMAT:
+        return [f"format {snapshot.get('format')!r} (expected {SNAPSHOT_FORMAT})"]
+    mismatches = []
+    python = _python_version()
+    if snapshot["python"] != python:
+        mismatches.append(f"python {snapshot['python']} (installed {python})")
+    for mod_name, version in snapshot["versions"].items():
+        installed = config.get_library_version(mod_name)
+        if installed != version:
+            mismatches.append(f"{mod_name} {version} (installed {installed})")
+    return mismatches
+
+
+def install_snapshot(snapshot: Dict[str, Any]) -> None:
+    """Use the indexes (and, if the import plan is the same, the root table) of a
+    snapshot, instead of reading or building them."""
+    for mod_name, library_index in snapshot["indexes"].items():
+        index._indexes[mod_name] = {
+            name: index._intern_record(*record)
+            for name, record in library_index.items()
+        }
+    plan = config.get_import_order() if config.should_auto_import() else []
+    if plan == snapshot["plan"]:
+        root = {
+            name: (owner, index._intern_record(module_name, qualname))
+            for name, (owner, module_name, qualname) in snapshot["root"].items()
+        }
+        symbols.install_table(symbols.SymbolTable.from_root(plan, root))
+
+
+def load_snapshot(path: str) -> Dict[str, Any]:
+    """Load and install a snapshot (see ``install_snapshot``).
+
+    Raises:
+        ValueError: If the snapshot doesn't fit the installed versions.
+    """
+    with open(path) as f:
+        snapshot = json.load(f)
+    mismatches = snapshot_mismatches(snapshot)
+    if mismatches:
+        raise ValueError(
+            f"The oq snapshot {path} doesn't fit this environment: "
+            + ", ".join(mismatches)
+        )
+    install_snapshot(snapshot)
+    return snapshot
+
+
+def load_configured_snapshot() -> bool:
+    """Load the snapshot of the ``OQ_SNAPSHOT`` environment variable, if any.
+
+    A snapshot that can't be read, or doesn't fit the installed versions, is
+    ignored, with a warning.
+
+    Returns:
+        True if a snapshot was loaded.
+    """
+    path = config.get_snapshot_path()
+    if not path:
+        return False
+    try:
+        load_snapshot(path)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        warnings.warn(f"Ignoring the oq snapshot: {error}", RuntimeWarning)
+        return False
+    return True
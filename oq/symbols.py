@@ -0,0 +1,174 @@
+"""The symbol table: the root names of all the libraries of the import plan.
+
+The table maps each name to the library that wins it under ``module_order`` (the
+last library exporting it) and to the ``(module, qualname)`` record of its object.
+It's built in a single pass over the library indexes, from the last library of the
+plan to the first, and only as far as needed: finding the owner of a name only
+loads the indexes of the libraries from the end of the plan down to the owner.
+
+Records are shared: the same record in several libraries (i.e. the same object)
+is stored, and resolved (see ``index.resolve``), once.
+
+Usage:
+    from oq.symbols import get_table
+
+    table = get_table()
+    table.owner("read_csv")  # 'pd'
+    table.get("read_csv")  # pandas.read_csv
+"""
+
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import config, index
+from .index import Record
+
+
+class SymbolTable:
+    """Names of the libraries of an import plan, and which library wins each."""
+
+    def __init__(self, mod_names: List[str]):
+        self.mod_names = list(mod_names)
+        self._owners: Dict[str, str] = {}
+        self._records: Dict[str, Record] = {}
+        self._canonical_records: Dict[Record, Record] = {}
+        # Libraries from _n_merged to the end of mod_names are merged
+        self._n_merged = len(self.mod_names)
+        self._lock = threading.RLock()
+        # Whether to generate the root module of the plan once fully merged
+        self._compile_root = False
+
+    @classmethod
+    def from_root(
+        cls, mod_names: List[str], root: Dict[str, Tuple[str, Record]]
+    ) -> "SymbolTable":
+        """Make the (fully merged) table of a plan from its ``name -> (owner,
+        record)`` root table (e.g. of a snapshot, see ``oq.snapshot``)."""
+        table = cls(mod_names)
+        for name, (owner, record) in root.items():
+            table._owners[name] = owner
+            table._records[name] = table._canonical_records.setdefault(record, record)
+        table._n_merged = 0
+        return table
+
+    def _merge_next(self) -> bool:
+        """Merge the index of the last library not merged yet.
+
+        Returns:
+            False if all libraries were already merged.
+        """
+        with self._lock:
+            if self._n_merged == 0:
+                return False
+            mod_name = self.mod_names[self._n_merged - 1]
+            for name, record in index.get_index(mod_name).items():
+                # Libraries later in the plan win, and were merged first
+                if name not in self._owners:
+                    record = self._canonical_records.setdefault(record, record)
+                    self._owners[name] = mod_name
+                    self._records[name] = record
+            self._n_merged -= 1
+            if self._n_merged == 0 and self._compile_root:
+                from .index.codegen import write_root_module
+
+                write_root_module(self.root(), self.mod_names)
+            return True
+
+    def merge_all(self) -> "SymbolTable":
+        """Merge the indexes of all the libraries."""
+        while self._merge_next():
+            pass
+        return self
+
+    def record(self, name: str) -> Optional[Record]:
+        """The record of the object a name resolves to, or None."""
+        while name not in self._records and self._merge_next():
+            pass
+        return self._records.get(name)
+
+    def owner(self, name: str) -> Optional[str]:
+        """The library that wins a name, or None."""
+        if self.record(name) is None:
+            return None
+        return self._owners[name]
+
+    def get(self, name: str, cache: bool = True):
+        """The object a name resolves to.
+
+        Args:
+            name: The root name.
+            cache: Whether to cache the object (see ``index.resolve``).
+
+        Raises:
+            AttributeError: If no library exports name.
+        """
+        record = self.record(name)
+        if record is None:
+            raise AttributeError(name)
+        try:
+            return index.resolve(record, cache=cache, mod_name=self._owners[name])
+        except ImportError as error:
+            raise AttributeError(name) from error
+
+    def names(self) -> List[str]:
+        """All the names, merging all the libraries."""
+        self.merge_all()
+        return list(self._records)
+
+    def items(self) -> Iterator[Tuple[str, str, Record]]:
+        """``(name, owner, record)`` of all the names, merging all the libraries."""
+        self.merge_all()
+        for name, record in self._records.items():
+            yield name, self._owners[name], record
+
+    def root(self) -> Dict[str, Tuple[str, Record]]:
+        """The ``name -> (owner, record)`` root table, merging all the libraries
+        (see ``from_root``)."""
+        return {name: (owner, record) for name, owner, record in self.items()}
+
+    def __contains__(self, name: str) -> bool:
+        return self.record(name) is not None
+
+    def __len__(self) -> int:
+        return len(self.merge_all()._records)
+
+
+_tables: Dict[Tuple[str, ...], SymbolTable] = {}
+_tables_lock = threading.Lock()
+
+
+def get_table(mod_names: Optional[List[str]] = None) -> SymbolTable:
+    """Get the symbol table of an import plan (made once per plan).
+
+    Args:
+        mod_names: Short names of the libraries, in import order. Defaults to the
+            import plan (``config.get_import_order()``).
+    """
+    if mod_names is None:
+        mod_names = config.get_import_order()
+    key = tuple(mod_names)
+    with _tables_lock:
+        if key not in _tables:
+            _tables[key] = _compiled_table(mod_names) or SymbolTable(mod_names)
+        return _tables[key]
+
+
+def _compiled_table(mod_names: List[str]) -> Optional[SymbolTable]:
+    """The table of a plan, from its generated root module (see
+    ``oq.index.codegen``), if compiled indexes are enabled and it's up to date."""
+    if not config.should_compile_indexes():
+        return None
+    from .index.codegen import load_root_module
+
+    root = load_root_module(list(mod_names))
+    if root is None:
+        table = SymbolTable(mod_names)
+        table._compile_root = True
+        return table
+    return SymbolTable.from_root(mod_names, root)
+
+
+def install_table(table: SymbolTable) -> None:
+    """Make table the symbol table of its plan (see ``get_table``)."""
+    with _tables_lock:
+        _tables[tuple(table.mod_names)] = table
@@ -0,0 +1,173 @@
+"""Usage-guided prefetch: learn the names each application uses.
+
+With ``record_usage`` in the import config, oq records the root names (e.g.
+"read_csv") and the wrapper attributes (e.g. "np.linspace") a process resolves,
+and at exit adds them to the learned set of the application (see
+``config.get_app_name``), stored under ``util.app_data_dir``.
+
+With ``prefetch_usage``, ``import oq`` resolves the learned set of the application
+right away, so startup costs what the application actually uses: everything else
+stays lazy. Prefetching doesn't count as using: with ``record_usage`` too, the
+names are resolved but left unbound, so that only the names the process then
+accesses are recorded (and the others can be pruned).
+
+Usage:
+    OQ_APP=api python serve.py  # with record_usage, learns the names of "api"
+    python -m oq.usage show api
+    python -m oq.usage prune api --unused-for 10
+"""
+
+import atexit
+import json
+import os
+import sys
+from contextlib import suppress
+from typing import Any, Dict, List, Optional
+
+from .. import config
+
+# Names resolved by this process (in order), or None if not recording
+_used: Optional[Dict[str, None]] = None
+
+
+def record(name: str) -> None:
+    """Record that a root name, or a ``<wrapper>.<name>``, was resolved."""
+    if _used is not None:
+        _used[name] = None
+
+
+def start_recording() -> None:
+    """Record the names resolved from now on, and save them at exit."""
+    global _used
+    if _used is None:
+        _used = {}
+        atexit.register(save_usage)
+
+
+def usage_dir() -> str:
+    """Directory where the learned sets are stored."""
+    from .. import util
+
+    return os.path.join(util.app_data_dir, "usage")
+
+
+def usage_path(app: str) -> str:
+    """Path of the learned set of an application."""
+    return os.path.join(usage_dir(), f"{app.replace(os.sep, '_')}.json")
+
+
+def apps() -> List[str]:
+    """The applications that have a learned set."""
+    with suppress(OSError):
+        return sorted(
+            os.path.splitext(filename)[0]
+            for filename in os.listdir(usage_dir())
+            if filename.endswith(".json")
+        )
+    return []
+
+
+def load_usage(app: Optional[str] = None) -> Dict[str, Any]:
+    """Load the learned set of an application.
+
+    Args:
+        app: The application (default: this one, see ``config.get_app_name``).
+
+    Returns:
+        Dictionary with the ``app``, the number of recorded ``runs``, and the
+        ``names``, each mapped to the last run that used it.
+    """
+    app = app or config.get_app_name()
+    with suppress(OSError, ValueError):
+        with open(usage_path(app)) as f:
+            return json.load(f)
+    return {"app": app, "runs": 0, "names": {}}
+
+
+def write_usage(usage: Dict[str, Any]) -> None:
+    """Store a learned set (atomically, and only if the app data dir is writable)."""
+    path = usage_path(usage["app"])
+    with suppress(OSError):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(usage, f, indent=1)
+        os.replace(tmp_path, path)
+
+
+def save_usage() -> None:
+    """Add the names recorded by this process to the application's learned set."""
+    if _used is None:
+        return
+    usage = load_usage()
+    usage["runs"] += 1
+    for name in _used:
+        usage["names"][name] = usage["runs"]
+    write_usage(usage)
+
+
+def hot_set(app: Optional[str] = None) -> List[str]:
+    """The learned set of names of an application (default: this one)."""
+    return list(load_usage(app)["names"])
+
+
+def prefetch(names: Optional[List[str]] = None) -> List[str]:
+    """Resolve names, binding them, as if they were accessed.
+
+    Prefetched names aren't recorded. If usage is being recorded, they're left
+    unbound (their objects stay cached, so accessing them is still cheap), so
+    that the process records them if, and only if, it accesses them.
+
+    Names that no longer resolve (e.g. of a library that was uninstalled, or
+    disabled) are skipped.
+
+    Args:
+        names: Root names and ``<wrapper>.<name>`` (default: the learned set of
+            this application).
+
+    Returns:
+        The names resolved.
+    """
+    global _used
+    root = sys.modules[__package__.rpartition(".")[0]]
+    names = hot_set() if names is None else names
+    used, _used = _used, None
+    resolved = []
+    try:
+        for name in names:
+            parent, obj = None, root
+            with suppress(AttributeError, ImportError):
+                for part in name.split("."):
+                    parent, obj = obj, getattr(obj, part)
+                if used is not None:
+                    vars(parent).pop(part, None)
+                    if parent is root:
+                        root._root_records.pop(part, None)
+                resolved.append(name)
+    finally:
+        _used = used
+    return resolved
+
+
+def prune(app: str, unused_for: Optional[int] = None) -> int:
+    """Forget the names an application didn't use in its last runs.
+
+    Args:
+        app: The application.
+        unused_for: Number of runs; names unused in the last ones are forgotten.
+            If None, the whole learned set is.
+
+    Returns:
+        The number of names forgotten.
+    """
+    usage = load_usage(app)
+    if unused_for is None:
+        with suppress(OSError):
+            os.remove(usage_path(app))
+        return len(usage["names"])
+    last_run = usage["runs"] - unused_for
+    stale = [name for name, run in usage["names"].items() if run <= last_run]
+    for name in stale:
+        del usage["names"][name]
+    write_usage(usage)
+    return len(stale)
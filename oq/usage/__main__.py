@@ -0,0 +1,47 @@
+"""Show and prune the names learned for each application (see ``oq.usage``).
+
+Usage:
+    python -m oq.usage show                      # the applications
+    python -m oq.usage show api                  # the names "api" uses
+    python -m oq.usage prune api                 # forget them all
+    python -m oq.usage prune api --unused-for 10 # or those unused in 10 runs
+"""
+
+import argparse
+
+from . import apps, load_usage, prune
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oq.usage", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="List applications, or the names of one")
+    show.add_argument("app", nargs="?", help="Application")
+    prune_parser = commands.add_parser("prune", help="Forget learned names")
+    prune_parser.add_argument("app", help="Application")
+    prune_parser.add_argument(
+        "--unused-for",
+        type=int,
+        metavar="RUNS",
+        help="Only forget the names unused in the last RUNS runs",
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "prune":
+        n_names = prune(args.app, args.unused_for)
+        print(f"Forgot {n_names} names of {args.app}")
+    elif args.app is None:
+        for app in apps():
+            usage = load_usage(app)
+            print(f"{app:<24}{len(usage['names']):>6} names{usage['runs']:>6} runs")
+    else:
+        usage = load_usage(args.app)
+        runs = usage["runs"]
+        for name, run in sorted(usage["names"].items()):
+            print(f"{name:<40} last used {runs - run} runs ago")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,95 @@
-"""Utils for OQ."""
+"""Utils for OQ.
+
+The attributes locating files (``app_data_dir``, ``model_info_dir``,
+``data_files``, ...) and ``get_config`` are computed the first time they're
+accessed, so that importing oq neither imports config2py nor touches the
+filesystem: directories are created when something is first stored in them.
+"""
 
 import os
-from importlib.resources import files
+from contextlib import suppress
 from functools import partial
 
-from config2py import simple_config_getter, get_app_config_folder, process_path
+pkg_name = "oq"
+
+_LAZY_ATTRS = (
+    "get_config",
+    "data_files",
+    "templates_files",
+    "app_data_dir",
+    "djoin",
+    "model_info_dir",
+)
 
+# Environment variables of the config folder root, by precedence (see config2py)
+_CONFIG_ROOT_ENV_VARS = ("CONFIG2PY_CONFIG_DIR", "XDG_CONFIG_HOME")
 
-pkg_name = 'oq'
 
-get_config = simple_config_getter(pkg_name)
+def _process_path(path: str) -> str:
+    """Expand the variables and user of a path, and make it absolute (as
+    ``config2py.process_path`` does)."""
+    return os.path.abspath(os.path.expanduser(os.path.expandvars(path)))
 
-data_files = files(pkg_name) / "data"
-templates_files = data_files / "templates"
-app_data_dir = os.environ.get(
-    f"{pkg_name.upper()}_APP_DATA_DIR", get_app_config_folder(pkg_name)
-)
-app_data_dir = process_path(app_data_dir, ensure_dir_exists=True)
-djoin = partial(os.path.join, app_data_dir)
-model_info_dir = process_path(djoin("model_info"), ensure_dir_exists=True)
+
+def _get_config():
+    from config2py import simple_config_getter
+
+    return simple_config_getter(pkg_name)
+
+
+def _data_files():
+    from importlib.resources import files
+
+    return files(pkg_name) / "data"
+
+
+def _templates_files():
+    return __getattr__("data_files") / "templates"
+
+
+def app_config_folder() -> str:
+    """The ``oq`` app config folder of config2py (without creating it).
+
+    The usual case (not Windows, and absolute ``CONFIG2PY_CONFIG_DIR`` and
+    ``XDG_CONFIG_HOME``, if set) follows the rules of config2py without importing
+    it; anything else is left to config2py.
+    """
+    if os.name != "nt":
+        roots = [os.environ.get(var, "").strip() for var in _CONFIG_ROOT_ENV_VARS]
+        if all(not root or os.path.isabs(os.path.expanduser(root)) for root in roots):
+            root = next((root for root in roots if root), "~/.config")
+            return os.path.join(os.path.expanduser(root), pkg_name)
+    from config2py import get_app_config_folder
+
+    return get_app_config_folder(pkg_name)
+
+
+def _app_data_dir() -> str:
+    app_data_dir = os.environ.get(f"{pkg_name.upper()}_APP_DATA_DIR")
+    if app_data_dir is None:
+        app_data_dir = app_config_folder()
+    return _process_path(app_data_dir)
+
+
+def _djoin():
+    return partial(os.path.join, __getattr__("app_data_dir"))
+
+
+def _model_info_dir() -> str:
+    model_info_dir = __getattr__("djoin")("model_info")
+    # Best effort: the app data dir may be on a read-only filesystem (see oq.snapshot)
+    with suppress(OSError):
+        os.makedirs(model_info_dir, exist_ok=True)
+    return model_info_dir
+
+
+def __getattr__(name: str):
+    """Compute a lazy attribute (see the module docstring), and bind it."""
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = globals()[f"_{name}"]()
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,25 @@
+"""Warm the caches of the wrapped libraries ahead of time (e.g. in an image build).
+
+Usage:
+    python -m oq.warm fonts  # build matplotlib's font cache
+"""
+
+import argparse
+
+from .plotting import build_font_cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m oq.warm", description=__doc__.splitlines()[0]
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("fonts", help="Build matplotlib's font cache")
+    args = parser.parse_args(argv)
+
+    if args.command == "fonts":
+        print(f"Font cache: {build_font_cache()}")
+
+
+if __name__ == "__main__":
+    main()
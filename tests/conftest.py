@@ -0,0 +1,66 @@
+"""Shared fixtures."""
+
+import sys
+
+import pytest
+
+
+FAKE_PACKAGE = {
+    "__init__.py": "from .core import make, Thing\nfrom . import extra\n",
+    "core.py": "def make():\n    pass\n\n\nclass Thing:\n    pass\n",
+    "extra.py": "def make():\n    pass\n\n\ndef helper():\n    pass\n",
+}
+
+
+@pytest.fixture
+def fake_lib(tmp_path, monkeypatch):
+    """A small package, wrapped as the "fake" library, with its own app data dir."""
+    from oq import config, index, util
+
+    package_dir = tmp_path / "src" / "oqfake"
+    package_dir.mkdir(parents=True)
+    for filename, source in FAKE_PACKAGE.items():
+        (package_dir / filename).write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path / "src"))
+
+    monkeypatch.setitem(config.MODULE_MAPPING, "fake", "oqfake")
+    monkeypatch.setitem(config.WRAPPED_MODULES, "fake", "oqfake")
+    versions = {"fake": "1.0"}
+    monkeypatch.setattr(config, "get_library_version", versions.get)
+    monkeypatch.setattr(util, "app_data_dir", str(tmp_path / "app_data"))
+    monkeypatch.setattr(index, "_indexes", {})
+    monkeypatch.setattr(index, "_resolved", {})
+    # Each test has its own package (see index._submodule_names)
+    index._submodule_names.cache_clear()
+    yield versions
+    index._submodule_names.cache_clear()
+    for name in [m for m in sys.modules if m.split(".")[0] == "oqfake"]:
+        del sys.modules[name]
+
+
+@pytest.fixture
+def two_libs(fake_lib, monkeypatch):
+    """A second library, "fake2", exporting some of the same objects as "fake"."""
+    from oq import config
+
+    monkeypatch.setitem(config.MODULE_MAPPING, "fake2", "oqfake")
+    monkeypatch.setitem(config.WRAPPED_MODULES, "fake2", "oqfake.extra")
+    fake_lib["fake2"] = "1.0"
+    return ["fake", "fake2"]
+
+
+@pytest.fixture
+def fake_plan(fake_lib, request, monkeypatch):
+    """The fake libraries as the import plan (in a fresh config), auto-imported:
+    "fake", and "fake2" too if the test uses ``two_libs``."""
+    from oq import config, symbols
+
+    if "two_libs" in request.fixturenames:
+        plan = list(request.getfixturevalue("two_libs"))
+    else:
+        plan = ["fake"]
+    monkeypatch.setattr(config, "_config_cache", {})
+    monkeypatch.setattr(config, "_overrides", {"module_order": plan})
+    monkeypatch.setattr(config, "should_auto_import", lambda: True)
+    monkeypatch.setattr(symbols, "_tables", {})
+    return plan
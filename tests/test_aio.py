@@ -0,0 +1,101 @@
+"""Test the asyncio-friendly imports."""
+
+import asyncio
+import sys
+import time
+import types
+
+import pytest
+
+IMPORT_SECONDS = 0.5
+
+
+@pytest.fixture
+def slow_lib(fake_plan, tmp_path, monkeypatch):
+    """The fake library, slow to import, as the import plan (and its import log)."""
+    from oq import index, loader
+
+    core = tmp_path / "src" / "oqfake" / "core.py"
+    core.write_text(
+        "import sys\nimport time\n\n"
+        f"time.sleep({IMPORT_SECONDS})\n"
+        "if 'oqfake_log' in sys.modules:\n"
+        "    sys.modules['oqfake_log'].imports.append(__name__)\n\n" + core.read_text()
+    )
+    monkeypatch.setattr(loader, "_futures", {})
+    monkeypatch.setitem(sys.modules, "oq.fake", types.ModuleType("oq.fake"))
+    log = types.ModuleType("oqfake_log")
+    log.imports = []
+    monkeypatch.setitem(sys.modules, "oqfake_log", log)
+    index.get_index("fake")  # built in a worker process: nothing is imported here
+    yield log.imports
+    import oq
+
+    oq.unload("fake")
+
+
+async def _max_stall(coro):
+    """Await coro, and return the longest the event loop was blocked meanwhile."""
+    stalls = []
+    done = False
+
+    async def tick():
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stalls.append(now - last)
+            last = now
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+    result = await coro
+    done = True
+    await ticker
+    return max(stalls), result
+
+
+def test_aget_does_not_stall_the_event_loop(slow_lib):
+    """Test that a cold import blocks the event loop, unless it's awaited."""
+    import oq
+
+    async def blocking_get(name):
+        return getattr(oq, name)
+
+    stall, thing = asyncio.run(_max_stall(blocking_get("Thing")))
+    assert stall >= IMPORT_SECONDS
+    assert thing.__module__ == "oqfake.core"
+
+    oq.unload("fake")
+    assert "oqfake" not in sys.modules
+    stall, thing = asyncio.run(_max_stall(oq.aget("Thing")))
+    assert stall < IMPORT_SECONDS / 2
+    assert thing.__module__ == "oqfake.core"
+    assert slow_lib == ["oqfake.core", "oqfake.core"]
+
+
+def test_concurrent_awaiters_share_the_import(slow_lib):
+    """Test that concurrent awaiters of a library share one load."""
+    import oq
+
+    async def main():
+        return await asyncio.gather(
+            oq.aimport("fake"), oq.aimport("fake"), oq.aget("make"), oq.aget("Thing")
+        )
+
+    wrapper, wrapper2, make, thing = asyncio.run(main())
+    assert wrapper is wrapper2 is sys.modules["oq.fake"]
+    assert make.__module__ == "oqfake.core"
+    assert thing.__module__ == "oqfake.core"
+    assert slow_lib == ["oqfake.core"]
+
+
+def test_aget_nested_name(slow_lib):
+    """Test that aget resolves a name of a subpackage of a library."""
+    import oq
+    from oq.index import lazy_module_attrs
+
+    wrapper = sys.modules["oq.fake"]
+    wrapper.__getattr__, wrapper.__dir__ = lazy_module_attrs("fake", "oq.fake")
+    helper = asyncio.run(oq.aget("fake.extra.helper"))
+    assert helper is sys.modules["oqfake.extra"].helper
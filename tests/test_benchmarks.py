@@ -0,0 +1,34 @@
+"""Smoke test of the cold-start benchmark tooling (benchmarks/cold_start.py)."""
+
+import importlib.util
+import os
+
+import pytest
+
+BENCHMARK_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "benchmarks", "cold_start.py"
+)
+
+
+@pytest.fixture(scope="module")
+def cold_start():
+    spec = importlib.util.spec_from_file_location("cold_start", BENCHMARK_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_synthetic_libraries_stand_in_for_real_ones(cold_start, tmp_path):
+    """Test that oq wraps the synthetic libraries, in a fresh interpreter."""
+    root = str(tmp_path / "synthetic")
+    cold_start.make_synthetic_libraries(root, n_submodules=4, n_callables=2)
+    name = cold_start._last_np_name(4, 2)
+
+    stmt = f"assert oq.np.{name}.__module__ == 'numpy.sub_0.mod_3', oq.np"
+    assert cold_start._run(root, str(tmp_path / "app"), "import oq", stmt) >= 0
+
+
+def test_find_regressions(cold_start):
+    baseline = {"a": {"p50": 1.0}, "b": {"p50": 1.0}, "c": {"p50": 0.01}}
+    results = {"a": {"p50": 1.1}, "b": {"p50": 2.0}, "c": {"p50": 0.02}}
+    assert cold_start.find_regressions(results, baseline) == {"b": (1.0, 2.0)}
@@ -0,0 +1,63 @@
+"""Test the generated, byte-compiled index modules (see oq.index.codegen)."""
+
+import os
+from importlib.util import cache_from_source
+
+import pytest
+
+
+@pytest.fixture
+def compiled(two_libs, fake_plan, monkeypatch):
+    """The two fake libraries as the import plan, with compiled indexes."""
+    from oq import config
+
+    monkeypatch.setattr(config, "should_compile_indexes", lambda: True)
+    return fake_plan
+
+
+def test_index_modules(compiled, fake_lib, monkeypatch):
+    """Test that indexes are generated, byte-compiled, and loaded back."""
+    from oq import index
+    from oq.index import codegen
+
+    built = index.get_index("fake")
+    assert index.get_report("fake")["source"] == "built"
+    path = os.path.join(codegen.generated_dir(), index.index_key("fake") + ".py")
+    assert os.path.exists(cache_from_source(path))
+
+    monkeypatch.setattr(index, "_indexes", {})
+    assert index.get_index("fake") == built
+    assert index.get_report("fake")["source"] == "compiled"
+
+    # Another version of the library: regenerated, replacing the old module
+    fake_lib["fake"] = "2.0"
+    assert codegen.load_index_module("fake") is None
+    monkeypatch.setattr(index, "_indexes", {})
+    index.get_index("fake")
+    generated = os.listdir(codegen.generated_dir())
+    assert [name for name in generated if "fake-" in name] == [
+        index.index_key("fake") + ".py"
+    ]
+
+
+def test_root_module(compiled, monkeypatch):
+    """Test that the root table of the plan is generated, and used, with the same
+    precedence."""
+    import oqfake
+    from oq import index, symbols
+    from oq.index import codegen
+
+    assert [os.path.basename(path) for path in codegen.generate()] == [
+        index.index_key("fake") + ".py",
+        index.index_key("fake2") + ".py",
+        codegen.root_key(compiled) + ".py",
+    ]
+    assert codegen.generate() == []
+
+    def no_index(mod_name, build=True):
+        raise AssertionError(f"{mod_name} index loaded")
+
+    monkeypatch.setattr(index, "get_index", no_index)
+    table = symbols.get_table()
+    assert table.owner("make") == "fake2"
+    assert table.get("Thing") is oqfake.Thing
@@ -68,3 +68,131 @@ def test_enabled_modules_filtering():
     # Order should only contain enabled modules
     for mod in order:
         assert mod in enabled_list
+
+
+def test_profiles(monkeypatch):
+    """Test that a profile selected by environment variable narrows the import plan."""
+    from oq.config import PROFILE_ENV_VAR, get_import_order, get_profile
+
+    full_order = get_import_order()
+    monkeypatch.setenv(PROFILE_ENV_VAR, "light")
+    order = get_import_order()
+    assert order == [mod for mod in full_order if mod in get_profile("light")]
+    assert "torch" not in order
+
+    monkeypatch.setenv(PROFILE_ENV_VAR, "no_such_profile")
+    with pytest.raises(ValueError):
+        get_import_order()
+
+
+def test_preload_profile_wins_over_environment(fake_plan, two_libs, monkeypatch):
+    """Test that the profile given to preload wins over the environment variable."""
+    import oq
+    from oq import config, prefork
+
+    monkeypatch.setattr(prefork, "preload_libraries", lambda plan, _: (plan, []))
+    monkeypatch.setattr(prefork, "freeze", lambda: None)
+    monkeypatch.setattr(oq, "_populate_root_namespace", lambda skip: None)
+    config.configure(profiles={"first": ["fake"], "second": ["fake2"]})
+    monkeypatch.setenv(config.PROFILE_ENV_VAR, "first")
+    assert config.get_profile_name() == "first"
+    assert oq.preload("second") == ["fake2"]
+    assert config.get_profile_name() == "second"
+
+
+def test_profile_is_an_import_plan():
+    """Test that libraries outside the selected profile are never imported."""
+    import os
+    import subprocess
+    import sys
+
+    try:
+        import sklearn
+    except ImportError:
+        pytest.skip("sklearn not installed")
+
+    code = (
+        "import sys, oq\n"
+        "assert not hasattr(oq, 'RandomForestClassifier')\n"
+        "print('sklearn' in sys.modules)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        env=dict(os.environ, OQ_PROFILE="light"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_walk_config(monkeypatch, tmp_path):
+    """Test that library walk settings override the global ones, merging the user's."""
+    import json
+
+    from oq.config import get_walk_config
+
+    sk_walk = get_walk_config("sk")
+    assert sk_walk["subpackages"] == "__all__"
+    assert "*.tests" in sk_walk["exclude"]
+    assert "sklearn.externals" in sk_walk["exclude"]
+
+    monkeypatch.setenv("OQ_APP_DATA_DIR", str(tmp_path))
+    user_config = {"walk": {"libraries": {"sk": {"max_depth": 1}}}}
+    (tmp_path / "import_config.json").write_text(json.dumps(user_config))
+    sk_walk = get_walk_config("sk")
+    assert sk_walk["max_depth"] == 1
+    assert sk_walk["subpackages"] == "__all__"
+    assert get_walk_config("np")["max_depth"] == 2
+
+    # Subpackages have the settings of their library, without its allowlist
+    sk_ensemble_walk = get_walk_config("sk.ensemble")
+    assert sk_ensemble_walk["max_depth"] == 1
+    assert sk_ensemble_walk["subpackages"] is None
+    assert "sklearn.externals" in sk_ensemble_walk["exclude"]
+
+
+@pytest.fixture
+def fresh_config(monkeypatch, tmp_path):
+    """Empty config memo and runtime overrides, and an app data dir of its own."""
+    from oq import config
+
+    monkeypatch.setattr(config, "_config_cache", {})
+    monkeypatch.setattr(config, "_overrides", {})
+    monkeypatch.setenv("OQ_APP_DATA_DIR", str(tmp_path))
+    return tmp_path / "import_config.json"
+
+
+def test_config_is_memoized(fresh_config, monkeypatch):
+    """Test that the config files are only read again when they change."""
+    import json
+
+    from oq import config
+
+    reads = []
+    get_default_config = config.get_default_config
+    monkeypatch.setattr(
+        config, "get_default_config", lambda: reads.append(1) or get_default_config()
+    )
+    config.should_auto_import()
+    config.get_import_order()
+    assert len(reads) == 1
+
+    fresh_config.write_text(json.dumps({"module_order": ["pd", "np"]}))
+    assert config.get_import_order() == ["pd", "np"]
+    assert len(reads) == 2
+    config.get_import_order()
+    assert len(reads) == 2
+
+
+def test_configure_overrides(fresh_config):
+    """Test runtime overrides, merged on top of the user config."""
+    from oq.config import configure, get_config, get_import_order
+
+    configure(module_order=["sk", "np", "pd"], enabled_modules={"np": False})
+    assert get_import_order() == ["sk", "pd"]
+    configure(enabled_modules={"pd": False})
+    assert get_import_order() == ["sk"]
+    assert get_config()["import_config"]["enabled_modules"]["torch"]
+    with pytest.raises(ValueError):
+        configure(module_order=["no_such_module"])
@@ -0,0 +1,91 @@
+"""Test the import-cost diagnostics."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+
+def test_import_report():
+    """Test the import report of numpy, measured in a fresh interpreter."""
+    try:
+        import numpy
+    except ImportError:
+        pytest.skip("numpy not installed")
+
+    from oq.diagnostics import import_report
+
+    report = import_report(["np"])
+    info = report["libraries"]["np"]
+    assert info["available"]
+    assert info["import_time"] > 0
+    assert info["symbols"] > 0
+    assert info["modules_added"] > 0
+    assert info["overwrites"] == {}
+    assert report["total"]["symbols"] == info["symbols"]
+
+
+def test_import_report_ignores_eager_config(tmp_path, monkeypatch):
+    """Test that an eager config doesn't load the libraries before measuring."""
+    pytest.importorskip("numpy")
+    from oq.diagnostics import import_report
+
+    (tmp_path / "import_config.json").write_text(
+        json.dumps({"lazy_root": False, "module_order": ["np"]})
+    )
+    monkeypatch.setenv("OQ_APP_DATA_DIR", str(tmp_path))
+    info = import_report(["np"])["libraries"]["np"]
+    assert info["import_time"] > 0
+    # numpy alone imports dozens of modules
+    assert info["modules_added"] > 20
+
+
+def test_import_report_of_missing_library(monkeypatch):
+    """Test that a library that can't be imported is reported with its error."""
+    from oq import config
+    from oq.diagnostics import import_report
+
+    monkeypatch.setitem(config.MODULE_MAPPING, "fake", "oqfake_not_installed")
+    monkeypatch.setitem(config.WRAPPED_MODULES, "fake", "oqfake_not_installed")
+    report = import_report(["fake"], isolated=False, memory="tracemalloc")
+    info = report["libraries"]["fake"]
+    assert not info["available"]
+    assert info["error"].startswith("ModuleNotFoundError")
+
+
+def test_profile_cli(tmp_path):
+    """Test that `python -m oq.profile` writes the report as JSON."""
+    output = tmp_path / "report.json"
+    subprocess.run(
+        [sys.executable, "-m", "oq.profile", "-o", str(output), "--modules", "np"],
+        check=True,
+    )
+    report = json.loads(output.read_text())
+    assert set(report["libraries"]) == {"np"}
+
+
+def test_report_ignores_what_libraries_print(fake_lib, tmp_path, capsys):
+    """Test that what a library prints at import doesn't get into the report."""
+    from oq.diagnostics import _report_main
+
+    init = tmp_path / "src" / "oqfake" / "__init__.py"
+    init.write_text("print('Welcome to oqfake!')\n" + init.read_text())
+    _report_main([json.dumps({"modules": ["fake"], "memory": "rss"})])
+    out, err = capsys.readouterr()
+    assert json.loads(out)["libraries"]["fake"]["available"]
+    assert "Welcome to oqfake!" in err
+
+
+def test_import_report_of_failing_walk(fake_lib, monkeypatch):
+    """Test that a walk that fails is reported with its error."""
+    from oq import index
+    from oq.diagnostics import import_report
+
+    def build_index(mod_name):
+        raise RuntimeError("walk failed")
+
+    monkeypatch.setattr(index, "build_index", build_index)
+    info = import_report(["fake"], isolated=False)["libraries"]["fake"]
+    assert info["error"] == "RuntimeError: walk failed"
+    assert info["available"] and info["symbols"] == 0
@@ -0,0 +1,125 @@
+"""Test that dir() and tab completion are served from the indexes."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+
+def _wait_for_builds():
+    for thread in threading.enumerate():
+        if thread.name == "oq-index":
+            thread.join()
+
+
+def test_dir_from_stored_index(fake_plan, monkeypatch):
+    """Test that dir(oq) lists the names of stored indexes, importing nothing."""
+    import oq
+    from oq import index
+
+    index.get_index("fake")
+    monkeypatch.setattr(index, "_indexes", {})
+    start = time.perf_counter()
+    names = dir(oq)
+    assert time.perf_counter() - start < 0.05
+    assert {"make", "Thing", "helper", "np", "find"} <= set(names)
+    assert "oqfake" not in sys.modules
+
+
+def test_dir_names_resolve(fake_plan, tmp_path, monkeypatch):
+    """Test that every name dir() lists (for the root and a wrapper) resolves, even
+    with private names in the index."""
+    import types
+
+    import oq
+    from oq import index
+
+    core = tmp_path / "src" / "oqfake" / "core.py"
+    core.write_text(
+        core.read_text() + "\n\ndef _split():\n    pass\n\n\nsplit = _split\n"
+    )
+    (tmp_path / "src" / "oqfake" / "__init__.py").write_text(
+        "from .core import make, split, Thing\nfrom . import extra\n"
+    )
+    fake_index = index.get_index("fake")
+    assert fake_index["split"] == ("oqfake.core", "_split")
+    assert not [name for name in fake_index if name.startswith("_")]
+    # As in an index built before private names were left out
+    fake_index["_split"] = fake_index["split"]
+
+    wrapper = types.ModuleType("oq.fake")
+    monkeypatch.setitem(sys.modules, wrapper.__name__, wrapper)
+    monkeypatch.setattr(index, "_wrapper_mod_names", {})
+    wrapper.__getattr__, wrapper.__dir__ = index.lazy_module_attrs(
+        "fake", wrapper.__name__
+    )
+    assert "_split" not in dir(wrapper)
+    assert {"make", "split", "Thing", "extra"} <= set(dir(wrapper))
+    for name in dir(wrapper):
+        getattr(wrapper, name)
+
+    names = set(dir(oq))
+    assert "_split" not in names
+    unbound = {"make", "split", "Thing", "helper", "fake"} - set(vars(oq))
+    assert unbound <= names
+    try:
+        for name in names:
+            getattr(oq, name)
+    finally:
+        for name in unbound:
+            vars(oq).pop(name, None)
+        sys.modules.pop("oq.fake.extra", None)
+
+
+def test_dir_builds_missing_indexes_in_background(fake_plan):
+    """Test that dir(oq) doesn't wait for missing indexes, but gets them built."""
+    import oq
+    from oq import index
+
+    assert "Thing" not in dir(oq)
+    _wait_for_builds()
+    assert "fake" in index._indexes
+    assert "Thing" in dir(oq)
+    assert "oqfake" not in sys.modules
+
+
+def test_ipython_completion(tmp_path):
+    """Test that IPython completes oq names, with jedi, without importing numpy."""
+    pytest.importorskip("IPython")
+    pytest.importorskip("jedi")
+    pytest.importorskip("numpy")
+    env = {key: value for key, value in os.environ.items() if key != "OQ_PROFILE"}
+    env["OQ_APP_DATA_DIR"] = str(tmp_path)
+    (tmp_path / "import_config.json").write_text(json.dumps({"module_order": ["np"]}))
+    subprocess.run(
+        [sys.executable, "-m", "oq.index", "build", "--modules", "np"],
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    code = (
+        "import sys\n"
+        "from IPython.core.completer import provisionalcompleter\n"
+        "from IPython.core.interactiveshell import InteractiveShell\n"
+        "shell = InteractiveShell.instance()\n"
+        "shell.run_cell('import oq')\n"
+        "shell.run_line_magic('load_ext', 'oq.ipython')\n"
+        "for text in ('oq.linsp', 'oq.np.lin'):\n"
+        "    with provisionalcompleter():\n"
+        "        completions = shell.Completer.completions(text, len(text))\n"
+        "        print(sorted(c.text for c in completions))\n"
+        "print('numpy' in sys.modules)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.splitlines() == [
+        "['linspace']",
+        "['linalg', 'linspace']",
+        "False",
+    ]
@@ -0,0 +1,123 @@
+"""Test that `import oq` does no filesystem writes, and only the reads it needs.
+
+An audit hook (see ``sys.addaudithook``) counts the events of ``import oq`` in a
+fresh interpreter, which must stay within a budget.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Most events `import oq` may cause (reading modules doesn't count as opening files)
+BUDGET = {
+    "open": 2,  # the default config, and the user config
+    "write": 0,
+    "os.mkdir": 0,
+    "import": 100,
+}
+
+AUDIT_CODE = """
+import json, os, sys
+from importlib.machinery import all_suffixes
+
+counts = {"open": 0, "write": 0, "os.mkdir": 0, "import": 0}
+opened = []
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_CREAT
+
+def hook(event, args):
+    if event == "open":
+        path, mode, flags = args
+        if (mode and any(char in mode for char in "wax+")) or (flags & _WRITE_FLAGS):
+            counts["write"] += 1
+        elif not str(path).endswith(tuple(all_suffixes())):
+            counts["open"] += 1
+            opened.append(str(path))
+    elif event in counts:
+        counts[event] += 1
+
+sys.addaudithook(hook)
+import oq
+print(json.dumps({"counts": counts, "opened": opened, "modules": sorted(sys.modules)}))
+"""
+
+
+def _audit_import(env):
+    env = {
+        **{
+            key: value
+            for key, value in os.environ.items()
+            if not key.startswith(("OQ_", "CONFIG2PY_", "XDG_"))
+        },
+        **env,
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", AUDIT_CODE],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout)
+
+
+def _assert_within_budget(audit):
+    over = {
+        event: count for event, count in audit["counts"].items() if count > BUDGET[event]
+    }
+    assert not over, f"Over budget: {over} (opened: {audit['opened']})"
+
+
+@pytest.mark.parametrize("app_data_dir_env", [True, False])
+def test_import_io_budget(tmp_path, app_data_dir_env):
+    """Test that `import oq`, with no app data dir yet, stays within the budget."""
+    home = tmp_path / "home"
+    env = {"HOME": str(home)}
+    if app_data_dir_env:
+        env["OQ_APP_DATA_DIR"] = str(tmp_path / "app_data")
+    audit = _audit_import(env)
+    _assert_within_budget(audit)
+    assert "config2py" not in audit["modules"]
+    assert not os.path.exists(home)
+    assert not os.path.exists(tmp_path / "app_data")
+
+
+def test_directories_are_created_on_store(tmp_path, monkeypatch):
+    """Test that the app data dir is created by the first store, not before."""
+    from oq import util
+
+    app_data_dir = tmp_path / "app_data"
+    monkeypatch.setenv("OQ_APP_DATA_DIR", str(app_data_dir))
+    # Forget the computed attributes (delattr would compute them, to restore them)
+    for name in ("app_data_dir", "djoin", "model_info_dir"):
+        monkeypatch.delitem(vars(util), name, raising=False)
+    assert util.app_data_dir == str(app_data_dir)
+    assert not app_data_dir.exists()
+    assert util.model_info_dir == str(app_data_dir / "model_info")
+    assert os.path.isdir(util.model_info_dir)
+
+
+@pytest.mark.parametrize(
+    "env",
+    [
+        {},
+        {"XDG_CONFIG_HOME": "{tmp}/xdg"},
+        {"CONFIG2PY_CONFIG_DIR": "{tmp}/c2p"},
+        {"CONFIG2PY_CONFIG_DIR": "{tmp}/c2p", "XDG_CONFIG_HOME": "{tmp}/xdg"},
+        {"XDG_CONFIG_HOME": "~/xdg"},
+        {"XDG_CONFIG_HOME": ""},
+    ],
+)
+def test_app_config_folder_follows_config2py(tmp_path, monkeypatch, env):
+    """Test that the config2py-free app config folder is config2py's."""
+    config2py = pytest.importorskip("config2py")
+    from oq import util
+
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    for var in util._CONFIG_ROOT_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    for var, value in env.items():
+        monkeypatch.setenv(var, value.format(tmp=tmp_path))
+    assert util.app_config_folder() == config2py.get_app_config_folder("oq")
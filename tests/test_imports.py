@@ -94,3 +94,101 @@ def test_no_import_errors_on_missing_dependencies():
     assert oq is not None
     # Util should always be available
     assert hasattr(oq, "util")
+
+
+def _run_fresh(code):
+    """Run code in a fresh interpreter (so sys.modules starts clean)."""
+    import subprocess
+    import sys
+
+    return subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def test_lazy_root_imports_no_library():
+    """Test that `import oq` doesn't import any wrapped library in lazy mode."""
+    from oq import config
+
+    if not config.should_lazy_load():
+        pytest.skip("lazy_root is disabled")
+
+    out = _run_fresh(
+        "import sys, oq; from oq.config import MODULE_MAPPING; "
+        "print(sorted(m for m in MODULE_MAPPING.values() if m in sys.modules))"
+    )
+    assert out == "[]"
+
+
+def test_lazy_root_resolves_and_binds():
+    """Test that a root name is resolved on first access and bound afterwards."""
+    try:
+        import pandas
+    except ImportError:
+        pytest.skip("pandas not installed")
+
+    import oq
+
+    assert oq.read_csv is pandas.read_csv
+    assert vars(oq)["read_csv"] is pandas.read_csv
+    assert not hasattr(oq, "no_such_name_in_any_library")
+
+
+def test_configure_updates_root_namespace(two_libs, monkeypatch, tmp_path):
+    """Test that oq.configure only changes the root names whose owner changes."""
+    import oq
+    import oqfake
+    from oq import config, symbols
+
+    monkeypatch.setattr(config, "_config_cache", {})
+    monkeypatch.setattr(config, "_overrides", {})
+    monkeypatch.setattr(symbols, "_tables", {})
+    monkeypatch.setattr(oq, "_root_records", {})
+    monkeypatch.setenv("OQ_APP_DATA_DIR", str(tmp_path))
+    try:
+        oq.configure(module_order=["fake", "fake2"])
+        assert oq.make is oqfake.extra.make
+        assert oq.Thing is oqfake.Thing
+
+        oq.configure(module_order=["fake2", "fake"])
+        assert "make" not in vars(oq)  # its owner changed: unbound
+        assert "Thing" in vars(oq)  # same object: kept
+        assert oq.make is oqfake.make
+
+        oq.configure(enabled_modules={"fake": False})
+        assert not hasattr(oq, "Thing")
+        assert oq.make is oqfake.extra.make
+
+        # In eager mode, the names of the plan are rebound right away
+        oq.configure(lazy_root=False, enabled_modules={"fake": True})
+        assert vars(oq)["Thing"] is oqfake.Thing
+        assert vars(oq)["make"] is oqfake.make
+    finally:
+        for name in ("make", "Thing", "helper"):
+            vars(oq).pop(name, None)
+
+
+def test_submodules_are_not_looked_up(monkeypatch):
+    """Test that oq's own submodules are imported, not looked up in the libraries."""
+    import pkgutil
+
+    import oq
+    from oq import config, symbols
+
+    def get_table(*args, **kwargs):
+        raise AssertionError("looked up a submodule in the symbol table")
+
+    submodules = [
+        module.name
+        for module in pkgutil.iter_modules(oq.__path__)
+        if module.name not in config.MODULE_MAPPING
+    ]
+    # dir(oq) lists them all
+    assert set(submodules) <= set(vars(oq)) | set(oq._SUBMODULES)
+    # Even those that aren't listed
+    monkeypatch.setattr(symbols, "get_table", get_table)
+    monkeypatch.setattr(oq, "_SUBMODULES", ())
+    monkeypatch.delitem(vars(oq), "warm", raising=False)
+    from oq import warm
+
+    assert warm.__name__ == "oq.warm"
@@ -0,0 +1,349 @@
+"""Test the persistent symbol index."""
+
+import os
+import sys
+
+import pytest
+
+
+def test_build_index(fake_lib):
+    """Test that records point back to the indexed objects."""
+    import oqfake
+    from oq.index import build_index, resolve
+
+    idx = build_index("fake")
+    assert set(idx) == {"make", "Thing", "helper"}
+    assert idx["Thing"] == ("oqfake.core", "Thing")
+    # The callable exposed closest to the top of the package wins
+    assert resolve(idx["make"]) is oqfake.make
+    assert resolve(idx["helper"]) is oqfake.extra.helper
+
+
+def test_index_is_persisted_and_keyed_by_version(fake_lib):
+    """Test that indexes are stored, reloaded, and invalidated by version."""
+    from oq.index import get_index, index_dir, load_index, save_index
+
+    idx = get_index("fake")
+    assert load_index("fake") == idx
+    assert os.listdir(index_dir()) == [
+        "fake-1.0-py{}.{}.json".format(*sys.version_info[:2])
+    ]
+
+    fake_lib["fake"] = "2.0"
+    assert load_index("fake") is None
+    save_index("fake", idx)
+    assert os.listdir(index_dir()) == [
+        "fake-2.0-py{}.{}.json".format(*sys.version_info[:2])
+    ]
+
+
+def test_indexes_of_other_pythons_are_kept(fake_lib):
+    """Test that storing an index only replaces those of the same Python version."""
+    from oq.index import get_index, index_dir, save_index
+
+    python = "py{}.{}".format(*sys.version_info[:2])
+    idx = get_index("fake")
+    other_python = os.path.join(index_dir(), "fake-0.9-py2.7.json")
+    other_version = os.path.join(index_dir(), f"fake-0.9-{python}.json")
+    for path in (other_python, other_version):
+        with open(path, "w") as f:
+            f.write("{}")
+    save_index("fake", idx)
+    assert sorted(os.listdir(index_dir())) == [
+        "fake-0.9-py2.7.json",
+        f"fake-1.0-{python}.json",
+    ]
+
+
+def test_missing_library_has_empty_index(fake_lib, monkeypatch):
+    """Test that a library that can't be imported gives an empty index."""
+    from oq import config
+    from oq.index import get_index, get_report
+
+    monkeypatch.setitem(config.WRAPPED_MODULES, "fake", "oqfake_not_installed")
+    assert get_index("fake") == {}
+    assert get_report("fake")["status"] == "skipped"
+
+
+def _with_walk_settings(monkeypatch, **settings):
+    from oq import config
+
+    walk_config = {**config.get_walk_config("fake"), **settings}
+    monkeypatch.setattr(config, "get_walk_config", lambda mod_name: walk_config)
+
+
+def test_walk_over_budget_is_degraded(fake_lib, monkeypatch):
+    """Test that a walk over its budget gives a partial index, marked degraded."""
+    from oq.index import get_index, get_report, load_index
+
+    _with_walk_settings(monkeypatch, time_budget=0)
+    with pytest.warns(RuntimeWarning, match=r"fake \(degraded\): time budget of 0s"):
+        assert get_index("fake") == {}
+    report = get_report("fake")
+    assert (report["status"], report["source"]) == ("degraded", "built")
+    assert load_index("fake") == {}
+
+
+def test_stuck_worker_is_killed(fake_lib, monkeypatch, tmp_path):
+    """Test that a worker still importing its library past its budget is killed."""
+    from oq import config
+    from oq.index import build, get_index, get_report
+
+    slow_module = tmp_path / "src" / "oqfake" / "slow.py"
+    slow_module.write_text("import time\ntime.sleep(30)\n")
+    monkeypatch.setitem(config.WRAPPED_MODULES, "fake", "oqfake.slow")
+    monkeypatch.setattr(build, "_KILL_GRACE", 0)
+    _with_walk_settings(monkeypatch, time_budget=0.5)
+    with pytest.warns(RuntimeWarning, match="worker killed"):
+        assert get_index("fake") == {}
+    assert get_report("fake")["status"] == "degraded"
+
+
+def test_failed_walk_is_reported(fake_lib, monkeypatch, tmp_path):
+    """Test that a library whose walk fails gets no names, and the reason why."""
+    from oq import config
+    from oq.index import get_index, get_report, load_index
+
+    (tmp_path / "src" / "oqfake" / "broken.py").write_text("raise ValueError('oops')\n")
+    monkeypatch.setitem(config.WRAPPED_MODULES, "fake", "oqfake.broken")
+    with pytest.warns(RuntimeWarning, match=r"fake \(failed\)"):
+        assert get_index("fake") == {}
+    report = get_report("fake")
+    assert report["status"] == "failed"
+    assert "ValueError: oops" in report["reason"]
+    assert load_index("fake") is None
+
+
+def test_lookup_without_index(fake_lib):
+    """Test that top-level names are found without walking the library."""
+    import oqfake
+    from oq.index import get_index, lookup
+
+    assert lookup("fake", "make") is oqfake.make
+    assert get_index("fake", build=False) is None
+    # Names below the top level need the index
+    assert lookup("fake", "helper") is oqfake.extra.helper
+    assert get_index("fake", build=False) is not None
+    with pytest.raises(AttributeError):
+        lookup("fake", "no_such_name")
+
+
+def test_lazy_module_attrs(fake_lib):
+    """Test the __getattr__ and __dir__ given to wrapper modules."""
+    import types
+
+    import oqfake
+    from oq.index import lazy_module_attrs
+
+    module = types.ModuleType("oq_fake_wrapper")
+    sys.modules[module.__name__] = module
+    try:
+        module.__getattr__, module.__dir__ = lazy_module_attrs("fake", module.__name__)
+        assert module.Thing is oqfake.Thing
+        assert vars(module)["Thing"] is oqfake.Thing
+        assert not hasattr(module, "no_such_name")  # builds the index
+        assert {"make", "Thing", "helper", "core", "extra"} <= set(dir(module))
+    finally:
+        del sys.modules[module.__name__]
+
+
+def test_scoped_wrapper(fake_lib):
+    """Test that the wrapper of a subpackage only imports and indexes it."""
+    import types
+
+    from oq import index
+    from oq.index import lazy_module_attrs
+
+    module = types.ModuleType("oq_fake_wrapper")
+    sys.modules[module.__name__] = module
+    try:
+        module.__getattr__, module.__dir__ = lazy_module_attrs("fake", module.__name__)
+        extra = module.extra
+        assert extra is sys.modules["oq_fake_wrapper.extra"]
+        index.get_index("fake.extra")
+        assert {"make", "helper"} <= set(dir(extra))
+        assert list(index._indexes) == ["fake.extra"]
+        assert extra.make is sys.modules["oqfake.extra"].make
+
+        # Flat access still works
+        assert module.Thing.__module__ == "oqfake.core"
+    finally:
+        del sys.modules[module.__name__]
+        sys.modules.pop("oq_fake_wrapper.extra", None)
+
+
+def test_import_scoped_wrapper(fake_lib):
+    """Test that the wrapper of a subpackage can be imported, as a package."""
+    import importlib
+    import types
+
+    from oq.index import lazy_module_attrs
+
+    module = types.ModuleType("oq_fake_wrapper")
+    sys.modules[module.__name__] = module
+    try:
+        module.__getattr__, module.__dir__ = lazy_module_attrs("fake", module.__name__)
+        extra = importlib.import_module("oq_fake_wrapper.extra")
+        assert extra is module.extra is sys.modules["oq_fake_wrapper.extra"]
+        assert extra.helper is sys.modules["oqfake.extra"].helper
+        with pytest.raises(ModuleNotFoundError):
+            importlib.import_module("oq_fake_wrapper.no_such_subpackage")
+    finally:
+        del sys.modules[module.__name__]
+        sys.modules.pop("oq_fake_wrapper.extra", None)
+
+
+IMPORT_SUBPACKAGE_CODE = """
+import sys
+import oq.sp.stats
+from oq.sp.stats import ttest_ind
+
+assert ttest_ind is sys.modules["scipy.stats"].ttest_ind
+assert sys.modules["oq.sp.stats"] is oq.sp.stats
+"""
+
+
+def test_import_subpackage_in_fresh_interpreter(tmp_path):
+    """Test that `import oq.sp.stats` works before anything accessed oq.sp.stats."""
+    import subprocess
+
+    pytest.importorskip("scipy")
+    env = {k: v for k, v in os.environ.items() if not k.startswith("OQ_")}
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SUBPACKAGE_CODE],
+        env={**env, "OQ_APP_DATA_DIR": str(tmp_path)},
+        capture_output=True,
+        text=True,
+    )
+    assert out.returncode == 0, out.stderr
+
+
+def test_subpackage_wins_whether_indexed_or_not(fake_lib, tmp_path):
+    """Test that a wrapper attribute that's both a subpackage and an indexed name
+    is the subpackage, with or without an index."""
+    import types
+
+    from oq import index
+    from oq.index import lazy_module_attrs
+
+    # A submodule named like the indexed make (which oqfake binds to the function)
+    (tmp_path / "src" / "oqfake" / "make.py").write_text("def build():\n    pass\n")
+
+    def make_attr():
+        module = types.ModuleType("oq_fake_wrapper")
+        sys.modules[module.__name__] = module
+        try:
+            module.__getattr__, module.__dir__ = lazy_module_attrs(
+                "fake", module.__name__
+            )
+            return module.make
+        finally:
+            del sys.modules[module.__name__]
+            sys.modules.pop("oq_fake_wrapper.make", None)
+
+    assert index.get_index("fake", build=False) is None
+    cold = make_attr()
+    assert "make" in index.get_index("fake")
+    warm = make_attr()
+    assert isinstance(cold, types.ModuleType) and isinstance(warm, types.ModuleType)
+    assert cold.__name__ == warm.__name__ == "oq_fake_wrapper.make"
+
+
+WALKED_PACKAGE = {
+    "__init__.py": (
+        "from . import api, tests\n"
+        "from . import _private as internals\n"
+        "lazy_imports = []\n"
+        "def __getattr__(name):\n"
+        "    lazy_imports.append(name)\n"
+        "    raise AttributeError(name)\n"
+        "def __dir__():\n"
+        "    return ['api', 'tests', 'internals', 'lazy']\n"
+    ),
+    "api/__init__.py": "from . import deep\nfrom .deep import shallow_func\n",
+    "api/deep/__init__.py": "from . import deeper\n\ndef shallow_func():\n    pass\n",
+    "api/deep/deeper.py": "def deeper_func():\n    pass\n",
+    "tests.py": "def test_func():\n    pass\n",
+    "_private.py": "def private_func():\n    pass\n",
+    "hidden.py": "def hidden_func():\n    pass\n",
+}
+
+
+@pytest.fixture
+def walked_package(tmp_path, monkeypatch):
+    """A package with tests, private, lazy and deeply nested submodules."""
+    for filename, source in WALKED_PACKAGE.items():
+        filepath = tmp_path / "oqwalked" / filename
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import oqwalked
+
+    yield oqwalked
+    for name in [m for m in sys.modules if m.split(".")[0] == "oqwalked"]:
+        del sys.modules[name]
+
+
+def _walked(module, walk_config, subpackages=()):
+    from oq.index import walk_callables
+
+    return {
+        attr_name: module_name
+        for module_name, attr_name, _ in walk_callables(
+            module, walk_config=walk_config, subpackages=subpackages
+        )
+    }
+
+
+def test_walk_bounds(walked_package):
+    """Test the depth limit, exclude patterns and private modules of a walk."""
+    walk_config = {"exclude": ["*.tests", "*.lazy"]}
+    found = _walked(walked_package, walk_config)
+    assert set(found) == {"shallow_func", "deeper_func"}
+    assert found["shallow_func"] == "oqwalked.api"
+    assert walked_package.lazy_imports == []  # excluded, so never accessed
+
+    walk_config["max_depth"] = 1
+    assert set(_walked(walked_package, walk_config)) == {"shallow_func"}
+
+    walk_config = {"exclude": ["*.lazy"], "private": True}
+    assert {"test_func", "private_func"} <= set(_walked(walked_package, walk_config))
+
+
+def test_walk_subpackages(walked_package):
+    """Test that allowlisted subpackages are walked, once, and nothing else."""
+    import oqwalked.hidden
+
+    walk_config = {"exclude": ["*.lazy"], "subpackages": ["hidden"]}
+    found = _walked(walked_package, walk_config, [oqwalked.hidden, oqwalked.hidden])
+    assert found == {"hidden_func": "oqwalked.hidden"}
+
+
+def test_walk_visits_modules_once(walked_package, monkeypatch):
+    """Test that no module is walked twice, even when reachable several times."""
+    from oq import index
+
+    walked_package.api.deep.api = walked_package.api  # a cycle
+    dirs = []
+    real_dir = dir
+    monkeypatch.setattr(
+        index,
+        "dir",
+        lambda mod: dirs.append(mod.__name__) or real_dir(mod),
+        raising=False,
+    )
+    _walked(walked_package, {"exclude": ["*.lazy"]}, [walked_package.api])
+    assert len(dirs) == len(set(dirs))
+
+
+def test_index_depends_on_walk_config(fake_lib, monkeypatch):
+    """Test that changing the walk settings of a library invalidates its index."""
+    from oq import config, index
+    from oq.index import get_index, load_index
+
+    assert "helper" in get_index("fake")
+    walk_config = {**config.get_walk_config("fake"), "max_depth": 0}
+    monkeypatch.setattr(config, "get_walk_config", lambda mod_name: walk_config)
+    assert load_index("fake") is None
+    monkeypatch.setattr(index, "_indexes", {})
+    assert "helper" not in get_index("fake")
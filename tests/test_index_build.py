@@ -0,0 +1,58 @@
+"""Test the out-of-process index builder."""
+
+import sys
+
+
+def test_build_index_in_subprocess(fake_lib):
+    """Test that a worker builds the same index, without importing the library here."""
+    from oq.index import build_index
+    from oq.index.build import build_index_in_subprocess
+
+    idx = build_index_in_subprocess("fake")
+    assert "oqfake" not in sys.modules
+    assert idx == build_index("fake")
+
+
+def test_get_index_builds_out_of_process(fake_lib):
+    """Test that on-demand builds don't import the library."""
+    from oq.index import get_index, load_index
+
+    assert {"make", "Thing", "helper"} == set(get_index("fake"))
+    assert "oqfake" not in sys.modules
+    assert load_index("fake") == get_index("fake")
+
+
+def test_build_indexes(two_libs, fake_lib, monkeypatch):
+    """Test parallel builds, stored indexes and libraries that aren't installed."""
+    from oq import config
+    from oq.index.build import build_indexes
+
+    monkeypatch.setitem(config.MODULE_MAPPING, "fake3", "oqfake_not_installed")
+    monkeypatch.setitem(config.WRAPPED_MODULES, "fake3", "oqfake_not_installed")
+    results = build_indexes([*two_libs, "fake3"], jobs=2)
+    assert {mod: r["status"] for mod, r in results.items()} == {
+        "fake": "built",
+        "fake2": "built",
+        "fake3": "not installed",
+    }
+    assert results["fake2"]["names"] == 2
+    assert "oqfake" not in sys.modules
+
+    # Installed, but broken
+    fake_lib["fake3"] = "1.0"
+    results = build_indexes([*two_libs, "fake3"], jobs=2)
+    assert results["fake"]["status"] == results["fake2"]["status"] == "stored"
+    assert results["fake3"]["status"] == "failed"
+    assert "oqfake_not_installed" in results["fake3"]["error"]
+
+
+def test_cli(two_libs, capsys):
+    """Test python -m oq.index build."""
+    from oq.index.__main__ import main
+
+    main(["build", "--modules", *two_libs, "--jobs", "2"])
+    out = capsys.readouterr().out.splitlines()
+    assert [line.split()[:3] for line in out] == [
+        ["fake", "built", "3"],
+        ["fake2", "built", "2"],
+    ]
@@ -0,0 +1,58 @@
+"""Test the background warm-up of libraries."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    from oq import loader
+
+    monkeypatch.setattr(loader, "_futures", {})
+    return loader
+
+
+def test_ready(fake_lib, loader):
+    """Test that a library is loaded once, in the background."""
+    future = loader.ready("fake")
+    assert loader.ready("fake") is future
+    assert "make" in future.result(timeout=10)
+    assert "oqfake" in sys.modules
+    assert loader.wait_ready(timeout=10)
+
+
+def test_warm_up(fake_lib, loader):
+    """Test that warm_up schedules the libraries, and wait_ready waits for them."""
+    futures = loader.warm_up(["fake"])
+    assert loader.wait_ready(timeout=10)
+    assert futures["fake"].done()
+    with pytest.raises(ValueError):
+        loader.ready("no_such_module")
+
+
+def test_background_warm_up_on_import(tmp_path):
+    """Test that `import oq` schedules the import plan when configured to."""
+    try:
+        import numpy
+    except ImportError:
+        pytest.skip("numpy not installed")
+
+    with open(tmp_path / "import_config.json", "w") as f:
+        json.dump({"background_warm_up": True, "profiles": {"np": ["np"]}}, f)
+    code = (
+        "import sys, oq\n"
+        "assert oq.wait_ready(timeout=60)\n"
+        "print('numpy' in sys.modules, 'pandas' in sys.modules)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        env=dict(os.environ, OQ_APP_DATA_DIR=str(tmp_path), OQ_PROFILE="np"),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip() == "True False"
@@ -74,3 +74,19 @@ def test_all_modules_import_gracefully():
         # Should not raise any exception
         with suppress(ImportError, ModuleNotFoundError):
             __import__(f"oq.{mod}", fromlist=[mod])
+
+
+def test_wrapper_attributes_resolve_on_first_access():
+    """Test that wrapper attributes are resolved lazily and then bound."""
+    try:
+        import numpy
+    except ImportError:
+        pytest.skip("numpy not installed")
+
+    from oq import np
+
+    np.__dict__.pop("mean", None)
+    assert "mean" in dir(np)
+    assert hasattr(np, "mean")
+    assert np.__dict__["mean"] is numpy.mean
+    assert not hasattr(np, "no_such_numpy_name")
@@ -0,0 +1,97 @@
+"""Test the import plans of scripts (see oq.plan)."""
+
+import json
+
+import pytest
+
+SCRIPT = """
+import oq
+from oq import fake2 as f2, find
+
+oq.Thing()
+f2.helper()
+find("make")
+oq.no_such_name
+"""
+
+
+@pytest.fixture
+def planned(two_libs, fake_plan):
+    """The two fake libraries as the import plan, in a fresh config."""
+    return fake_plan
+
+
+def test_find_usages():
+    """Test that oq names are found however oq and its wrappers are imported."""
+    from oq.plan import find_usages
+
+    source = (
+        "import oq as q\n"
+        "import oq.np as onp\n"
+        "from oq import read_csv, np\n"
+        "from oq.sp import stats\n"
+        "from oq.config import get_config\n"
+        "q.DataFrame(q.np.array([1]).T)\n"
+        "onp.linspace\n"
+        "np.linalg.norm\n"
+        "stats.norm\n"
+        "other.attr\n"
+    )
+    names, star_import = find_usages(source)
+    assert sorted(names) == [
+        "DataFrame",
+        "np",
+        "np.array",
+        "np.linalg.norm",
+        "np.linspace",
+        "read_csv",
+        "sp.stats",
+        "sp.stats.norm",
+    ]
+    assert not star_import
+    assert find_usages("from oq import *")[1]
+
+
+def test_make_plan(planned, tmp_path):
+    """Test that a plan lists the libraries winning the names the scripts use."""
+    from oq.plan import make_plan
+
+    (tmp_path / "job").mkdir()
+    (tmp_path / "job" / "main.py").write_text(SCRIPT)
+    (tmp_path / "job" / "broken.py").write_text("def (")
+    with pytest.warns(RuntimeWarning, match="broken.py"):
+        plan = make_plan([str(tmp_path / "job")])
+    assert plan["sources"] == [str(tmp_path / "job" / "main.py")]
+    assert plan["libraries"] == ["fake", "fake2"]
+    assert plan["names"] == {
+        "Thing": ["fake", "oqfake.core"],
+        "fake2": ["fake2", None],
+        "fake2.helper": ["fake2", "oqfake.extra"],
+    }
+    assert plan["modules"] == ["oqfake.core", "oqfake.extra"]
+    assert plan["unresolved"] == ["no_such_name"]
+
+    (tmp_path / "make.py").write_text("import oq\noq.make()\n")
+    assert make_plan([str(tmp_path / "make.py")])["libraries"] == ["fake2"]
+
+
+def test_use_plan(planned, tmp_path, monkeypatch):
+    """Test that a plan narrows the import plan, from oq.use_plan or OQ_PLAN."""
+    import oq
+    from oq import config
+    from oq.plan import load_configured_plan, make_plan, write_plan
+
+    (tmp_path / "make.py").write_text("import oq\noq.make()\n")
+    path = str(tmp_path / "plan.json")
+    write_plan(make_plan([str(tmp_path / "make.py")]), path)
+    assert json.loads(open(path).read())["libraries"] == ["fake2"]
+    assert oq.use_plan(path) == ["fake2"]
+
+    monkeypatch.setattr(config, "_overrides", {"module_order": list(planned)})
+    monkeypatch.setenv(config.PLAN_ENV_VAR, path)
+    assert load_configured_plan()
+    assert config.get_import_order() == ["fake2"]
+
+    (tmp_path / "plan.json").write_text('{"format": 0}')
+    with pytest.warns(RuntimeWarning, match="Ignoring the oq plan"):
+        assert not load_configured_plan()
@@ -0,0 +1,142 @@
+"""Test the deferred plotting libraries (see ``oq.plotting``)."""
+
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def deferred_fake(fake_lib, monkeypatch):
+    """The "fake" library, deferred, with its index built but its package unloaded."""
+    from oq import config, plotting
+    from oq.index import get_index
+
+    monkeypatch.setattr(config, "get_deferred_modules", lambda: ["fake"])
+    monkeypatch.setattr(plotting, "_deferred", {})
+    get_index("fake")
+    for name in [m for m in sys.modules if m.split(".")[0] == "oqfake"]:
+        del sys.modules[name]
+    module = types.ModuleType("oq_fake_wrapper")
+    sys.modules[module.__name__] = module
+    yield module
+    del sys.modules[module.__name__]
+
+
+def test_functions_are_imported_when_called(deferred_fake):
+    """Test that wrapper functions are deferred, and classes resolved on access."""
+    from oq.index import get_index, lazy_module_attrs, lookup
+    from oq.plotting import DeferredCallable
+
+    module = deferred_fake
+    module.__getattr__, module.__dir__ = lazy_module_attrs("fake", module.__name__)
+    make = module.make
+    assert isinstance(make, DeferredCallable)
+    assert (make.__module__, make.__name__) == get_index("fake")["make"]
+    assert lookup("fake", "make") is make
+    assert module.make is make and "make" not in vars(module)
+    assert "oqfake" not in sys.modules
+
+    assert make() is None
+    assert "oqfake" in sys.modules
+    assert make.resolve() is sys.modules["oqfake"].make
+    # The function itself replaces the deferred callable
+    assert module.make is vars(module)["make"] is make.resolve()
+    assert module.Thing is sys.modules["oqfake.core"].Thing
+    # Once the module is imported, there's nothing to defer
+    assert lookup("fake", "helper") is sys.modules["oqfake.extra"].helper
+
+
+def test_functions_are_bound_once_imported_elsewhere(deferred_fake):
+    """Test that a deferred function gives way to the function itself once its
+    module is imported, even by someone else."""
+    from oq.index import lazy_module_attrs
+    from oq.plotting import DeferredCallable
+
+    module = deferred_fake
+    module.__getattr__, module.__dir__ = lazy_module_attrs("fake", module.__name__)
+    assert isinstance(module.make, DeferredCallable)
+    import oqfake
+
+    assert module.make is oqfake.make
+
+
+def test_root_names_are_deferred(deferred_fake, monkeypatch):
+    """Test that root names of a deferred library are deferred too."""
+    from oq import config, plotting
+    from oq.symbols import SymbolTable
+
+    monkeypatch.setattr(config, "get_plot_backend", lambda: None)
+    table = SymbolTable(["fake"])
+    make = table.get("make")
+    assert isinstance(make, plotting.DeferredCallable)
+    assert table.get("make") is make
+    assert "oqfake" not in sys.modules
+    make()
+    plotting.forget("oqfake")
+    assert table.get("make") is sys.modules["oqfake"].make
+
+
+PYPLOT_CODE = """
+import sys
+import oq
+
+oq.configure(plot_backend="agg")
+plot = oq.plt.plot
+assert "matplotlib" not in sys.modules, "pyplot was imported on access"
+plot([1, 2])
+import matplotlib
+import matplotlib.pyplot
+
+assert oq.plt.plot is matplotlib.pyplot.plot
+assert oq.plt.subplots is matplotlib.pyplot.subplots
+
+print(matplotlib.get_backend())
+"""
+
+
+def test_pyplot_is_imported_by_the_first_call(tmp_path):
+    """Test that oq.plt.plot only imports pyplot, with the backend set, when called."""
+    pytest.importorskip("matplotlib")
+    out = subprocess.run(
+        [sys.executable, "-c", PYPLOT_CODE],
+        env={
+            **{k: v for k, v in os.environ.items() if not k.startswith("OQ_")},
+            "OQ_APP_DATA_DIR": str(tmp_path),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip().lower() == "agg"
+
+
+READY_CODE = """
+import sys
+import matplotlib
+import oq
+
+oq.configure(plot_backend="svg")
+oq.ready("plt").result(timeout=60)
+assert "matplotlib.pyplot" in sys.modules
+print(matplotlib.get_backend())
+"""
+
+
+def test_loading_selects_the_backend(tmp_path):
+    """Test that loading a plotting library (e.g. warming it up) selects the
+    configured backend before importing it."""
+    pytest.importorskip("matplotlib")
+    out = subprocess.run(
+        [sys.executable, "-c", READY_CODE],
+        env={
+            **{k: v for k, v in os.environ.items() if not k.startswith("OQ_")},
+            "OQ_APP_DATA_DIR": str(tmp_path),
+        },
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert out.stdout.strip().lower() == "svg"
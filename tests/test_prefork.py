@@ -0,0 +1,105 @@
+"""Test preloading for prefork servers."""
+
+import os
+import subprocess
+import sys
+from concurrent.futures import Future
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux smaps"
+)
+
+N_CHILDREN = 3
+
+# Forks N_CHILDREN workers that use the fake library, after preloading it or not,
+# and prints their unique and shared memory (in kB)
+FORK_SCRIPT = """
+import gc
+import os
+import sys
+
+src, app_data, mode = sys.argv[1:]
+sys.path.insert(0, src)
+import oq
+from oq import config, index, util
+
+config.MODULE_MAPPING["fake"] = config.WRAPPED_MODULES["fake"] = "oqfake"
+config.get_library_version = {"fake": "1.0"}.get
+config.get_import_order = lambda: ["fake"]
+util.app_data_dir = app_data
+index.get_index("fake")
+if mode == "preload":
+    assert oq.preload() == ["fake"]
+
+
+def memory():
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if value.strip().endswith("kB"):
+                fields[key] = int(value.split()[0])
+    unique = fields["Private_Clean"] + fields["Private_Dirty"]
+    return unique, fields["Shared_Clean"] + fields["Shared_Dirty"]
+
+
+reader, writer = os.pipe()
+pids = []
+for _ in range(int(os.environ["N_CHILDREN"])):
+    pid = os.fork()
+    if pid == 0:
+        assert oq.Thing.__module__ == "oqfake.core"
+        gc.collect()
+        os.write(writer, ("%d %d\\n" % memory()).encode())
+        os._exit(0)
+    pids.append(pid)
+for pid in pids:
+    os.waitpid(pid, 0)
+os.close(writer)
+print(os.read(reader, 1 << 16).decode().strip())
+"""
+
+
+def test_forked_child_restarts_the_loader(monkeypatch):
+    """Test that loads in progress at fork are dropped in the child."""
+    from oq import loader
+
+    loading, loaded = Future(), Future()
+    loaded.set_result({})
+    monkeypatch.setattr(loader, "_futures", {"np": loading, "pd": loaded})
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if list(loader._futures) == ["pd"] and not loader._workers else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert loader._futures["np"] is loading
+
+
+def test_preload_shares_memory(fake_lib, tmp_path):
+    """Test that preloaded libraries are shared by forked workers, not copied."""
+    core = tmp_path / "src" / "oqfake" / "core.py"
+    data = "DATA = [str(i) * 3 for i in range(400_000)]\n"
+    core.write_text(core.read_text() + "\n" + data)
+    env = {**os.environ, "N_CHILDREN": str(N_CHILDREN)}
+
+    def children_memory(mode):
+        script_args = [str(tmp_path / "src"), str(tmp_path / "app_data"), mode]
+        out = subprocess.run(
+            [sys.executable, "-c", FORK_SCRIPT, *script_args],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        assert out.returncode == 0, out.stderr
+        rows = [list(map(int, line.split())) for line in out.stdout.splitlines()]
+        assert len(rows) == N_CHILDREN
+        return [sum(column) / N_CHILDREN for column in zip(*rows)]
+
+    cold_unique, cold_shared = children_memory("cold")
+    unique, shared = children_memory("preload")
+    # The library's objects (~30 MB) are in each child's unique memory, unless
+    # preloaded
+    assert unique + 15_000 < cold_unique
+    assert shared > cold_shared
@@ -0,0 +1,65 @@
+"""Test finding the installed libraries (and their versions) without importing any."""
+
+import json
+import subprocess
+import sys
+
+PROBE_CODE = """
+import json, sys
+import oq
+from oq import config
+
+available, versions = oq.available(), oq.versions()
+packages = {config.get_package(mod).split(".")[0] for mod in config.MODULE_MAPPING}
+print(json.dumps({
+    "available": available,
+    "versions": versions,
+    "imported": sorted(packages & set(sys.modules)),
+}))
+"""
+
+
+def test_available_and_versions_import_nothing():
+    """Test that probing every library imports none of them."""
+    from oq import config
+
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE_CODE], capture_output=True, text=True, check=True
+    )
+    probe = json.loads(out.stdout)
+    assert set(probe["available"]) == set(config.MODULE_MAPPING)
+    assert set(probe["versions"]) == set(config.MODULE_MAPPING)
+    assert probe["imported"] == []
+
+
+def test_is_library_available(fake_lib, monkeypatch):
+    """Test that availability follows the package, and doesn't import it."""
+    from oq import config
+
+    assert config.is_library_available("fake")
+    assert "oqfake" not in sys.modules
+    monkeypatch.setitem(config.MODULE_MAPPING, "fake", "oqfake_not_installed")
+    assert not config.is_library_available("fake")
+
+
+def test_installed_import_order(fake_lib, monkeypatch):
+    """Test that the installed import plan leaves out the missing libraries."""
+    from oq import config
+
+    monkeypatch.setitem(config.MODULE_MAPPING, "gone", "oqfake_not_installed")
+    monkeypatch.setattr(config, "get_import_order", lambda: ["gone", "fake"])
+    assert config.get_installed_import_order() == ["fake"]
+
+
+def test_missing_library_costs_no_walk(fake_lib, monkeypatch):
+    """Test that a library that isn't installed is skipped without a worker."""
+    from oq import config, index
+
+    def _build(mod_name, report):
+        raise AssertionError("walked a library that isn't installed")
+
+    monkeypatch.setitem(config.MODULE_MAPPING, "fake", "oqfake_not_installed")
+    monkeypatch.setattr(index, "_build", _build)
+    assert index.get_index("fake") == {}
+    report = index.get_report("fake")
+    assert (report["status"], report["reason"]) == ("skipped", "not installed")
@@ -0,0 +1,70 @@
+"""Test the symbol search."""
+
+import sys
+import time
+
+
+def test_find(two_libs):
+    """Test prefix, glob and fuzzy search, without importing the libraries."""
+    from oq.search import Match, find
+
+    assert find("ma", mod_names=two_libs) == [
+        Match("make", "fake2", "oqfake.extra", "make", "fake2"),
+        Match("make", "fake", "oqfake.core", "make", "fake2"),
+    ]
+    assert [m.name for m in find("*e*", mod_names=two_libs)] == [
+        "helper",
+        "helper",
+        "make",
+        "make",
+    ]
+    assert [m.name for m in find("*e*", limit=1, mod_names=two_libs)] == [
+        "helper",
+        "helper",
+    ]
+    assert [m.name for m in find("[Tt]hi?g", mod_names=two_libs)] == ["Thing"]
+    assert {m.library for m in find("*lper", mod_names=two_libs)} == set(two_libs)
+    assert find("*elpe*", mod_names=two_libs)[0].winner == "fake2"
+    assert find("no_such_name", mod_names=two_libs) == []
+    assert find("hlper", fuzzy=True, mod_names=two_libs)[0].name == "helper"
+    assert "oqfake" not in sys.modules
+
+
+def test_search_is_fast():
+    """Test that pattern lookups are interactive over 120k names (well under a
+    millisecond, here measured with generous bounds, so as not to flake on slow
+    runners, e.g. under coverage)."""
+    from oq.search import SymbolSearch
+
+    indexes = {
+        f"lib{i}": {
+            f"{prefix}_{j}_{i}": (f"lib{i}.mod_{j % 100}", f"{prefix}_{j}_{i}")
+            for prefix in ("read", "fit", "SomeRegressor")
+            for j in range(4000)
+        }
+        for i in range(10)
+    }
+    search = SymbolSearch(indexes)
+    assert len(search) == 120_000
+    # The trigram index is built with the search, before any infix query
+    search._trigram_thread.join(timeout=60)
+    trigram_index = search._trigram_index
+    assert trigram_index is not None
+    assert search.find("*egres*", limit=20)
+    assert search._trigram_index is trigram_index
+
+    def best_time(pattern, **kwargs):
+        # The best of a few rounds: the others measure the runner's hiccups
+        n, rounds = 20, 5
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(n):
+                assert search.find(pattern, **kwargs)
+            times.append((time.perf_counter() - start) / n)
+        return min(times)
+
+    for pattern in ("read_123_", "*_3999_9", "SomeRegressor_12*_4", "*Regr*"):
+        assert best_time(pattern, limit=20) < 1e-2, pattern
+    # Fuzzy search ranks candidates, so it's slower (but still interactive)
+    assert best_time("SomeRegresor_1234_5", fuzzy=True) < 1e-1
@@ -0,0 +1,115 @@
+"""Test the snapshots of the resolution tables."""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.fixture
+def frozen(two_libs, fake_plan, monkeypatch):
+    """A snapshot of the two fake libraries, as the import plan."""
+    from oq import index
+    from oq.snapshot import make_snapshot
+
+    snapshot = make_snapshot(two_libs)
+    monkeypatch.setattr(index, "_indexes", {})
+    return json.loads(json.dumps(snapshot))
+
+
+def test_make_snapshot(frozen):
+    """Test that the root table of a snapshot follows module_order precedence."""
+    assert frozen["plan"] == ["fake", "fake2"]
+    assert frozen["versions"] == {"fake": "1.0", "fake2": "1.0"}
+    assert frozen["root"]["make"] == ["fake2", "oqfake.extra", "make"]
+    assert frozen["root"]["Thing"] == ["fake", "oqfake.core", "Thing"]
+    assert set(frozen["indexes"]["fake2"]) == {"make", "helper"}
+
+
+def test_load_snapshot(frozen, tmp_path, monkeypatch):
+    """Test that a loaded snapshot is used without reading or building indexes."""
+    import oqfake
+    from oq import index, symbols
+    from oq.snapshot import load_snapshot, write_snapshot
+
+    path = str(tmp_path / "snapshot.json")
+    write_snapshot(frozen, path)
+
+    def no_index_io(mod_name):
+        raise AssertionError(f"{mod_name} index read or built")
+
+    monkeypatch.setattr(index, "load_index", no_index_io)
+    monkeypatch.setattr(index, "_build", no_index_io)
+    load_snapshot(path)
+    table = symbols.get_table()
+    assert table.owner("make") == "fake2"
+    assert table.get("Thing") is oqfake.Thing
+    assert index.get_index("fake2") == {
+        name: tuple(record) for name, record in frozen["indexes"]["fake2"].items()
+    }
+
+
+def test_snapshot_version_mismatch(frozen, fake_lib, tmp_path, monkeypatch):
+    """Test that a snapshot of other library versions isn't loaded."""
+    from oq import config, index
+    from oq.snapshot import (
+        load_configured_snapshot,
+        load_snapshot,
+        snapshot_mismatches,
+        write_snapshot,
+    )
+
+    path = str(tmp_path / "snapshot.json")
+    write_snapshot(frozen, path)
+    fake_lib["fake2"] = "2.0"
+    assert snapshot_mismatches(frozen) == ["fake2 1.0 (installed 2.0)"]
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+    # At import, a mismatching snapshot is ignored, with a warning
+    monkeypatch.setenv(config.SNAPSHOT_ENV_VAR, path)
+    with pytest.warns(RuntimeWarning, match="fake2 1.0"):
+        assert not load_configured_snapshot()
+    assert index._indexes == {}
+
+
+def test_frozen_import(tmp_path):
+    """Test python -m oq.freeze, and imports using its snapshot (no walk or write)."""
+    pytest.importorskip("numpy")
+    env = dict(os.environ)
+    env.pop("OQ_PROFILE", None)
+    for app_data_dir in ("app_data", "empty"):
+        (tmp_path / app_data_dir).mkdir()
+        (tmp_path / app_data_dir / "import_config.json").write_text(
+            json.dumps({"module_order": ["np"]})
+        )
+    snapshot_path = str(tmp_path / "snapshot.json")
+    subprocess.run(
+        [sys.executable, "-m", "oq.freeze", "-o", snapshot_path, "--modules", "np"],
+        env={**env, "OQ_APP_DATA_DIR": str(tmp_path / "app_data")},
+        check=True,
+        capture_output=True,
+    )
+    # An app data dir without indexes
+    env["OQ_APP_DATA_DIR"] = str(tmp_path / "empty")
+    env["OQ_SNAPSHOT"] = snapshot_path
+    code = (
+        "import sys\n"
+        "events = []\n"
+        "def hook(event, args):\n"
+        "    if event in ('subprocess.Popen', 'os.replace') or (\n"
+        "        event == 'open' and 'index' in str(args[0]) and\n"
+        "        str(args[0]).endswith('.json')):\n"
+        "        events.append(event)\n"
+        "sys.addaudithook(hook)\n"
+        "from oq import np\n"
+        "assert np.linspace(0, 1, 3)[1] == 0.5\n"
+        "print(events)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == "[]"
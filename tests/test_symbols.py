@@ -0,0 +1,44 @@
+"""Test the cross-library symbol table."""
+
+import pytest
+
+
+def test_precedence(two_libs):
+    """Test that the last library of the plan wins shared names."""
+    import oqfake
+    from oq.symbols import SymbolTable
+
+    table = SymbolTable(two_libs)
+    assert table.owner("make") == "fake2"
+    assert table.get("make") is oqfake.extra.make
+    assert table.owner("Thing") == "fake"
+    assert table.owner("no_such_name") is None
+    with pytest.raises(AttributeError):
+        table.get("no_such_name")
+
+    table = SymbolTable(list(reversed(two_libs)))
+    assert table.get("make") is oqfake.make
+
+
+def test_merges_only_as_far_as_needed(two_libs):
+    """Test that finding a name of the last library doesn't load the others."""
+    from oq import index
+    from oq.symbols import SymbolTable
+
+    table = SymbolTable(two_libs)
+    assert table.owner("helper") == "fake2"
+    assert "fake" not in index._indexes
+    assert len(table) == 3
+    assert "fake" in index._indexes
+
+
+def test_shared_records(two_libs):
+    """Test that an object exported by several libraries has a single record."""
+    from oq import index
+    from oq.symbols import SymbolTable
+
+    table = SymbolTable(two_libs).merge_all()
+    helper_records = [index.get_index(mod_name)["helper"] for mod_name in two_libs]
+    assert helper_records[0] == helper_records[1]
+    assert table.record("helper") is helper_records[1]
+    assert sorted(name for name, _, _ in table.items()) == ["Thing", "helper", "make"]
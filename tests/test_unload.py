@@ -0,0 +1,70 @@
+"""Test unloading libraries, and the memory-lean mode."""
+
+import sys
+import tracemalloc
+import types
+
+import pytest
+
+BLOB_SIZE = 32 * 2**20
+
+
+@pytest.fixture
+def heavy_lib(fake_plan, tmp_path):
+    """The fake library, holding a large buffer, as the import plan."""
+    core = tmp_path / "src" / "oqfake" / "core.py"
+    core.write_text(core.read_text() + f"\n_BLOB = bytearray({BLOB_SIZE})\n")
+    yield
+    import oq
+
+    oq.unload("fake")
+
+
+def test_unload(heavy_lib):
+    """Test that unloading a library unbinds its root names and frees its memory."""
+    import oq
+    from oq import index
+
+    tracemalloc.start()
+    try:
+        assert oq.Thing.__module__ == "oqfake.core"
+        loaded = tracemalloc.get_traced_memory()[0]
+        assert "Thing" in vars(oq)
+        assert sorted(oq.unload("fake")) == ["oqfake", "oqfake.core", "oqfake.extra"]
+        freed = loaded - tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert freed > BLOB_SIZE
+    assert "Thing" not in vars(oq)
+    assert "oqfake" not in sys.modules
+    assert not any(record[0].startswith("oqfake") for record in index._resolved)
+
+    # The library is imported again when one of its names is accessed
+    assert oq.Thing.__module__ == "oqfake.core"
+    assert "oqfake" in sys.modules
+
+
+def test_unload_keeps_referenced_library(heavy_lib, monkeypatch):
+    """Test that a library still referenced by another module stays imported."""
+    import oq
+    from oq.loader import referrer
+
+    user = types.ModuleType("oqfake_user")
+    user.Thing = oq.Thing
+    monkeypatch.setitem(sys.modules, "oqfake_user", user)
+    assert oq.unload("fake") == []
+    assert "Thing" not in vars(oq)
+    assert referrer("oqfake") == "oqfake_user"
+    assert "oqfake" in sys.modules
+
+
+def test_memory_lean(heavy_lib, monkeypatch):
+    """Test that memory-lean mode neither binds nor caches resolved objects."""
+    import oq
+    from oq import config, index
+
+    monkeypatch.setattr(config, "is_memory_lean", lambda: True)
+    assert oq.make.__module__ == "oqfake.core"
+    assert "make" not in vars(oq)
+    assert index._resolved == {}
+    assert sorted(oq.unload("fake")) == ["oqfake", "oqfake.core", "oqfake.extra"]
@@ -0,0 +1,104 @@
+"""Test the usage recorder and the prefetch of learned names."""
+
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def recording(fake_plan, monkeypatch):
+    """Recording usage of the fake library (as the import plan and "oq.fake")."""
+    import oq
+    from oq import config, usage
+
+    monkeypatch.setenv(config.APP_ENV_VAR, "svc")
+    monkeypatch.setattr(usage, "_used", {})
+    _install_wrapper()
+    yield usage
+    oq.unload("fake")
+
+
+def _install_wrapper():
+    """Install "oq.fake", the wrapper of the fake library."""
+    from oq import index
+
+    wrapper = types.ModuleType("oq.fake")
+    sys.modules["oq.fake"] = wrapper
+    wrapper.__getattr__, wrapper.__dir__ = index.lazy_module_attrs("fake", "oq.fake")
+
+
+def test_record_and_prefetch(recording):
+    """Test that resolved names are learned per app, pruned, and prefetched."""
+    import oq
+
+    usage = recording
+    assert oq.Thing.__module__ == "oqfake.core"
+    assert sys.modules["oq.fake"].helper.__module__ == "oqfake.extra"
+    usage.save_usage()
+    assert usage.load_usage("svc") == {
+        "app": "svc",
+        "runs": 1,
+        "names": {"Thing": 1, "fake.helper": 1},
+    }
+    assert usage.apps() == ["svc"]
+
+    # A second run, only using Thing
+    usage._used = {"Thing": None}
+    usage.save_usage()
+    assert usage.prune("svc", unused_for=1) == 1
+    assert usage.hot_set("svc") == ["Thing"]
+
+    # Not recording (see test_prefetch_does_not_count_as_use): prefetch binds
+    usage._used = None
+    oq.unload("fake")
+    assert "Thing" not in vars(oq)
+    _install_wrapper()
+    assert usage.prefetch(["Thing", "fake.helper", "no_such_name"]) == [
+        "Thing",
+        "fake.helper",
+    ]
+    assert "Thing" in vars(oq)
+    assert usage.prefetch() == ["Thing"]
+
+
+def test_prefetch_does_not_count_as_use(recording, capsys):
+    """Test that, recording and prefetching, only the names used are kept."""
+    import oq
+    from oq.usage.__main__ import main
+
+    usage = recording
+    # Run 1 uses both names
+    oq.Thing
+    sys.modules["oq.fake"].helper
+    usage.save_usage()
+    # Runs 2 to 5 prefetch both, and only use Thing
+    for _ in range(4):
+        oq.unload("fake")
+        _install_wrapper()
+        usage._used = {}
+        assert usage.prefetch() == ["Thing", "fake.helper"]
+        assert "Thing" not in vars(oq)
+        assert oq.Thing.__module__ == "oqfake.core"
+        assert usage._used == {"Thing": None}
+        usage.save_usage()
+
+    main(["prune", "svc", "--unused-for", "3"])
+    assert capsys.readouterr().out.strip() == "Forgot 1 names of svc"
+    assert usage.hot_set("svc") == ["Thing"]
+
+
+def test_cli(recording, capsys):
+    """Test python -m oq.usage show and prune."""
+    import oq
+    from oq.usage.__main__ import main
+
+    oq.Thing
+    recording.save_usage()
+    main(["show"])
+    assert capsys.readouterr().out.split() == ["svc", "1", "names", "1", "runs"]
+    main(["show", "svc"])
+    assert capsys.readouterr().out.split()[0] == "Thing"
+    main(["prune", "svc"])
+    assert capsys.readouterr().out.strip() == "Forgot 1 names of svc"
+    assert recording.apps() == []